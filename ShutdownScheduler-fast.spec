@@ -0,0 +1,76 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Perfil de partida rápida: pasta (onedir) em vez de um único .exe.
+#
+# O ShutdownScheduler.spec gera um .exe onefile comprimido com UPX; a cada execução ele
+# descompacta tudo (base_library.zip, PYZ-00.pyz, assets do customtkinter) numa pasta
+# temporária antes de abrir a janela. Aqui os arquivos já ficam descompactados em
+# dist/ShutdownScheduler/, sem UPX, com bytecode otimizado (-OO) pré-compilado e sem os módulos
+# da biblioteca padrão que apareciam no PYZ-00.toc mas que o app não usa.
+#
+#     pyinstaller ShutdownScheduler-fast.spec
+#     python benchmarks/bench_packaged.py dist/ShutdownScheduler/ShutdownScheduler
+#
+# Ao acrescentar um import novo ao app, confira se ele não está em EXCLUDES.
+
+EXCLUDES = [
+    # Pillow: o customtkinter só o usa em CTkImage (import opcional); o app não mostra imagens
+    'PIL',
+    # Opcional: sem NumPy a projeção do calendário usa listas
+    'numpy',
+    # Só o fleet.py (ferramenta à parte) usa asyncio
+    'asyncio',
+    'multiprocessing',
+    # Rede além do socket local e do http.server das métricas
+    'ssl', '_ssl', 'ftplib', 'netrc', 'xmlrpc', 'xml',
+    # Compressão: o zipfile/shutil tratam a ausência
+    'tarfile', 'lzma', '_lzma', 'bz2', '_bz2', 'compression',
+    # Ferramentas de desenvolvimento
+    'pydoc', 'pydoc_data', 'doctest', 'unittest', 'pdb', 'difflib', 'tracemalloc',
+    'lib2to3', 'idlelib', 'turtle', 'turtledemo', 'tkinter.tix', 'test',
+    # Implementação em Python do decimal (o módulo C _decimal é usado)
+    '_pydecimal',
+    'setuptools', 'pip', 'distutils',
+]
+
+a = Analysis(
+    ['shutdown_scheduler.py'],
+    pathex=[],
+    binaries=[],
+    datas=[],
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=EXCLUDES,
+    noarchive=False,
+    # Equivale a python -OO: sem asserts nem docstrings (o app não depende de nenhum dos dois)
+    optimize=2,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='ShutdownScheduler',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='ShutdownScheduler',
+)
@@ -0,0 +1,290 @@
+"""Fila de ações de energia (desligar, reiniciar, hibernar, encerrar sessão) com um só timer do Windows.
+
+O Windows só mantém um `shutdown -t` pendente: agendar de novo sobrescreve (ou falha com
+"já existe um desligamento agendado"). A fila guarda várias ações com prazo e prioridade,
+calcula qual delas é de fato a próxima e só mexe no comando do sistema quando essa resposta
+muda. Várias alterações dentro de `batch()` viram no máximo um `-a` seguido de um `-s/-r`.
+
+Desligar e reiniciar usam o timer do próprio Windows. Hibernar e encerrar sessão não aceitam
+`-t`: ficam na fila e são executados por `due()` quando o prazo chega (a janela chama isso
+no fim da contagem).
+
+Uma ação pode ter folga (`slack`): o timer do Windows é armado para o prazo + folga, e quem
+acompanha o prazo (janela ou serviço) roda os ganchos pré-desligamento e chama `fire_now()`.
+Se ninguém estiver rodando no prazo, o Windows dispara sozinho ao fim da folga.
+"""
+import bisect
+import contextlib
+import itertools
+import subprocess
+import time
+
+from command_executor import ShutdownBackend, TIMED_ACTIONS
+
+
+# Maior prioridade vence quando duas ações caem na mesma janela de tempo
+DEFAULT_PRIORITY = {'shutdown': 30, 'restart': 20, 'hibernate': 10, 'logoff': 0}
+ACTION_LABELS = {
+    'shutdown': "Desligar",
+    'restart': "Reiniciar",
+    'hibernate': "Hibernar",
+    'logoff': "Encerrar sessão",
+}
+
+
+class QueuedAction:
+    __slots__ = ('id', 'action', 'deadline', 'priority', 'key', 'slack')
+
+    def __init__(self, qid: int, action: str, deadline: float, priority: int, key=None, slack: float = 0.0):
+        self.id = qid
+        self.action = action
+        self.deadline = deadline
+        self.priority = priority
+        self.key = key
+        self.slack = slack
+
+    def __repr__(self):
+        return f"QueuedAction({self.id}, {self.action!r}, deadline={self.deadline:.0f}, priority={self.priority})"
+
+
+class ActionQueue:
+    """Fila de ações que fala com o backend como se fosse um backend (`schedule`/`cancel`).
+
+    - ações com prazos a menos de `window` segundos da primeira são tratadas como uma só:
+      vale a de maior prioridade, no horário da primeira
+    - o estado armado no sistema é lembrado; prazos que diferem menos de `tolerance`
+      segundos não são reenviados
+    - `key` identifica quem agendou (ex.: 'gui'): um novo agendamento com a mesma chave
+      substitui o anterior numa única reconciliação
+    """
+
+    def __init__(self, backend=None, clock=time.time, window: float = 60.0, tolerance: float = 1.0):
+        self.backend = backend if backend is not None else ShutdownBackend()
+        self.clock = clock
+        self.window = window
+        self.tolerance = tolerance
+        self.commands = 0
+        self._ids = itertools.count(1)
+        self._items = {}
+        self._order = []   # (prazo, id) ordenado
+        self._keys = {}    # chave -> id
+        self._armed = None  # (ação, prazo) armado no Windows
+        self._depth = 0
+
+    # ---- interface de backend -------------------------------------------------------------
+
+    def executable(self) -> str:
+        return self.backend.executable()
+
+    def schedule(self, seconds: int, action: str = 'shutdown', key=None, slack: float = 0.0):
+        """Adiciona a ação daqui a `seconds` e reconcilia. Retorna o resultado do último comando."""
+        with self.batch() as results:
+            self.add(action, self.clock() + seconds, key=key, slack=slack)
+        return self._result(results, ['-s', '-t', str(int(seconds + slack))])
+
+    def cancel(self):
+        """Esvazia a fila e sempre envia `shutdown -a`.
+
+        O desligamento pendente no Windows pode ter sido armado fora desta fila (serviço,
+        linha de comando, à mão): um cancelamento pedido nunca é dispensado, só a
+        reconciliação evita comandos repetidos.
+        """
+        self._depth += 1
+        try:
+            self.clear()
+        finally:
+            self._depth -= 1
+        self._armed = None
+        self.commands += 1
+        return self.backend.cancel()
+
+    def _result(self, results, args):
+        if results:
+            # O primeiro erro é o que importa; senão o último comando enviado
+            failed = [r for r in results if r.returncode != 0]
+            return failed[0] if failed else results[-1]
+        # Nada precisou ir ao Windows
+        return subprocess.CompletedProcess([self.executable(), *args], 0, '', '')
+
+    # ---- fila ----------------------------------------------------------------------------
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, action: str, deadline: float, priority=None, key=None, slack: float = 0.0) -> int:
+        if action not in DEFAULT_PRIORITY:
+            raise ValueError(f"ação desconhecida: {action!r}")
+        with self.batch():
+            if key is not None and key in self._keys:
+                self.remove(self._keys[key])
+            qid = next(self._ids)
+            item = QueuedAction(qid, action, deadline,
+                                DEFAULT_PRIORITY[action] if priority is None else priority, key, slack)
+            self._items[qid] = item
+            bisect.insort(self._order, (deadline, qid))
+            if key is not None:
+                self._keys[key] = qid
+        return qid
+
+    def remove(self, qid: int) -> bool:
+        item = self._items.pop(qid, None)
+        if item is None:
+            return False
+        i = bisect.bisect_left(self._order, (item.deadline, qid))
+        del self._order[i]
+        if item.key is not None and self._keys.get(item.key) == qid:
+            del self._keys[item.key]
+        self._reconcile()
+        return True
+
+    def clear(self):
+        self._items.clear()
+        self._order.clear()
+        self._keys.clear()
+        self._reconcile()
+
+    def get(self, qid: int):
+        return self._items.get(qid)
+
+    def by_key(self, key):
+        qid = self._keys.get(key)
+        return None if qid is None else self._items[qid]
+
+    def pending(self) -> list:
+        return [self._items[qid] for _, qid in self._order]
+
+    def next(self):
+        """Ação efetiva seguinte (já resolvida a prioridade na janela), ou None."""
+        if not self._order:
+            return None
+        first = self._order[0][0]
+        best = None
+        limit = first + self.window
+        for deadline, qid in self._order:
+            if deadline > limit:
+                break
+            item = self._items[qid]
+            if best is None or item.priority > best.priority:
+                best = item
+        return best
+
+    def next_deadline(self):
+        return self._order[0][0] if self._order else None
+
+    def next_due(self):
+        """Quando `due()` passa a ter o que fazer: prazo + folga da primeira ação (ou None)."""
+        if not self._order:
+            return None
+        deadline, qid = self._order[0]
+        return deadline + self._items[qid].slack
+
+    def armed(self):
+        return self._armed
+
+    def restore(self, action: str, deadline: float, key=None, slack: float = 0.0) -> int:
+        """Recoloca uma ação recuperada (diário) sem enviar nada: o Windows já está armado."""
+        self._depth += 1
+        try:
+            qid = self.add(action, deadline, key=key, slack=slack)
+        finally:
+            self._depth -= 1
+        self._armed = self._desired()
+        return qid
+
+    def set_key(self, qid: int, key):
+        """Passa a identificar a ação `qid` por `key` (ex.: a ação recuperada que a janela acompanha).
+
+        `key=None` só desassocia: o próximo agendamento com a chave antiga não a substitui.
+        """
+        item = self._items[qid]
+        if item.key is not None and self._keys.get(item.key) == qid:
+            del self._keys[item.key]
+        if key is not None:
+            old = self._keys.pop(key, None)
+            if old is not None and old != qid:
+                self._items[old].key = None
+            self._keys[key] = qid
+        item.key = key
+
+    def fire_now(self, qid: int):
+        """Antecipa a ação `qid` para agora, sem folga (ex.: os ganchos terminaram no prazo):
+        o Windows é rearmado com `-t 0`. Retorna o resultado do último comando."""
+        item = self._items[qid]
+        with self.batch() as results:
+            self.remove(qid)
+            self.add(item.action, self.clock(), item.priority, item.key)
+        return self._result(results, ['-s', '-t', '0'])
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Agrupa alterações: só reconcilia (e envia comandos) ao sair do bloco mais externo.
+
+        Produz a lista dos resultados dos comandos enviados na reconciliação.
+        """
+        results = []
+        self._depth += 1
+        try:
+            yield results
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                results.extend(self._reconcile())
+
+    def due(self, now=None) -> list:
+        """Retira as ações vencidas. Hibernar/encerrar sessão são executadas aqui.
+
+        Retorna a lista de ações efetivas disparadas (as demais da mesma janela são consumidas).
+        """
+        now = self.clock() if now is None else now
+        fired = []
+        with self.batch():
+            while self._order and self.next_due() <= now:
+                item = self.next()
+                limit = self._order[0][0] + self.window
+                # A ação efetiva cobre todas as que caíram na mesma janela
+                while self._order and self._order[0][0] <= limit:
+                    self.remove(self._order[0][1])
+                if item.action in TIMED_ACTIONS:
+                    # Quem executa é o timer do Windows
+                    if self._armed is not None and self._armed[0] == item.action:
+                        self._armed = None
+                else:
+                    self.commands += 1
+                    self.backend.run_now(item.action)
+                fired.append(item)
+        return fired
+
+    # ---- reconciliação -------------------------------------------------------------------
+
+    def _desired(self):
+        item = self.next()
+        if item is None or item.action not in TIMED_ACTIONS:
+            return None
+        # Sempre no horário da primeira ação da janela (mais a folga da que vale)
+        return item.action, self._order[0][0] + item.slack
+
+    def _same(self, a, b) -> bool:
+        if a is None or b is None:
+            return a is b
+        return a[0] == b[0] and abs(a[1] - b[1]) <= self.tolerance
+
+    def _reconcile(self) -> list:
+        if self._depth:
+            return []
+        desired = self._desired()
+        if self._same(desired, self._armed):
+            return []
+        results = []
+        if self._armed is not None:
+            self.commands += 1
+            results.append(self.backend.cancel())
+            # Mesmo com erro (ex.: nada pendente no Windows) não há mais nada armado
+            self._armed = None
+        if desired is not None:
+            seconds = max(0, int(round(desired[1] - self.clock())))
+            self.commands += 1
+            completed = self.backend.schedule(seconds, desired[0])
+            results.append(completed)
+            if completed.returncode == 0:
+                self._armed = desired
+        return results
@@ -0,0 +1,301 @@
+"""Modo "esperar ficar ocioso": amostra CPU, disco e rede para adiar o desligamento.
+
+As leituras reaproveitam os mesmos recursos a cada amostra: no Linux os arquivos
+`/proc/stat`, `/proc/diskstats` e `/proc/net/dev` ficam abertos e são relidos com `pread`;
+no Windows a CPU vem de `GetSystemTimes` (buffers ctypes pré-alocados) e disco/rede do
+`psutil`, se estiver instalado. As médias móveis ficam em buffers circulares de tamanho
+fixo, com soma incremental (O(1) por amostra).
+
+Configuração no `config.json` (todos os campos são opcionais, exceto `enabled`):
+
+    "idle": {"enabled": true, "cpu": 20, "disk_mb": 5, "net_kb": 200,
+             "quiet_minutes": 10, "interval": 5, "window": 12, "max_defer_minutes": 240}
+
+Com o modo ligado, na hora de desligar o app confere se a atividade ficou abaixo de todos
+os limites durante `quiet_minutes`; se não, adia (cancela o `shutdown` pendente) e volta a
+armar assim que o sistema sossegar. Depois de `max_defer_minutes` adiando, desiste daquela
+ocorrência.
+"""
+import os
+import time
+
+try:
+    import psutil
+except ImportError:  # opcional: sem ele, no Windows só a CPU é considerada
+    psutil = None
+
+
+# Valores padrão do modo ocioso
+DEFAULT_CPU = 20.0             # % de uso médio
+DEFAULT_DISK_MB = 5.0          # MB/s lidos + escritos
+DEFAULT_NET_KB = 200.0         # KB/s recebidos + enviados
+DEFAULT_QUIET_MINUTES = 10.0
+DEFAULT_INTERVAL = 5.0         # segundos entre amostras
+DEFAULT_WINDOW = 12            # amostras na média móvel (12 x 5 s = 1 min)
+DEFAULT_MAX_DEFER_MINUTES = 240.0
+
+SECTOR_BYTES = 512
+# Dispositivos que não são discos físicos (ou duplicam a contagem dos discos de baixo)
+_VIRTUAL_DISKS = ('loop', 'ram', 'zram', 'dm-', 'md', 'sr', 'fd')
+
+
+class RingBuffer:
+    """Janela móvel de tamanho fixo com média O(1).
+
+    A soma é mantida incrementalmente e recalculada a cada volta completa, para não
+    acumular erro de ponto flutuante em execuções longas.
+    """
+
+    __slots__ = ('_data', '_pos', '_count', '_sum')
+
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError("tamanho da janela deve ser positivo")
+        self._data = [0.0] * size
+        self._pos = 0
+        self._count = 0
+        self._sum = 0.0
+
+    def __len__(self):
+        return self._count
+
+    def push(self, value: float):
+        data = self._data
+        pos = self._pos
+        if self._count == len(data):
+            self._sum -= data[pos]
+        else:
+            self._count += 1
+        data[pos] = value
+        self._sum += value
+        pos += 1
+        if pos == len(data):
+            pos = 0
+            self._sum = sum(data)
+        self._pos = pos
+
+    def mean(self) -> float:
+        return self._sum / self._count if self._count else 0.0
+
+    def clear(self):
+        self._pos = self._count = 0
+        self._sum = 0.0
+
+
+class LinuxCounters:
+    """Contadores acumulados lidos de `/proc` com os descritores abertos uma única vez."""
+
+    def __init__(self, proc: str = '/proc'):
+        self._stat = os.open(os.path.join(proc, 'stat'), os.O_RDONLY)
+        self._disk = self._net = None
+        try:
+            self._disk = os.open(os.path.join(proc, 'diskstats'), os.O_RDONLY)
+        except OSError:
+            pass
+        try:
+            self._net = os.open(os.path.join(proc, 'net', 'dev'), os.O_RDONLY)
+        except OSError:
+            pass
+        # nome do dispositivo -> é disco físico? (consulta /sys/block só na primeira vez)
+        self._physical = {}
+
+    def _is_physical(self, name: bytes) -> bool:
+        keep = self._physical.get(name)
+        if keep is None:
+            text = name.decode()
+            keep = self._physical[name] = (not text.startswith(_VIRTUAL_DISKS)
+                                           and os.path.isdir(f'/sys/block/{text}'))
+        return keep
+
+    def read(self):
+        """(cpu_ocupada, cpu_total, bytes_disco, bytes_rede); disco/rede None se indisponíveis."""
+        line = os.pread(self._stat, 256, 0).split(b'\n', 1)[0].split()
+        # user nice system idle iowait irq softirq steal (guest já está dentro de user)
+        ticks = [int(v) for v in line[1:9]]
+        total = sum(ticks)
+        busy = total - ticks[3] - ticks[4]
+
+        disk = None
+        if self._disk is not None:
+            disk = 0
+            for row in os.pread(self._disk, 65536, 0).splitlines():
+                fields = row.split()
+                if self._is_physical(fields[2]):
+                    # setores lidos + setores escritos
+                    disk += (int(fields[5]) + int(fields[9])) * SECTOR_BYTES
+
+        net = None
+        if self._net is not None:
+            net = 0
+            for row in os.pread(self._net, 65536, 0).splitlines()[2:]:
+                name, _, data = row.partition(b':')
+                if name.strip() == b'lo':
+                    continue
+                fields = data.split()
+                net += int(fields[0]) + int(fields[8])
+        return busy, total, disk, net
+
+    def close(self):
+        for fd in (self._stat, self._disk, self._net):
+            if fd is not None:
+                os.close(fd)
+        self._stat = self._disk = self._net = None
+
+
+class WindowsCounters:
+    """CPU por `GetSystemTimes` (sem abrir processo nem consultar WMI); disco/rede via psutil."""
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        self._times = [wintypes.FILETIME() for _ in range(3)]
+        self._refs = [ctypes.byref(t) for t in self._times]
+        self._get = ctypes.windll.kernel32.GetSystemTimes
+
+    def read(self):
+        if not self._get(*self._refs):
+            raise OSError("GetSystemTimes falhou")
+        idle, kernel, user = ((t.dwHighDateTime << 32) | t.dwLowDateTime for t in self._times)
+        # O tempo de kernel já inclui o ocioso
+        total = kernel + user
+        busy = total - idle
+        disk = net = None
+        if psutil is not None:
+            io = psutil.disk_io_counters()
+            if io is not None:
+                disk = io.read_bytes + io.write_bytes
+            nio = psutil.net_io_counters()
+            if nio is not None:
+                net = nio.bytes_recv + nio.bytes_sent
+        return busy, total, disk, net
+
+    def close(self):
+        pass
+
+
+def default_counters():
+    if os.name == 'nt':
+        return WindowsCounters()
+    return LinuxCounters()
+
+
+class ActivitySampler:
+    """Converte os contadores acumulados em taxas e guarda as médias móveis.
+
+    Cada `sample()` faz uma leitura; a primeira só serve de referência.
+    """
+
+    def __init__(self, counters=None, window: int = DEFAULT_WINDOW, clock=time.monotonic):
+        self.counters = counters if counters is not None else default_counters()
+        self.clock = clock
+        self.cpu = RingBuffer(window)      # %
+        self.disk = RingBuffer(window)     # bytes/s
+        self.net = RingBuffer(window)      # bytes/s
+        self.samples = 0
+        self._last = None
+
+    def sample(self):
+        """Lê os contadores. Retorna (cpu %, disco B/s, rede B/s) ou None na primeira leitura."""
+        now = self.clock()
+        busy, total, disk, net = self.counters.read()
+        last, self._last = self._last, (now, busy, total, disk, net)
+        self.samples += 1
+        if last is None or now <= last[0]:
+            return None
+        dt = now - last[0]
+        dtotal = total - last[2]
+        cpu = 100.0 * (busy - last[1]) / dtotal if dtotal > 0 else 0.0
+        disk_rate = (disk - last[3]) / dt if disk is not None and last[3] is not None else 0.0
+        net_rate = (net - last[4]) / dt if net is not None and last[4] is not None else 0.0
+        self.cpu.push(cpu)
+        self.disk.push(max(0.0, disk_rate))
+        self.net.push(max(0.0, net_rate))
+        return cpu, disk_rate, net_rate
+
+    def averages(self):
+        return self.cpu.mean(), self.disk.mean(), self.net.mean()
+
+    def reset(self):
+        self._last = None
+        for ring in (self.cpu, self.disk, self.net):
+            ring.clear()
+
+    def close(self):
+        self.counters.close()
+
+
+class IdleMonitor:
+    """Diz se a atividade ficou abaixo dos limites por `quiet` segundos seguidos.
+
+    `poll()` pode ser chamado com qualquer frequência: só amostra a cada `interval`.
+    """
+
+    def __init__(self, sampler=None, cpu: float = DEFAULT_CPU, disk: float = DEFAULT_DISK_MB * 1e6,
+                 net: float = DEFAULT_NET_KB * 1e3, quiet: float = DEFAULT_QUIET_MINUTES * 60,
+                 interval: float = DEFAULT_INTERVAL, max_defer: float = DEFAULT_MAX_DEFER_MINUTES * 60,
+                 clock=time.monotonic):
+        self.sampler = sampler if sampler is not None else ActivitySampler(clock=clock)
+        self.cpu = cpu
+        self.disk = disk
+        self.net = net
+        self.quiet = quiet
+        self.interval = interval
+        self.max_defer = max_defer
+        self.clock = clock
+        self.quiet_since = None
+        self._next_sample = None
+
+    @classmethod
+    def from_config(cls, cfg: dict):
+        """Monta o monitor a partir de `config['idle']`. Retorna None se o modo estiver desligado."""
+        idle = cfg.get('idle') or {}
+        if not idle.get('enabled'):
+            return None
+        sampler = ActivitySampler(window=int(idle.get('window', DEFAULT_WINDOW)))
+        return cls(sampler,
+                   cpu=float(idle.get('cpu', DEFAULT_CPU)),
+                   disk=float(idle.get('disk_mb', DEFAULT_DISK_MB)) * 1e6,
+                   net=float(idle.get('net_kb', DEFAULT_NET_KB)) * 1e3,
+                   quiet=float(idle.get('quiet_minutes', DEFAULT_QUIET_MINUTES)) * 60,
+                   interval=float(idle.get('interval', DEFAULT_INTERVAL)),
+                   max_defer=float(idle.get('max_defer_minutes', DEFAULT_MAX_DEFER_MINUTES)) * 60)
+
+    @property
+    def warmup(self) -> float:
+        """Quanto antes da decisão começar a amostrar: `quiet`, mais um intervalo para a leitura
+        de referência (a primeira não conta) e outro de folga para timers atrasados."""
+        return self.quiet + 2 * self.interval
+
+    def busy(self) -> bool:
+        cpu, disk, net = self.sampler.averages()
+        return cpu > self.cpu or disk > self.disk or net > self.net
+
+    def poll(self) -> float:
+        """Amostra se já deu o intervalo. Retorna em quantos segundos chamar de novo."""
+        now = self.clock()
+        if self._next_sample is not None and now < self._next_sample:
+            return self._next_sample - now
+        self._next_sample = now + self.interval
+        if self.sampler.sample() is not None:
+            if self.busy():
+                self.quiet_since = None
+            elif self.quiet_since is None:
+                self.quiet_since = now
+        return self.interval
+
+    def is_idle(self) -> bool:
+        return self.quiet_since is not None and self.clock() - self.quiet_since >= self.quiet
+
+    def describe(self) -> str:
+        cpu, disk, net = self.sampler.averages()
+        return f"CPU {cpu:.0f}%, disco {disk / 1e6:.1f} MB/s, rede {net / 1e3:.0f} KB/s"
+
+    def reset(self):
+        """Para de amostrar (ex.: nenhuma ocorrência próxima) e descarta o histórico."""
+        self.sampler.reset()
+        self.quiet_since = None
+        self._next_sample = None
+
+    def close(self):
+        self.sampler.close()
@@ -0,0 +1,62 @@
+"""Pastas do app por usuário.
+
+A pasta dos módulos não serve para gravar nada: no executável onefile ela é a pasta
+temporária `_MEI*`, recriada a cada execução, e numa instalação em `Program Files` nem
+permite escrita. Os arquivos que outra execução precisa encontrar ficam aqui. Só usa `os`
+(e `tempfile` quando não há pasta melhor) para não pesar na partida.
+"""
+import os
+
+
+APP_NAME = 'ShutdownScheduler'
+
+
+def _ensure(path: str) -> str:
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
+
+
+def _temp_dir() -> str:
+    # A pasta temporária do Linux é compartilhada entre usuários
+    name = APP_NAME + (f'-{os.getuid()}' if hasattr(os, 'getuid') else '')
+    if os.name != 'nt':
+        # Caminho comum sem importar `tempfile` (que puxa random e shutil)
+        try:
+            return _ensure(os.path.join(os.environ.get('TMPDIR') or '/tmp', name))
+        except OSError:
+            pass
+    import tempfile
+    return _ensure(os.path.join(tempfile.gettempdir(), name))
+
+
+def runtime_dir() -> str:
+    """Pasta para arquivos da execução atual (lock e porta da instância única).
+
+    Windows: `%LOCALAPPDATA%\\ShutdownScheduler`; Linux: `$XDG_RUNTIME_DIR/ShutdownScheduler`.
+    Sem elas (ou sem permissão), uma pasta por usuário dentro da pasta temporária do sistema.
+    """
+    base = os.environ.get('LOCALAPPDATA') if os.name == 'nt' else os.environ.get('XDG_RUNTIME_DIR')
+    if base:
+        try:
+            return _ensure(os.path.join(base, APP_NAME))
+        except OSError:
+            pass
+    return _temp_dir()
+
+
+def data_dir() -> str:
+    """Pasta persistente para dados do app (diário de agendamentos).
+
+    Windows: `%LOCALAPPDATA%\\ShutdownScheduler`; Linux: `$XDG_DATA_HOME/ShutdownScheduler`
+    (padrão `~/.local/share`). Sem nenhuma delas, a pasta de `runtime_dir()`.
+    """
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    if base and os.path.isabs(base):
+        try:
+            return _ensure(os.path.join(base, APP_NAME))
+        except OSError:
+            pass
+    return runtime_dir()
@@ -0,0 +1,190 @@
+"""Custo do amostrador de atividade e simulação do adiamento por sistema ocupado.
+
+1. Custo por amostra (CPU do processo em N leituras seguidas de /proc).
+2. Monitor real amostrando a cada `intervalo` segundos por alguns segundos: CPU gasta
+   medida com `time.process_time()`; falha se passar de 0,1% de um núcleo.
+3. Simulação com relógio e contadores falsos: o SchedulerDaemon adia uma ocorrência
+   enquanto a CPU está em 90% e só arma o shutdown depois de `quiet` minutos quietos.
+4. Máquina ociosa o tempo todo: nem o serviço nem o loop de ticks da janela (com timers do
+   Tk atrasando alguns ms) podem adiar. Para comparar, mostra o loop da janela começando a
+   amostrar só `quiet + interval` antes da decisão (sem folga).
+
+Uso:
+    python benchmarks/bench_activity.py [segundos] [intervalo]
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from activity import ActivitySampler, IdleMonitor, default_counters  # noqa: E402
+from command_executor import FakeBackend  # noqa: E402
+from countdown import Countdown  # noqa: E402
+from config_store import ConfigStore  # noqa: E402
+from daemon import SchedulerDaemon  # noqa: E402
+from schedule_journal import ScheduleJournal  # noqa: E402
+
+BUDGET = 0.001  # 0,1% de um núcleo
+# Igual a gui.IDLE_GUARD (o gui não importa sem customtkinter)
+IDLE_GUARD = 60
+
+
+def per_sample_cost(n: int = 20000) -> float:
+    sampler = ActivitySampler(default_counters())
+    t0 = time.process_time()
+    for _ in range(n):
+        sampler.sample()
+    cost = (time.process_time() - t0) / n
+    sampler.close()
+    return cost
+
+
+def live_overhead(seconds: float, interval: float):
+    monitor = IdleMonitor(interval=interval, quiet=60)
+    stop = threading.Event()
+    t0_cpu, t0 = time.process_time(), time.monotonic()
+    while not stop.wait(monitor.poll()):
+        if time.monotonic() - t0 >= seconds:
+            break
+    cpu = time.process_time() - t0_cpu
+    wall = time.monotonic() - t0
+    samples = monitor.sampler.samples
+    desc = monitor.describe()
+    monitor.close()
+    return cpu / wall, samples, desc
+
+
+class FakeClock:
+    def __init__(self):
+        self.mono = 1000.0
+        self.wall = 1_700_000_000.0
+
+    def monotonic(self):
+        return self.mono
+
+    def time(self):
+        return self.wall
+
+    def advance(self, seconds: float):
+        self.mono += seconds
+        self.wall += seconds
+
+
+class FakeCounters:
+    """CPU em `busy`% até `busy_until` (relógio de parede), depois 2%."""
+
+    def __init__(self, clock: FakeClock, busy_until: float, busy: float = 90.0):
+        self.clock = clock
+        self.busy_until = busy_until
+        self.busy = busy
+        self._t = clock.wall
+        self._busy_ticks = 0.0
+        self._total = 0.0
+
+    def read(self):
+        now = self.clock.wall
+        dt = now - self._t
+        self._t = now
+        frac = (self.busy if now <= self.busy_until else 2.0) / 100
+        self._busy_ticks += dt * 100 * frac
+        self._total += dt * 100
+        return int(self._busy_ticks), int(self._total), 0, 0
+
+    def close(self):
+        pass
+
+
+def simulate_deferral(busy_minutes: float = 45, quiet_minutes: float = 10, lead: float = 60):
+    clock = FakeClock()
+    # Ocorrência daqui a 2h (no minuto cheio); a CPU fica ocupada até 45 min depois dela
+    occurrence = (clock.wall // 60 + 120) * 60
+    busy_until = occurrence + busy_minutes * 60
+    when = time.localtime(occurrence)
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, 'config.json')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump({'rules': [f"{when.tm_hour:02d}:{when.tm_min:02d}"],
+                       'idle': {'enabled': True, 'quiet_minutes': quiet_minutes}}, f)
+        backend = FakeBackend()
+        journal = ScheduleJournal(os.path.join(tmp, 'j'))
+        daemon = SchedulerDaemon(backend, ConfigStore(config_path), journal, lead=lead,
+                                 monotonic=clock.monotonic, wall=clock.time)
+        daemon._reload(force=True)
+        # Troca os contadores reais pelos falsos, no relógio falso
+        idle = daemon._idle
+        idle.sampler = ActivitySampler(FakeCounters(clock, busy_until), clock=clock.monotonic)
+        idle.clock = clock.monotonic
+        steps = 0
+        armed_at = None
+        while clock.wall < max(busy_until, occurrence) + 3 * 3600 and steps < 100000:
+            timeout = daemon.step()
+            steps += 1
+            if backend.calls and armed_at is None:
+                armed_at = clock.wall + int(backend.calls[-1][-1])
+                break
+            clock.advance(timeout if timeout > 0 else 0.001)
+        journal.close()
+    return occurrence, busy_until, armed_at, steps, idle.sampler.samples
+
+
+def simulate_window_idle(lateness_ms: float = 2.0, warmup=None, quiet_minutes: float = 10,
+                         interval: float = 5.0, countdown: float = 20 * 60) -> bool:
+    """O loop de ticks de `gui.ShutdownScheduler` numa máquina ociosa. Retorna True se adiou."""
+    clock = FakeClock()
+    sampler = ActivitySampler(FakeCounters(clock, busy_until=0), clock=clock.monotonic)
+    monitor = IdleMonitor(sampler, quiet=quiet_minutes * 60, interval=interval, clock=clock.monotonic)
+    warmup = monitor.warmup if warmup is None else warmup
+    cd = Countdown(monotonic=clock.monotonic, wall=clock.time)
+    cd.start(countdown)
+    while True:
+        _, delay = cd.tick()
+        remaining = int(cd.remaining())
+        if delay is None:
+            return False
+        if remaining <= IDLE_GUARD + warmup:
+            monitor.poll()
+        if remaining <= IDLE_GUARD and not monitor.is_idle():
+            return True
+        clock.advance((delay + lateness_ms) / 1000)
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    interval = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    if not os.path.exists('/proc/stat'):
+        print("este benchmark precisa de /proc (Linux)")
+        return 1
+
+    cost = per_sample_cost()
+    print(f"custo por amostra: {cost * 1e6:.1f} µs de CPU "
+          f"({cost / 5.0 * 100:.4f}% a cada 5 s, {cost / interval * 100:.4f}% a cada {interval:g} s)")
+
+    share, samples, desc = live_overhead(seconds, interval)
+    passed = share < BUDGET
+    print(f"[{'ok' if passed else 'FALHOU'}] monitor real por {seconds:g}s ({samples} amostras, intervalo {interval:g}s): "
+          f"{share * 100:.4f}% de CPU (limite {BUDGET * 100:.1f}%); último: {desc}")
+
+    occurrence, busy_until, armed_at, steps, sim_samples = simulate_deferral()
+    expected = busy_until + 10 * 60 + 60
+    ok_sim = armed_at is not None and abs(armed_at - expected) <= 2 * 60
+    print(f"[{'ok' if ok_sim else 'FALHOU'}] simulação: ocorrência às +0 min, CPU ocupada até +{(busy_until - occurrence) / 60:.0f} min; "
+          f"shutdown para +{(armed_at - occurrence) / 60 if armed_at else float('nan'):.1f} min "
+          f"(esperado ~+{(expected - occurrence) / 60:.0f}), {steps} passos, {sim_samples} amostras")
+
+    occurrence, _, armed_at, _, _ = simulate_deferral(busy_minutes=-300)
+    ok_daemon_idle = armed_at is not None and abs(armed_at - occurrence) <= 1
+    deferred = [ms for ms in (0, 2, 20, 200) if simulate_window_idle(ms)]
+    before = [ms for ms in (0, 2, 20, 200) if simulate_window_idle(ms, warmup=10 * 60 + 5)]
+    ok_idle = ok_daemon_idle and not deferred
+    print(f"[{'ok' if ok_idle else 'FALHOU'}] máquina ociosa: serviço armou "
+          f"{'no horário' if ok_daemon_idle else 'com atraso'}; janela adiou com atraso de timer de "
+          f"{deferred or 'nenhum'} ms (0/2/20/200); sem a folga adiaria com {before or 'nenhum'} ms")
+    return 0 if passed and ok_sim and ok_idle else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
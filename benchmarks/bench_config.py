@@ -0,0 +1,97 @@
+"""Compara 10k gravações rápidas de configuração: `save_config` antigo vs `ConfigStore`.
+
+Conta as operações de arquivo (open, stat/exists, replace) de cada abordagem. O flush
+adiado do ConfigStore é disparado manualmente no fim, como faria o timer.
+
+Uso:
+    python benchmarks/bench_config.py [quantidade]
+"""
+import builtins
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_store import ConfigStore  # noqa: E402
+
+
+@contextlib.contextmanager
+def count_file_ops():
+    counts = {'open': 0, 'stat': 0, 'replace': 0}
+    # os.path.exists usa os.stat internamente, então já entra na contagem de 'stat'
+    originals = (builtins.open, os.stat, os.replace)
+
+    def wrap(name, func):
+        def inner(*args, **kwargs):
+            counts[name] += 1
+            return func(*args, **kwargs)
+        return inner
+
+    builtins.open = wrap('open', originals[0])
+    os.stat = wrap('stat', originals[1])
+    os.replace = wrap('replace', originals[2])
+    try:
+        yield counts
+    finally:
+        builtins.open, os.stat, os.replace = originals
+
+
+def legacy_save_config(path: str, cfg: dict):
+    # Cópia do save_config original: leitura completa + reescrita a cada chamada
+    data = {}
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception:
+            data = {}
+    data.update(cfg)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def run(n: int = 10_000) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, 'legacy.json')
+        with count_file_ops() as legacy_ops:
+            t0 = time.perf_counter()
+            for i in range(n):
+                legacy_save_config(legacy_path, {'daily_time': f"{i % 24:02d}:00", 'daily_enabled': True})
+            legacy_s = time.perf_counter() - t0
+
+        jobs = []
+        store = ConfigStore(os.path.join(tmp, 'config.json'), schedule=lambda ms, fn: jobs.append(fn) or fn, cancel=lambda job: None)
+        with count_file_ops() as store_ops:
+            t0 = time.perf_counter()
+            for i in range(n):
+                store.update({'daily_time': f"{i % 24:02d}:00", 'daily_enabled': True})
+            for fn in jobs:
+                fn()
+            store_s = time.perf_counter() - t0
+
+        with open(store.path, encoding='utf-8') as f:
+            assert json.load(f) == {'daily_time': f"{(n - 1) % 24:02d}:00", 'daily_enabled': True}
+
+    return {
+        'n': n,
+        'legacy_s': legacy_s,
+        'legacy_ops': legacy_ops,
+        'store_s': store_s,
+        'store_ops': store_ops,
+    }
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    r = run(n)
+    print(f"{r['n']} gravações")
+    print(f"  save_config antigo: {r['legacy_s']:.3f}s, operações de arquivo {r['legacy_ops']}")
+    print(f"  ConfigStore:        {r['store_s']:.3f}s, operações de arquivo {r['store_ops']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Mede o desvio da contagem regressiva em 24h simuladas com atraso aleatório nos ticks.
+
+Usa um relógio falso (monotônico + parede) e compara a contagem ancorada no prazo
+(`Countdown`) com a abordagem antiga de decrementar 1 por tick. Também simula uma
+suspensão de 1h no meio do caminho.
+
+Uso:
+    python benchmarks/bench_countdown.py [horas]
+"""
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from countdown import Countdown  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.mono = 1000.0
+        self.wall = 1_700_000_000.0
+
+    def monotonic(self):
+        return self.mono
+
+    def time(self):
+        return self.wall
+
+    def advance(self, seconds, suspended=False):
+        # Em suspensão o monotônico (Linux) não anda, o de parede sim
+        if not suspended:
+            self.mono += seconds
+        self.wall += seconds
+
+
+def run(hours: float = 24, seed: int = 42, max_jitter: float = 0.25) -> dict:
+    rnd = random.Random(seed)
+    clock = FakeClock()
+    total = int(hours * 3600)
+    cd = Countdown(monotonic=clock.monotonic, wall=clock.time)
+    cd.start(total)
+    true_deadline = clock.wall + total
+
+    naive_remaining = total
+    naive_elapsed = 0.0
+    suspend_at = total / 2
+    suspended = False
+    max_drift = 0
+    ticks = redraws = 0
+    delay = 0
+
+    while True:
+        text, delay = cd.tick()
+        ticks += 1
+        if text is not None:
+            redraws += 1
+        true_remaining = max(0, math.ceil(true_deadline - clock.wall))
+        shown = math.ceil(cd.deadline - clock.mono) if cd.deadline is not None else 0
+        max_drift = max(max_drift, abs(shown - true_remaining))
+        if delay is None:
+            break
+        step = delay / 1000.0 + rnd.uniform(0, max_jitter)
+        clock.advance(step)
+        if not suspended and clock.wall >= true_deadline - suspend_at:
+            clock.advance(3600, suspended=True)
+            suspended = True
+
+    # Abordagem antiga: after(1000) com o mesmo atraso, decrementando 1 por tick
+    rnd = random.Random(seed)
+    while naive_remaining > 0:
+        naive_remaining -= 1
+        naive_elapsed += 1.0 + rnd.uniform(0, max_jitter)
+    naive_drift = naive_elapsed - total
+
+    return {
+        'hours': hours,
+        'ticks': ticks,
+        'redraws': redraws,
+        'resyncs': cd.resyncs,
+        'max_drift_s': max_drift,
+        'final_error_s': clock.wall - true_deadline,
+        'naive_drift_s': naive_drift,
+    }
+
+
+def main():
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 24
+    r = run(hours)
+    print(f"{r['hours']}h simuladas: {r['ticks']} ticks, {r['redraws']} redesenhos, {r['resyncs']} ressincronizações")
+    print(f"desvio máximo exibido: {r['max_drift_s']}s; erro final: {r['final_error_s']:.3f}s")
+    print(f"abordagem antiga (decremento por tick): desvio de {r['naive_drift_s']:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Consumo do serviço ocioso: memória residente, CPU e despertares por hora (Linux).
+
+Sobe o SchedulerDaemon num processo separado, com backend falso, config e diário
+temporários e uma regra distante, e observa o processo por alguns segundos via /proc.
+Despertares = trocas de contexto voluntárias (cada vez que o processo volta a rodar).
+
+Antes, confere com relógio falso que um desligamento pendente no diário (da janela ou da
+linha de comando) não encobre uma ocorrência recorrente anterior a ele: o serviço arma a
+ocorrência, e depois dela o pendente volta a ser o armado no Windows.
+
+Uso:
+    python benchmarks/bench_daemon.py [segundos] [max_sleep]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DAEMON = '''
+import sys
+sys.path.insert(0, {root!r})
+from command_executor import FakeBackend
+from config_store import ConfigStore
+from daemon import SchedulerDaemon
+from schedule_journal import ScheduleJournal
+d = SchedulerDaemon(FakeBackend(), ConfigStore({config!r}), ScheduleJournal({journal!r}), max_sleep={max_sleep})
+print("pronto", flush=True)
+d.run()
+'''
+
+
+def read_proc(pid: int) -> dict:
+    info = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'voluntary_ctxt_switches', 'nonvoluntary_ctxt_switches'):
+                info[key] = int(value.split()[0])
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    ticks = os.sysconf('SC_CLK_TCK')
+    info['cpu_s'] = (int(fields[11]) + int(fields[12])) / ticks
+    return info
+
+
+def check_pending_vs_rule() -> bool:
+    sys.path.insert(0, ROOT)
+    from command_executor import FakeBackend
+    from config_store import ConfigStore
+    from daemon import SchedulerDaemon
+    from schedule_journal import ScheduleJournal
+
+    clock = {'wall': (time.time() // 3600 + 24) * 3600}
+    wall = lambda: clock['wall']  # noqa: E731
+    rule = time.localtime(clock['wall'] + 30 * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        config = os.path.join(tmp, 'config.json')
+        with open(config, 'w', encoding='utf-8') as f:
+            json.dump({'rules': [f"{rule.tm_hour:02d}:{rule.tm_min:02d}"]}, f)
+        journal = ScheduleJournal(os.path.join(tmp, 'j'))
+        # Pendentes de fora do serviço: 3h e 2h à frente (o mais próximo é o que vale)
+        late = journal.schedule(clock['wall'] + 3 * 3600)
+        journal.schedule(clock['wall'] + 2 * 3600)
+        backend = FakeBackend()
+        daemon = SchedulerDaemon(backend, ConfigStore(config), journal, max_sleep=900,
+                                 monotonic=wall, wall=wall)
+        daemon._restore()
+        daemon._reload(force=True)
+        restored = daemon.armed_deadline() - clock['wall']
+        end = clock['wall'] + 150 * 60
+        while clock['wall'] < end:
+            clock['wall'] += max(daemon.step(), 0.001)
+        pending = journal.replay()
+        journal.close()
+    sent = [c for c in backend.calls if c[0] == '-s']
+    # Regra (-t 60), depois o de +2h (faltando 90 min) e por fim o de +3h
+    ok = (restored == 2 * 3600 and [int(c[-1]) for c in sent] == [60, 5400, 3600]
+          and list(pending) == [late])
+    print(f"[{'ok' if ok else 'FALHOU'}] pendentes em +2h/+3h e regra em +30min: mais próximo recuperado em "
+          f"+{restored / 3600:g}h; comandos {backend.calls}; pendentes no fim {len(pending)}")
+    return ok
+
+
+def check_hooks_at_deadline() -> bool:
+    sys.path.insert(0, ROOT)
+    from command_executor import FakeBackend
+    from config_store import ConfigStore
+    from daemon import SchedulerDaemon
+
+    clock = {'wall': (time.time() // 3600 + 24) * 3600}
+    wall = lambda: clock['wall']  # noqa: E731
+    rule = time.localtime(clock['wall'] + 30 * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        config = os.path.join(tmp, 'config.json')
+        marker = os.path.join(tmp, 'rodou')
+        with open(config, 'w', encoding='utf-8') as f:
+            json.dump({'rules': [f"{rule.tm_hour:02d}:{rule.tm_min:02d}"],
+                       'hooks': [{'name': 'marca', 'command': f"touch {marker}", 'timeout': 5}],
+                       'hooks_deadline': 30}, f)
+        backend = FakeBackend()
+        daemon = SchedulerDaemon(backend, ConfigStore(config), max_sleep=900, monotonic=wall, wall=wall,
+                                 use_journal=False)
+        daemon._reload(force=True)
+        ran_early = None
+        end = clock['wall'] + 40 * 60
+        while clock['wall'] < end:
+            clock['wall'] += max(daemon.step(), 0.001)
+            if ran_early is None and backend.calls:
+                ran_early = os.path.exists(marker)
+        ran = os.path.exists(marker)
+    # Armado com a folga dos ganchos (60 + 30 s); no horário, ganchos e então -t 0
+    ok = (backend.calls == [['-s', '-t', '90'], ['-a'], ['-s', '-t', '0']]
+          and ran_early is False and ran and daemon.fires == 1)
+    print(f"[{'ok' if ok else 'FALHOU'}] regra com ganchos: comandos {backend.calls}; "
+          f"ganchos ao armar {ran_early}, no horário {ran}")
+    return ok
+
+
+def main():
+    ok = check_pending_vs_rule()
+    ok = check_hooks_at_deadline() and ok
+    if not os.path.exists('/proc/self/status'):
+        print("este benchmark precisa de /proc (Linux)")
+        return 1
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 20
+    max_sleep = float(sys.argv[2]) if len(sys.argv) > 2 else 900
+    with tempfile.TemporaryDirectory() as tmp:
+        config = os.path.join(tmp, 'config.json')
+        with open(config, 'w', encoding='utf-8') as f:
+            json.dump({'rules': [{'cron': '0 3 1 1 *'}]}, f)
+        script = DAEMON.format(root=ROOT, config=config, journal=os.path.join(tmp, 'j'), max_sleep=max_sleep)
+        proc = subprocess.Popen([sys.executable, '-c', script], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        try:
+            proc.stdout.readline()
+            time.sleep(1.0)  # deixa a inicialização terminar
+            before = read_proc(proc.pid)
+            time.sleep(seconds)
+            after = read_proc(proc.pid)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    wakeups = after['voluntary_ctxt_switches'] - before['voluntary_ctxt_switches']
+    cpu = after['cpu_s'] - before['cpu_s']
+    print(f"RSS ocioso: {after['VmRSS'] / 1024:.1f} MiB")
+    print(f"CPU em {seconds:.0f}s ocioso: {cpu * 1000:.0f} ms ({cpu / seconds * 100:.3f}%)")
+    print(f"despertares: {wakeups} em {seconds:.0f}s -> {wakeups * 3600 / seconds:.0f}/h "
+          f"(esperado pelo max_sleep={max_sleep:.0f}s: {3600 / max_sleep:.0f}/h)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+"""Despacho em frota contra agentes simulados no loopback.
+
+Sobe N agentes (backend falso) num processo separado, gera o inventário e mede
+schedule/status/cancel para todas as máquinas. Algumas entradas apontam para portas
+fechadas e para agentes lentos, para exercitar novas tentativas e timeouts.
+
+Antes, confere num agente local que um `schedule` repetido depois de um timeout não chega
+duas vezes ao `shutdown` e que um pedido assinado não pode ser reenviado nem alterado.
+
+Uso:
+    python benchmarks/bench_fleet.py [máquinas]
+"""
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from command_executor import FakeBackend  # noqa: E402
+from fleet import FAILED, OK, FleetAgent, FleetDispatcher, load_inventory, sign  # noqa: E402
+
+AGENTS = '''
+import asyncio, json, sys
+sys.path.insert(0, {root!r})
+from command_executor import FakeBackend
+from fleet import FleetAgent
+
+async def main():
+    servers = []
+    ports = []
+    for i in range({n}):
+        agent = FleetAgent(FakeBackend(), token='bench', latency=2.0 if i < {slow} else 0.0)
+        server = await agent.serve('127.0.0.1', 0)
+        servers.append(server)
+        ports.append(server.sockets[0].getsockname()[1])
+    print(json.dumps(ports), flush=True)
+    await asyncio.Event().wait()
+
+asyncio.run(main())
+'''
+
+
+def _raise_fd_limit():
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def _closed_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+async def run_dispatch(hosts):
+    d = FleetDispatcher(hosts, concurrency=200, timeout=1.0, retries=1, token='bench')
+    results = {}
+    try:
+        for op, params in (('schedule', {'seconds': 1800}), ('status', {}), ('cancel', {})):
+            t0 = time.perf_counter()
+            await d.dispatch(op, **params)
+            results[op] = (time.perf_counter() - t0, d.summary())
+    finally:
+        await d.close()
+    return results
+
+
+async def check_agent():
+    """Agente lento (0.3s) e console com timeout de 0.2s: a segunda tentativa pega o mesmo resultado."""
+    backend = FakeBackend()
+    agent = FleetAgent(backend, token='bench', latency=0.3)
+    server = await agent.serve('127.0.0.1', 0)
+    target = ('127.0.0.1', server.sockets[0].getsockname()[1])
+    d = FleetDispatcher([target], timeout=0.2, retries=2, token='bench')
+    try:
+        status = (await d.dispatch('schedule', seconds=1800))[d.name(target)]
+        request = sign({'op': 'cancel', 'id': 'x'}, 'bench')
+        replies = [await agent._process(dict(request)),
+                   await agent._process(dict(request)),  # mesmo nonce
+                   await agent._process(dict(sign({'op': 'cancel', 'id': 'y'}, 'bench'), op='schedule', seconds=1)),
+                   await agent._process(sign({'op': 'cancel', 'id': 'z'}, 'errado'))]
+    finally:
+        await d.close()
+        server.close()
+        await server.wait_closed()
+    retried = status.state == OK and status.attempts > 1 and backend.calls[:1] == [['-s', '-t', '1800']]
+    ok = retried and backend.calls.count(['-s', '-t', '1800']) == 1 and [r['ok'] for r in replies] == [True, False, False, False]
+    print(f"[{'ok' if ok else 'FALHOU'}] schedule com timeout e {status.attempts} tentativas: comandos {backend.calls}; "
+          f"assinado/repetido/alterado/segredo errado: {[r['ok'] for r in replies]}")
+    return ok
+
+
+def main():
+    if not asyncio.run(check_agent()):
+        return 1
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    slow, dead = 5, 5
+    _raise_fd_limit()
+    proc = subprocess.Popen([sys.executable, '-c', AGENTS.format(root=ROOT, n=n - dead, slow=slow)],
+                            stdout=subprocess.PIPE, text=True, preexec_fn=_raise_fd_limit if os.name == 'posix' else None)
+    try:
+        ports = json.loads(proc.stdout.readline())
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write("# inventário gerado pelo benchmark\n")
+            for port in ports:
+                f.write(f"127.0.0.1:{port}\n")
+            for _ in range(dead):
+                f.write(f"127.0.0.1:{_closed_port()}\n")
+        hosts = load_inventory(f.name)
+        os.unlink(f.name)
+
+        results = asyncio.run(run_dispatch(hosts))
+        for op, (elapsed, counts) in results.items():
+            print(f"{op:8s} {len(hosts)} máquinas em {elapsed:.2f}s  ok={counts[OK]} falhou={counts[FAILED]}")
+    finally:
+        proc.kill()
+        proc.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
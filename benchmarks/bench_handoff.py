@@ -0,0 +1,91 @@
+"""Tempo de encaminhamento para a instância em execução.
+
+Sobe uma instância principal "sem janela" (só o InstanceServer) num processo separado e
+mede quanto leva uma segunda execução (`shutdown_scheduler.py schedule 30m` e a abertura da
+janela sem argumentos) para entregar o pedido e sair.
+
+Uso:
+    python benchmarks/bench_handoff.py [execuções]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY = os.path.join(ROOT, 'shutdown_scheduler.py')
+BUDGET_MS = 50.0
+
+PRIMARY = '''
+import sys, time
+sys.path.insert(0, {root!r})
+import single_instance
+server = single_instance.acquire()
+if server is None:
+    print("lock ocupado", flush=True)
+    raise SystemExit(1)
+print("pronto", flush=True)
+try:
+    while True:
+        for argv in server.drain():
+            print(repr(argv), flush=True)
+        time.sleep(0.01)
+finally:
+    server.close()
+'''
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    primary = subprocess.Popen([sys.executable, '-c', PRIMARY.format(root=ROOT)], stdout=subprocess.PIPE, text=True)
+    try:
+        if primary.stdout.readline().strip() != "pronto":
+            print("não foi possível virar a instância principal (outra janela aberta?)")
+            return 1
+        results = {}
+        for label, argv in (('schedule 30m', ['schedule', '30m']), ('abrir janela', [])):
+            times = []
+            for _ in range(runs):
+                t0 = time.perf_counter()
+                proc = subprocess.run([sys.executable, ENTRY, *argv], capture_output=True, text=True)
+                times.append((time.perf_counter() - t0) * 1000)
+                assert proc.returncode == 0, proc.stderr
+                received = primary.stdout.readline().strip()
+                assert received == repr(argv), received
+            results[label] = statistics.median(times)
+
+        # Custo do encaminhamento em si, sem a partida do interpretador
+        sys.path.insert(0, ROOT)
+        import single_instance
+        times = []
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            assert single_instance.forward(['cancel'])
+            times.append((time.perf_counter() - t0) * 1000)
+            primary.stdout.readline()
+        forward_ms = statistics.median(times)
+    finally:
+        primary.kill()
+        primary.wait()
+
+    baseline = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'])
+        baseline.append((time.perf_counter() - t0) * 1000)
+    base_ms = statistics.median(baseline)
+
+    print(f"python vazio (referência): {base_ms:.1f} ms")
+    for label, ms in results.items():
+        print(f"{label:14s} processo inteiro {ms:.1f} ms (acima do python vazio: {ms - base_ms:.1f} ms)")
+    print(f"forward() isolado: {forward_ms:.2f} ms")
+    worst = max(results.values()) - base_ms
+    if worst > BUDGET_MS:
+        print(f"FALHA: encaminhamento levou {worst:.1f} ms além da partida do python (orçamento {BUDGET_MS:.0f} ms)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,142 @@
+"""Roda a etapa pré-desligamento com ganchos sintéticos lentos, com falha e travados.
+
+Mistura funções Python (`time.sleep`) e comandos externos (`sleep`/`sh`, Linux), com uma
+cadeia de dependências, um gancho que falha, um que estoura o próprio limite e um opcional
+lento. Confere que a etapa dura só o caminho obrigatório mais lento (e não a soma nem o
+opcional), que dependentes de uma falha são pulados e que o prazo global corta o resto.
+
+Também confere o momento dos ganchos: o Windows fica armado para o prazo + folga e, no
+prazo, os ganchos rodam e o desligamento é rearmado com `-t 0`. E que cancelar com os
+ganchos em andamento não espera por eles: a janela roda ganchos + disparo e o `shutdown -a`
+no mesmo worker, e o cancelamento marca `stop`.
+
+Uso:
+    python benchmarks/bench_hooks.py
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from action_queue import ActionQueue  # noqa: E402
+from command_executor import CommandExecutor, FakeBackend  # noqa: E402
+from shutdown_hooks import (  # noqa: E402
+    ABANDONED, FAILED, OK, SKIPPED, TIMEOUT, Hook, HookPipeline, arm_slack, fire_with_hooks,
+)
+
+TOLERANCE = 0.25
+# Do clique em Cancelar até o resultado do cancelamento voltar, com um gancho obrigatório de 3 s rodando
+CANCEL_BUDGET = 0.5
+
+
+def sleeper(seconds: float):
+    def func():
+        time.sleep(seconds)
+    return func
+
+
+def failing():
+    time.sleep(0.1)
+    raise RuntimeError("disco cheio")
+
+
+def scenario_main():
+    hooks = [
+        Hook('cache', func=sleeper(0.3)),
+        Hook('sync', command=['sleep', '0.6'], timeout=5),
+        Hook('servico', func=sleeper(0.4), after=['cache']),           # caminho: 0.3 + 0.4 = 0.7
+        Hook('indice', func=failing),
+        Hook('depois-indice', func=sleeper(0.1), after=['indice']),     # pulado
+        Hook('travado', command='sleep 30', timeout=0.5),               # tempo esgotado (processo morto)
+        Hook('avisar', func=sleeper(3.0), required=False),              # abandonado
+    ]
+    report = HookPipeline(hooks, deadline=10).run()
+    states = {r.name: r.state for r in report.results}
+    expected = {'cache': OK, 'sync': OK, 'servico': OK, 'indice': FAILED,
+                'depois-indice': SKIPPED, 'travado': TIMEOUT, 'avisar': ABANDONED}
+    return report, states == expected and 0.7 <= report.elapsed <= 0.7 + TOLERANCE, 0.7, 0.3 + 0.6 + 0.4 + 0.1 + 0.5 + 3.0
+
+
+def scenario_deadline():
+    hooks = [
+        Hook('rapido', func=sleeper(0.1)),
+        Hook('lento', command=['sleep', '5'], timeout=10),
+        Hook('depois', func=sleeper(0.1), after=['lento']),
+    ]
+    report = HookPipeline(hooks, deadline=0.5).run()
+    states = {r.name: r.state for r in report.results}
+    expected = {'rapido': OK, 'lento': TIMEOUT, 'depois': SKIPPED}
+    return report, states == expected and 0.5 <= report.elapsed <= 0.5 + TOLERANCE, 0.5, 5.2
+
+
+def scenario_fanout(n: int = 200):
+    # Muitos ganchos curtos: o custo de orquestração por gancho deve ser pequeno
+    hooks = [Hook(f'h{i}', func=sleeper(0.05), after=[f'h{i - 8}'] if i >= 8 else ()) for i in range(n)]
+    report = HookPipeline(hooks, deadline=60, max_workers=8).run()
+    ideal = 0.05 * (n // 8)
+    return report, report.ok and report.elapsed <= ideal * 1.5 + TOLERANCE, ideal, 0.05 * n
+
+
+def main():
+    failures = 0
+    for name, scenario in (('principal', scenario_main), ('prazo global', scenario_deadline),
+                           ('200 ganchos', scenario_fanout)):
+        report, passed, ideal, serial = scenario()
+        failures += not passed
+        print(f"[{'ok' if passed else 'FALHOU'}] {name}: {report.elapsed:.3f}s "
+              f"(esperado ~{ideal:.2f}s; em série seria {serial:.2f}s)")
+        if name != '200 ganchos':
+            for line in report.lines()[:-1]:
+                print(f"    {line}")
+
+    # Agendar arma o Windows com a folga; no prazo, os ganchos rodam e ele é rearmado com -t 0
+    backend = FakeBackend()
+    queue = ActionQueue(backend)
+    pipeline = HookPipeline([Hook('a', func=sleeper(1.2))], deadline=120)
+    queue.schedule(60, slack=arm_slack(pipeline))
+    armed = list(backend.calls)
+    completed, report = fire_with_hooks(queue, queue.next().id, pipeline)
+    fired = backend.calls[len(armed):]
+    passed = (completed.returncode == 0 and armed == [['-s', '-t', '180']]
+              and fired == [['-a'], ['-s', '-t', '0']] and queue.next_due() <= time.time())
+    failures += not passed
+    print(f"[{'ok' if passed else 'FALHOU'}] agendar 60s com prazo de ganchos de 120s -> {armed}; "
+          f"no prazo, ganchos de {report.elapsed:.2f}s e depois {fired}")
+
+    waited, calls, report = cancel_during_hooks()
+    # O -t 0 nunca chega a ser enviado: depois do agendamento, só o `-a` do cancelamento
+    passed = (waited <= CANCEL_BUDGET and calls == [['-s', '-t', '3720'], ['-a']]
+              and report.results[0].state == ABANDONED)
+    failures += not passed
+    print(f"[{'ok' if passed else 'FALHOU'}] cancelar com gancho de 3s rodando: {waited:.2f}s até o cancelamento "
+          f"voltar (meta {CANCEL_BUDGET:g}s; sem `stop` seriam ~3s); comandos enviados {calls}")
+    return 1 if failures else 0
+
+
+def cancel_during_hooks():
+    """Mesma sequência da janela: agenda com folga, no prazo ganchos + disparo no worker, depois Cancelar."""
+    backend = FakeBackend()
+    queue = ActionQueue(backend)
+    executor = CommandExecutor(queue)
+    stop = threading.Event()
+    hooks_done = []
+    pipeline = HookPipeline([Hook('lento', func=sleeper(3), timeout=60)], deadline=120)
+    queue.schedule(3600, key='gui', slack=arm_slack(pipeline))
+    executor.submit(fire_with_hooks, queue, queue.by_key('gui').id, pipeline, stop,
+                    callback=lambda res, err: hooks_done.append(res))
+    cancelled = []
+    time.sleep(0.2)
+    t0 = time.perf_counter()
+    stop.set()
+    executor.cancel(callback=lambda res, err: cancelled.append(time.perf_counter()))
+    while len(cancelled) < 1 and time.perf_counter() - t0 < 10:
+        executor.poll()
+        time.sleep(0.005)
+    executor.close()
+    return cancelled[0] - t0, backend.calls, hooks_done[0][1]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,184 @@
+"""Recuperação do diário de agendamentos: tempo de replay e queda no meio da escrita.
+
+1. Gera um diário de 1M eventos (agendar/cancelar/disparar, sem compactação) e mede o replay.
+2. Mede também o pior caso: um agendamento pendente desde o primeiro registro.
+3. Inicia um processo que grava eventos sem parar, mata-o com SIGKILL, acrescenta um
+   registro truncado e confere que o replay bate com uma leitura completa de referência.
+4. Dois gravadores no mesmo diário (como a janela e o serviço): primeiro dois objetos no
+   mesmo processo (o disparo de um não pode apagar o agendamento do outro), depois dois
+   processos gravando ao mesmo tempo, com compactação, conferindo ids únicos e o replay.
+
+Uso:
+    python benchmarks/bench_journal.py [eventos]
+"""
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from schedule_journal import MAGIC, OP_SCHEDULE, RECORD, ScheduleJournal  # noqa: E402
+
+
+def write_journal(path: str, n: int, keep_first: bool = False, seed: int = 1):
+    rnd = random.Random(seed)
+    j = ScheduleJournal(path, compact_every=0)
+    now = time.time()
+    open_ids = []
+    if keep_first:
+        j.schedule(now + 86400)
+    for _ in range(n - (1 if keep_first else 0)):
+        if open_ids and (len(open_ids) > 3 or rnd.random() < 0.5):
+            rid = open_ids.pop(rnd.randrange(len(open_ids)))
+            (j.cancel if rnd.random() < 0.8 else j.fire)(rid)
+        else:
+            open_ids.append(j.schedule(now + rnd.uniform(60, 86400)))
+    j.close()
+    return j.pending()
+
+
+def reference_replay(path: str) -> dict:
+    # Leitura completa, registro a registro, sem usar o índice do mais antigo
+    pending = {}
+    with open(path, 'rb') as f:
+        data = f.read()
+    for off in range(0, len(data) - RECORD.size + 1, RECORD.size):
+        op, action, magic, _, rid, _, deadline = RECORD.unpack_from(data, off)
+        if magic != MAGIC:
+            continue
+        if op == OP_SCHEDULE:
+            pending[rid] = ('shutdown', deadline)
+        else:
+            pending.pop(rid, None)
+    return pending
+
+
+def time_replay(path: str):
+    t0 = time.perf_counter()
+    state = ScheduleJournal(path, compact_every=0).replay()
+    return time.perf_counter() - t0, state
+
+
+WRITER = '''
+import sys, time
+sys.path.insert(0, {root!r})
+from schedule_journal import ScheduleJournal
+j = ScheduleJournal({path!r}, compact_every=0)
+j.replay()
+ids = []
+i = 0
+while True:
+    if len(ids) > 5:
+        j.cancel(ids.pop(0))
+    ids.append(j.schedule(time.time() + 3600 + i))
+    i += 1
+'''
+
+
+def crash_test(tmp: str) -> dict:
+    path = os.path.join(tmp, 'crash.journal')
+    proc = subprocess.Popen([sys.executable, '-c', WRITER.format(root=ROOT, path=path)])
+    time.sleep(0.5)
+    proc.send_signal(signal.SIGKILL)
+    proc.wait()
+    # Simula um registro escrito pela metade
+    with open(path, 'ab') as f:
+        f.write(b'\x01' * (RECORD.size // 2))
+    expected = reference_replay(path)
+    state = ScheduleJournal(path, compact_every=0).replay()
+    ok = state == expected and os.path.getsize(path) % RECORD.size == 0
+    # Depois da recuperação o diário continua utilizável
+    j = ScheduleJournal(path, compact_every=0)
+    j.replay()
+    rid = j.schedule(time.time() + 60)
+    j.close()
+    ok = ok and rid in ScheduleJournal(path, compact_every=0).replay()
+    return {'records': os.path.getsize(path) // RECORD.size, 'pending': len(state), 'ok': ok}
+
+
+CONCURRENT_WRITER = '''
+import json, random, sys, time
+sys.path.insert(0, {root!r})
+from schedule_journal import ScheduleJournal
+j = ScheduleJournal({path!r}, compact_every=50)
+j.replay()
+rnd = random.Random({seed})
+mine, issued = [], []
+for _ in range({ops}):
+    if mine and rnd.random() < 0.5:
+        rid = mine.pop(rnd.randrange(len(mine)))
+        (j.cancel if rnd.random() < 0.7 else j.fire)(rid)
+    else:
+        rid = j.schedule(time.time() + 3600, 'shutdown')
+        mine.append(rid)
+        issued.append(rid)
+j.close()
+print(json.dumps({{'pending': mine, 'issued': issued}}))
+'''
+
+
+def two_writers_test(tmp: str, ops: int = 2000) -> dict:
+    # Mesmo processo: janela agenda, serviço agenda e dispara o seu
+    path = os.path.join(tmp, 'shared.journal')
+    window, daemon = ScheduleJournal(path), ScheduleJournal(path)
+    window.replay()
+    daemon.replay()
+    a = window.schedule(time.time() + 600)
+    b = daemon.schedule(time.time() + 900)
+    daemon.fire(b)
+    ok = a != b and set(ScheduleJournal(path).replay()) == {a}
+    window.cancel(a)
+    ok = ok and ScheduleJournal(path).replay() == {}
+    window.close()
+    daemon.close()
+
+    # Dois processos ao mesmo tempo, com compactação a cada 50 registros
+    path = os.path.join(tmp, 'concurrent.journal')
+    procs = [subprocess.Popen([sys.executable, '-c', CONCURRENT_WRITER.format(root=ROOT, path=path, seed=seed, ops=ops)],
+                              stdout=subprocess.PIPE, text=True) for seed in (1, 2)]
+    outputs = [p.communicate()[0] for p in procs]
+    if any(p.returncode != 0 for p in procs):
+        return {'issued': 0, 'pending': 0, 'ok': False}
+    results = [json.loads(out) for out in outputs]
+    issued = [rid for r in results for rid in r['issued']]
+    expected = {rid for r in results for rid in r['pending']}
+    state = ScheduleJournal(path).replay()
+    ok = ok and len(issued) == len(set(issued)) and set(state) == expected
+    return {'issued': len(issued), 'pending': len(state), 'ok': ok}
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'typical.journal')
+        expected = write_journal(path, n)
+        elapsed, state = time_replay(path)
+        assert state == expected
+        print(f"replay de {n} eventos: {elapsed * 1000:.2f} ms ({len(state)} pendentes)")
+
+        path = os.path.join(tmp, 'worst.journal')
+        expected = write_journal(path, n, keep_first=True)
+        elapsed, state = time_replay(path)
+        assert state == expected
+        print(f"pior caso (pendente desde o 1º registro, sem compactação): {elapsed * 1000:.0f} ms")
+
+        r = crash_test(tmp)
+        print(f"queda durante escrita: {r['records']} registros, {r['pending']} pendentes, consistente={r['ok']}")
+        if not r['ok']:
+            raise SystemExit(1)
+
+        r = two_writers_test(tmp)
+        print(f"dois gravadores no mesmo diário: {r['issued']} ids emitidos, {r['pending']} pendentes, "
+              f"consistente={r['ok']}")
+        if not r['ok']:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
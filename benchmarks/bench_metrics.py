@@ -0,0 +1,188 @@
+"""Custo da instrumentação (`metrics`) desligada e ligada.
+
+1. ns por chamada de `timed()`, `observe()`, `event()` e de um callback decorado com
+   `ui_callback`, com a camada desligada e ligada, contra o mesmo código sem instrumentação.
+2. `Countdown.tick` em 24h simuladas (um tick por segundo) com a camada desligada e ligada.
+3. Endpoint: sobe o servidor numa porta livre e confere `/metrics` e `/events`.
+4. Rotação: grava eventos suficientes para girar o JSONL e confere os arquivos.
+
+Uso:
+    python benchmarks/bench_metrics.py [repetições]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics  # noqa: E402
+from countdown import Countdown  # noqa: E402
+
+# Com a camada desligada, cada chamada pode custar no máximo isto acima do código puro
+# (os pontos instrumentados rodam no máximo algumas vezes por segundo)
+DISABLED_BUDGET_NS = 1000
+
+
+def _ns_per_call(func, n: int) -> float:
+    t0 = time.perf_counter()
+    func(n)
+    return (time.perf_counter() - t0) / n * 1e9
+
+
+def _baseline(n):
+    for _ in range(n):
+        pass
+
+
+def _timed(n):
+    for _ in range(n):
+        with metrics.timed('command_seconds', '-s'):
+            pass
+
+
+def _observe(n):
+    for _ in range(n):
+        metrics.observe('countdown_drift_seconds', 0.001)
+
+
+def _event(n):
+    for i in range(n):
+        metrics.event('scheduled', source='bench', seconds=i)
+
+
+def _plain_callback():
+    return None
+
+
+@metrics.ui_callback('bench')
+def _decorated_callback():
+    return None
+
+
+def _callback_plain(n):
+    for _ in range(n):
+        _plain_callback()
+
+
+def _callback_decorated(n):
+    for _ in range(n):
+        _decorated_callback()
+
+
+def call_costs(n: int) -> dict:
+    out = {}
+    for state in ('desligada', 'ligada'):
+        if state == 'ligada':
+            metrics.enable(None, flusher=False)
+        else:
+            metrics.disable()
+        base = _ns_per_call(_baseline, n)
+        plain = _ns_per_call(_callback_plain, n)
+        out[state] = {
+            'timed': _ns_per_call(_timed, n) - base,
+            'observe': _ns_per_call(_observe, n) - base,
+            'event': _ns_per_call(_event, n) - base,
+            'ui_callback': _ns_per_call(_callback_decorated, n) - plain,
+        }
+    metrics.disable()
+    return out
+
+
+class FakeClock:
+    def __init__(self):
+        self.mono = 1000.0
+        self.wall = 1_700_000_000.0
+
+    def monotonic(self):
+        return self.mono
+
+    def time(self):
+        return self.wall
+
+
+def countdown_run(hours: float = 24) -> float:
+    clock = FakeClock()
+    cd = Countdown(monotonic=clock.monotonic, wall=clock.time)
+    cd.start(hours * 3600)
+    t0 = time.perf_counter()
+    ticks = 0
+    while True:
+        _, delay = cd.tick()
+        ticks += 1
+        if delay is None:
+            break
+        clock.mono += delay / 1000.0 + 0.003
+        clock.wall += delay / 1000.0 + 0.003
+    return (time.perf_counter() - t0) / ticks * 1e9
+
+
+def check_endpoint() -> bool:
+    m = metrics.enable(None, port=0, flusher=False)
+    if m._server is None:
+        metrics.disable()
+        return False
+    port = m._server.server_address[1]
+    with metrics.timed('command_seconds', '-s'):
+        time.sleep(0.002)
+    metrics.event('scheduled', source='bench', seconds=60)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as r:
+            text = r.read().decode('utf-8')
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/events", timeout=5) as r:
+            events = json.loads(r.read().decode('utf-8'))
+    finally:
+        metrics.disable()
+    return ('shutdown_scheduler_command_seconds_count{op="-s"} 1' in text
+            and 'shutdown_scheduler_events_total{event="scheduled"} 1' in text
+            and events and events[-1]['event'] == 'scheduled')
+
+
+def check_rotation() -> bool:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'events.jsonl')
+        metrics.enable(path, max_bytes=4096, backups=2, flusher=False)
+        for i in range(2000):
+            metrics.event('scheduled', source='bench', seconds=i)
+        metrics.disable()
+        files = sorted(os.listdir(tmp))
+        sizes_ok = all(os.path.getsize(os.path.join(tmp, f)) <= 4096 + 8192 for f in files)
+        with open(path, encoding='utf-8') as f:
+            last = json.loads(f.readlines()[-1])
+    return files == ['events.jsonl', 'events.jsonl.1', 'events.jsonl.2'] and sizes_ok and last['seconds'] == 1999
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    costs = call_costs(n)
+    passed = True
+    for state, row in costs.items():
+        print(f"camada {state}: " + ', '.join(f"{k} {v:+.0f} ns" for k, v in row.items()))
+    worst = max(costs['desligada'].values())
+    ok_cost = worst <= DISABLED_BUDGET_NS
+    passed &= ok_cost
+    print(f"[{'ok' if ok_cost else 'FALHOU'}] desligada: pior caso {worst:.0f} ns/chamada (limite {DISABLED_BUDGET_NS} ns)")
+
+    metrics.disable()
+    off = countdown_run()
+    metrics.enable(None, flusher=False)
+    on = countdown_run()
+    drift = metrics.get().histograms[('countdown_drift_seconds', None)]
+    metrics.disable()
+    print(f"Countdown.tick em 24h simuladas: {off:.0f} ns/tick desligada, {on:.0f} ns/tick ligada; "
+          f"atraso p50 {drift.quantile(0.5) * 1000:.1f} ms, p99 {drift.quantile(0.99) * 1000:.1f} ms")
+
+    ok_http = check_endpoint()
+    passed &= ok_http
+    print(f"[{'ok' if ok_http else 'FALHOU'}] endpoint /metrics e /events")
+
+    ok_rot = check_rotation()
+    passed &= ok_rot
+    print(f"[{'ok' if ok_rot else 'FALHOU'}] rotação do events.jsonl (2 cópias)")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
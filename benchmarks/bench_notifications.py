@@ -0,0 +1,231 @@
+"""Contagem regressiva com avisos na tela: os ticks continuam no horário? (sem tela)
+
+Reproduz, sem Tk, a ligação da janela entre `Countdown`, `NotificationQueue` e `WarningPlan`
+num loop de eventos simulado (como o `after`/`after_idle` do Tk, com um relógio falso). O
+tempo de CPU real de cada callback é somado ao relógio, então um callback lento atrasa os
+seguintes como atrasaria no Tk.
+
+Cenário: contagem de 11 min; a cada 2 s o mesmo erro 5 vezes e um aviso novo, e uma rajada
+de 100 avisos distintos de uma vez pouco antes do aviso de 10 min (fila cheia). Confere:
+
+1. nenhum tick da contagem atrasou mais que TICK_BUDGET_MS e todos os segundos apareceram;
+2. os avisos de 10/5/1 min apareceram na tela no instante certo (mesmo com a fila cheia),
+   com no máximo um timer armado para eles;
+3. o erro repetido virou um único aviso "(xN)", a tela nunca passou de MAX_VISIBLE avisos
+   e o limite de taxa foi respeitado.
+
+Para comparar, roda o mesmo cenário trocando o primeiro erro por uma caixa modal que fica
+aberta 30 s (o loop para até alguém clicar em OK).
+
+Uso:
+    python benchmarks/bench_notifications.py [minutos]
+"""
+import heapq
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from countdown import Countdown  # noqa: E402
+from notifications import MAX_VISIBLE, RATE_BURST, RATE_WINDOW, NotificationQueue, WarningPlan  # noqa: E402
+
+TICK_BUDGET_MS = 5.0
+WARNING_BUDGET_MS = 5.0
+MODAL_SECONDS = 30.0
+
+
+class FakeLoop:
+    """`after`/`after_idle`/`after_cancel` sobre um relógio falso, como o loop do Tk."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self._heap = []
+        self._seq = itertools.count()
+        self._cancelled = set()
+
+    def monotonic(self):
+        return self.now
+
+    def wall(self):
+        return 1_700_000_000.0 + self.now
+
+    def after(self, ms, func):
+        job = next(self._seq)
+        heapq.heappush(self._heap, (self.now + ms / 1000.0, job, func))
+        return job
+
+    def after_idle(self, func):
+        return self.after(0, func)
+
+    def after_cancel(self, job):
+        self._cancelled.add(job)
+
+    def pending(self, func) -> int:
+        return sum(1 for _, job, f in self._heap if f == func and job not in self._cancelled)
+
+    def run(self, until: float):
+        while self._heap and self._heap[0][0] <= until:
+            when, job, func = heapq.heappop(self._heap)
+            if job in self._cancelled:
+                self._cancelled.discard(job)
+                continue
+            self.now = max(self.now, when)
+            t0 = time.perf_counter()
+            func(when)
+            self.now += time.perf_counter() - t0
+
+
+class Window:
+    """A mesma ligação que `gui.ShutdownScheduler` faz entre contagem, avisos e timers."""
+
+    def __init__(self, loop: FakeLoop, modal: bool = False):
+        self.loop = loop
+        self.modal = modal
+        self.countdown = Countdown(monotonic=loop.monotonic, wall=loop.wall)
+        self.notices = NotificationQueue(clock=loop.monotonic)
+        self.warnings = WarningPlan()
+        self.notice_job = self.notice_flush_job = self.warning_job = None
+        self._notice_version = None
+        # Medições
+        self.tick_late = []
+        self.texts = []
+        self.warning_errors = []
+        self._warning_due = None
+        self.max_repeat = 0
+        self.max_warning_timers = 0
+        self.max_visible = 0
+        self.promotions = []
+        self.label = ""
+
+    def start(self, seconds: float):
+        self.countdown.start(seconds)
+        self.warnings.start(seconds)
+        self._schedule_next_warning()
+        self._tick(self.loop.now)
+
+    # Contagem
+    def _tick(self, scheduled):
+        self.tick_late.append((self.loop.now - scheduled) * 1000)
+        text, delay = self.countdown.tick()
+        if text is not None:
+            self.texts.append(text)
+        if delay is not None:
+            self.loop.after(delay, self._tick)
+
+    # Avisos antes do prazo
+    def _schedule_next_warning(self):
+        delay = self.warnings.delay_ms(self.countdown.remaining())
+        if delay is not None:
+            self.warning_job = self.loop.after(delay, self._on_warning_due)
+        self.max_warning_timers = max(self.max_warning_timers, self.loop.pending(self._on_warning_due))
+
+    def _on_warning_due(self, scheduled):
+        self.warning_job = None
+        remaining = self.countdown.remaining()
+        offset = self.warnings.due(remaining)
+        if offset is not None:
+            # Instante em que o prazo cruzou a antecedência; o erro é medido quando o aviso aparece
+            self._warning_due = (f"faltam {offset / 60:g} min", self.loop.now - (offset - remaining))
+            self.notify(self.warnings.level(offset), self._warning_due[0], key='pre-shutdown', urgent=True)
+        self._schedule_next_warning()
+
+    # Fila de avisos
+    def notify(self, level, text, key=None, urgent=False):
+        if self.modal and level == 'error':
+            # messagebox: nada mais roda até alguém clicar em OK
+            self.modal = False
+            self.loop.now += MODAL_SECONDS
+            return
+        self.notices.post(level, text, key, urgent)
+        if self.notice_flush_job is None:
+            self.notice_flush_job = self.loop.after_idle(self._flush_notices)
+
+    def _flush_notices(self, scheduled):
+        self.notice_flush_job = None
+        if self.notice_job is not None:
+            self.loop.after_cancel(self.notice_job)
+            self.notice_job = None
+        before = len(self.notices._shown_at)
+        wait = self.notices.update()
+        if len(self.notices._shown_at) > before:
+            self.promotions.extend([self.loop.now] * (len(self.notices._shown_at) - before))
+        if self.notices.version != self._notice_version:
+            self._notice_version = self.notices.version
+            self.label = self.notices.text()
+        self.max_visible = max(self.max_visible, len(self.notices.visible))
+        for notice in self.notices.visible:
+            self.max_repeat = max(self.max_repeat, notice.count)
+            if self._warning_due is not None and notice.text == self._warning_due[0]:
+                self.warning_errors.append((self.loop.now - self._warning_due[1]) * 1000)
+                self._warning_due = None
+        if wait is not None:
+            self.notice_job = self.loop.after(int(wait * 1000) + 1, self._flush_notices)
+
+
+def run(minutes: float = 11, modal: bool = False) -> dict:
+    loop = FakeLoop()
+    win = Window(loop, modal=modal)
+    total = int(minutes * 60)
+    win.start(total)
+    start = loop.now
+
+    # A cada 2 s: o mesmo erro 5 vezes e um aviso diferente
+    def flood(scheduled, n=itertools.count()):
+        for _ in range(5):
+            win.notify('error', "Falha ao executar comando: acesso negado")
+        win.notify('info', f"evento {next(n)}")
+        if loop.now < start + total - 2:
+            loop.after(2000, flood)
+
+    def burst(scheduled):
+        for j in range(100):
+            win.notify('warning', f"rajada {j}")
+
+    loop.after(500, flood)
+    loop.after(55_250, burst)
+    loop.run(start + total + 60)
+
+    window_max = 0
+    for i, t in enumerate(win.promotions):
+        window_max = max(window_max, sum(1 for u in win.promotions[i:] if u < t + RATE_WINDOW))
+    expected_texts = total + 1  # de "11m 0s" até "0s"
+    return {
+        'ticks': len(win.tick_late),
+        'max_tick_late_ms': max(win.tick_late),
+        'texts': len(win.texts),
+        'expected_texts': expected_texts,
+        'warnings': len(win.warning_errors),
+        'max_warning_error_ms': max(win.warning_errors, default=0.0),
+        'max_warning_timers': win.max_warning_timers,
+        'max_visible': win.max_visible,
+        'max_per_window': window_max,
+        'dropped': win.notices.dropped,
+        'repeated_count': win.max_repeat,
+    }
+
+
+def main():
+    minutes = float(sys.argv[1]) if len(sys.argv) > 1 else 11
+    r = run(minutes)
+    ok_ticks = r['max_tick_late_ms'] <= TICK_BUDGET_MS and r['texts'] == r['expected_texts']
+    print(f"[{'ok' if ok_ticks else 'FALHOU'}] {r['ticks']} ticks, atraso máximo {r['max_tick_late_ms']:.2f} ms "
+          f"(meta {TICK_BUDGET_MS:g} ms); {r['texts']} de {r['expected_texts']} segundos exibidos")
+    ok_warn = (r['warnings'] == len([m for m in (10, 5, 1) if m * 60 < minutes * 60])
+               and r['max_warning_error_ms'] <= WARNING_BUDGET_MS and r['max_warning_timers'] <= 1)
+    print(f"[{'ok' if ok_warn else 'FALHOU'}] {r['warnings']} avisos de 10/5/1 min, erro máximo "
+          f"{r['max_warning_error_ms']:.2f} ms, {r['max_warning_timers']} timer armado no máximo")
+    ok_queue = r['max_visible'] <= MAX_VISIBLE and r['max_per_window'] <= RATE_BURST
+    print(f"[{'ok' if ok_queue else 'FALHOU'}] no máximo {r['max_visible']} avisos na tela e "
+          f"{r['max_per_window']} novos a cada {RATE_WINDOW:g}s; erro repetido visto como x{r['repeated_count']}; "
+          f"{r['dropped']} descartados na rajada")
+
+    m = run(minutes, modal=True)
+    print(f"com messagebox modal aberta {MODAL_SECONDS:g}s: atraso máximo {m['max_tick_late_ms']:.0f} ms, "
+          f"{m['texts']} de {m['expected_texts']} segundos exibidos")
+    return 0 if ok_ticks and ok_warn and ok_queue else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,219 @@
+"""Partida a frio e a quente do app empacotado (Linux).
+
+Para cada alvo, roda o app `--runs` vezes em modo de medição (`SHUTDOWN_SCHEDULER_STARTUP_PROBE`:
+backend falso, config.json e diário numa pasta temporária, fecha ao mostrar a janela) e mostra
+a mediana de:
+
+- tempo do início do processo até a janela aparecer;
+- tempo total até o processo terminar;
+- bytes lidos e gravados no disco (rusage do processo e filhos: ru_inblock/ru_oublock);
+- memória máxima (ru_maxrss).
+
+A frio, antes de cada execução os arquivos do alvo saem do cache de páginas
+(posix_fadvise DONTNEED; com --drop-caches, e rodando como root, o cache inteiro do sistema
+é descartado). A quente, o alvo roda uma vez antes sem medir.
+
+Alvos:
+- caminho do executável gerado pelo PyInstaller (onedir: dist/ShutdownScheduler/ShutdownScheduler,
+  a pasta inteira é tirada do cache; onefile: só o executável);
+- `fonte`: `python shutdown_scheduler.py` deste repositório.
+
+Com --toc, resume também um PYZ-00.toc (módulos por pacote) e aponta módulos que deveriam ter
+ficado de fora segundo o EXCLUDES do ShutdownScheduler-fast.spec.
+
+Uso:
+    pyinstaller ShutdownScheduler-fast.spec
+    python benchmarks/bench_packaged.py dist/ShutdownScheduler/ShutdownScheduler [outro alvo...]
+        [--runs 5] [--budget-ms 1500] [--drop-caches] [--toc build/ShutdownScheduler-fast/PYZ-00.toc]
+
+Sai com código 1 se a mediana a frio do primeiro alvo passar de --budget-ms.
+"""
+import argparse
+import ast
+import collections
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from suite import VirtualDisplay  # noqa: E402
+
+PROBE_ENV = 'SHUTDOWN_SCHEDULER_STARTUP_PROBE'
+FAST_SPEC = os.path.join(ROOT, 'ShutdownScheduler-fast.spec')
+# Meta da partida a frio (mediana até a janela aparecer)
+COLD_BUDGET_MS = 1500
+PROBE_TIMEOUT = 60
+# ru_inblock/ru_oublock contam blocos de 512 bytes
+BLOCK = 512
+
+
+class Target:
+    def __init__(self, spec: str):
+        self.name = spec
+        if spec == 'fonte':
+            self.cmd = [sys.executable, os.path.join(ROOT, 'shutdown_scheduler.py')]
+            self.files = list(_walk(ROOT, suffixes=('.py', '.pyc')))
+            return
+        path = os.path.abspath(spec)
+        if not os.path.isfile(path):
+            raise SystemExit(f"alvo não encontrado: {spec}")
+        self.cmd = [path]
+        folder = os.path.dirname(path)
+        # onedir: o executável fica ao lado de _internal/ com as bibliotecas
+        if os.path.isdir(os.path.join(folder, '_internal')):
+            self.files = list(_walk(folder))
+        else:
+            self.files = [path]
+
+    def bytes_on_disk(self) -> int:
+        return sum(os.path.getsize(f) for f in self.files)
+
+
+def _walk(folder: str, suffixes=None):
+    for base, dirs, names in os.walk(folder):
+        dirs[:] = [d for d in dirs if d not in ('.git', 'build', 'dist')]
+        for name in names:
+            if suffixes is None or name.endswith(suffixes):
+                yield os.path.join(base, name)
+
+
+def evict(files, drop_caches: bool) -> None:
+    """Tira os arquivos do cache de páginas para a próxima leitura ir ao disco."""
+    if drop_caches:
+        os.sync()
+        try:
+            with open('/proc/sys/vm/drop_caches', 'w') as f:
+                f.write('3\n')
+            return
+        except OSError as e:
+            print(f"aviso: drop_caches indisponível ({e}); usando posix_fadvise", file=sys.stderr)
+    for path in files:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def run_once(target: Target, env: dict) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        mark = os.path.join(tmp, 'janela')
+        env = dict(env, **{PROBE_ENV: mark})
+        log = open(os.path.join(tmp, 'stderr'), 'w+b')
+        t0 = time.time()
+        proc = subprocess.Popen(target.cmd, cwd=tmp, env=env, stdout=subprocess.DEVNULL, stderr=log)
+        watchdog = threading.Timer(PROBE_TIMEOUT, proc.kill)
+        watchdog.start()
+        try:
+            # wait4 devolve o rusage do processo somado ao dos filhos que ele esperou
+            # (o bootloader onefile roda o app num processo filho)
+            _, status, usage = os.wait4(proc.pid, 0)
+        finally:
+            watchdog.cancel()
+        total = time.time() - t0
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        log.seek(0)
+        err = log.read().decode(errors='replace').strip()
+        log.close()
+        if not os.path.exists(mark):
+            raise RuntimeError(f"{target.name}: a janela não apareceu (código {proc.returncode})"
+                               + (f"\n{err}" if err else ""))
+        with open(mark) as f:
+            shown = float(f.read())
+    return {
+        'window_ms': (shown - t0) * 1000,
+        'total_ms': total * 1000,
+        'read_kb': usage.ru_inblock * BLOCK / 1024,
+        'written_kb': usage.ru_oublock * BLOCK / 1024,
+        'maxrss_mb': usage.ru_maxrss / 1024,
+    }
+
+
+def measure(target: Target, env: dict, runs: int, cold: bool, drop_caches: bool) -> dict:
+    if not cold:
+        run_once(target, env)
+    samples = []
+    for _ in range(runs):
+        if cold:
+            evict(target.files, drop_caches)
+        samples.append(run_once(target, env))
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+def spec_excludes(path: str = FAST_SPEC) -> list:
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'EXCLUDES' for t in node.targets):
+            return ast.literal_eval(node.value)
+    return []
+
+
+def summarize_toc(path: str, top: int = 15) -> None:
+    """Módulos do PYZ por pacote de primeiro nível, e os que o spec rápido exclui."""
+    with open(path, encoding='utf-8') as f:
+        _, entries = ast.literal_eval(f.read())
+    names = [entry[0] for entry in entries]
+    packages = collections.Counter(name.split('.')[0] for name in names)
+    print(f"{path}: {len(names)} módulos em {len(packages)} pacotes")
+    for package, count in packages.most_common(top):
+        print(f"  {package:<24} {count:>4}")
+    excludes = spec_excludes()
+    leaked = sorted({name for name in names for ex in excludes if name == ex or name.startswith(ex + '.')})
+    if leaked:
+        shown = ', '.join(leaked[:12]) + (', ...' if len(leaked) > 12 else '')
+        print(f"  {len(leaked)} módulos que o ShutdownScheduler-fast.spec exclui: {shown}")
+    else:
+        print("  nenhum módulo da lista EXCLUDES")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Partida a frio e a quente do app empacotado.")
+    parser.add_argument('targets', nargs='*', help="executáveis gerados pelo PyInstaller ou 'fonte'")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=COLD_BUDGET_MS,
+                        help=f"meta da partida a frio do primeiro alvo (padrão {COLD_BUDGET_MS} ms)")
+    parser.add_argument('--drop-caches', action='store_true',
+                        help="descarta o cache de páginas do sistema inteiro (root)")
+    parser.add_argument('--toc', action='append', default=[], help="resume um PYZ-00.toc")
+    args = parser.parse_args(argv)
+
+    for toc in args.toc:
+        summarize_toc(toc)
+    if not args.targets:
+        return 0
+    if not sys.platform.startswith('linux'):
+        print("a medição precisa de Linux (posix_fadvise, wait4)", file=sys.stderr)
+        return 2
+
+    targets = [Target(spec) for spec in args.targets]
+    results = []
+    with VirtualDisplay() as display:
+        for target in targets:
+            size = target.bytes_on_disk() / 1024 / 1024
+            print(f"{target.name} ({len(target.files)} arquivos, {size:.1f} MB)")
+            for label, cold in (('frio', True), ('quente', False)):
+                r = measure(target, display.env, args.runs, cold, args.drop_caches)
+                results.append((target, cold, r))
+                print(f"  {label:<6} janela {r['window_ms']:7.0f} ms  total {r['total_ms']:7.0f} ms  "
+                      f"lidos {r['read_kb']:8.0f} KB  gravados {r['written_kb']:7.0f} KB  "
+                      f"memória {r['maxrss_mb']:5.0f} MB")
+
+    cold_first = next(r for target, cold, r in results if target is targets[0] and cold)
+    ok = cold_first['window_ms'] <= args.budget_ms
+    print(f"[{'ok' if ok else 'FALHOU'}] partida a frio de {targets[0].name}: "
+          f"{cold_first['window_ms']:.0f} ms (meta {args.budget_ms:g} ms)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
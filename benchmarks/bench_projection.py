@@ -0,0 +1,107 @@
+"""Projeção em lote de um mês de desligamentos numa frota simulada.
+
+Monta `hosts` máquinas (fusos variados, março de 2027: entra o horário de verão nos EUA e na
+Europa) com uma regra cron de 15 em 15 minutos em dias úteis e uma de horários fixos, e mede:
+
+1. `project_hosts` para a frota inteira (meta: 1 milhão de disparos em menos de 1 s com NumPy);
+2. a abordagem de hoje, encadeando `next_after`, numa amostra (extrapolada para a frota);
+3. se a projeção bate exatamente com o encadeamento de `next_after` na amostra;
+4. exportação CSV e a grade do calendário.
+
+Sem NumPy a projeção usa listas: o tempo é mostrado, mas a meta não é cobrada.
+
+Uso:
+    python benchmarks/bench_projection.py [máquinas] [amostra]
+"""
+import datetime
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import projection  # noqa: E402
+from recurrence import rules_from_config  # noqa: E402
+
+ZONES = [None, 'America/Sao_Paulo', 'America/New_York', 'America/Los_Angeles', 'Europe/Berlin',
+         'Europe/London', 'Asia/Tokyo', 'Australia/Sydney', 'America/Havana']
+BUDGET_S = 1.0
+
+
+def fleet(n: int) -> dict:
+    hosts = {}
+    for i in range(n):
+        tz = ZONES[i % len(ZONES)]
+        extra = {'tz': tz} if tz else {}
+        hosts[f"pc{i:04d}"] = {'rules': [
+            dict(cron=f"*/15 {6 + i % 3}-23 * * 1-5", **extra),
+            dict(times=['02:30', '23:45'], weekdays='sab,dom', **extra),
+        ]}
+    return hosts
+
+
+def chain(rules, start: float, end: float) -> list:
+    out = []
+    for rule in rules:
+        t = start - 1
+        while True:
+            t = rule.next_after(t)
+            if t is None or t >= end:
+                break
+            out.append(int(t))
+    return sorted(out)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 700
+    sample = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    start = datetime.datetime(2027, 3, 1).timestamp()
+    end = datetime.datetime(2027, 4, 1).timestamp()
+    hosts = fleet(n)
+
+    t0 = time.perf_counter()
+    proj = projection.project_hosts(hosts, start, end)
+    elapsed = time.perf_counter() - t0
+    mode = 'NumPy' if projection.np is not None else 'sem NumPy (listas)'
+    print(f"projeção ({mode}): {len(proj)} disparos de {n} máquinas em {elapsed:.3f}s "
+          f"({len(proj) / elapsed / 1e6:.2f} M/s)")
+
+    names = list(hosts)[:sample]
+    t0 = time.perf_counter()
+    expected = {name: chain(rules_from_config(hosts[name]), start, end) for name in names}
+    chain_s = time.perf_counter() - t0
+    sampled = sum(len(v) for v in expected.values())
+    per_event = chain_s / max(1, sampled)
+    print(f"encadeando next_after: {sampled} disparos em {chain_s:.3f}s; "
+          f"estimativa para a frota {per_event * len(proj):.1f}s ({per_event * len(proj) / elapsed:.0f}x mais lento)")
+
+    mismatches = 0
+    hosts_of = proj.hosts
+    by_host = {}
+    for when, h in zip(proj.when, proj.host):
+        by_host.setdefault(hosts_of[h], []).append(int(when))
+    for name in names:
+        if by_host.get(name, []) != expected[name]:
+            mismatches += 1
+    ok_eq = mismatches == 0
+    print(f"[{'ok' if ok_eq else 'FALHOU'}] igual ao next_after em {len(names)} máquinas ({mismatches} diferentes)")
+
+    ok_time = elapsed < BUDGET_S or projection.np is None
+    if projection.np is not None:
+        print(f"[{'ok' if ok_time else 'FALHOU'}] meta de {BUDGET_S:g}s para a frota")
+
+    part = proj.between(start, start + 7 * 86400)
+    buf = io.StringIO()
+    t0 = time.perf_counter()
+    rows = projection.write_csv(part, buf)
+    csv_s = time.perf_counter() - t0
+    weeks = projection.month_grid(projection.project_hosts({'pc': hosts['pc0000']}, start, end), 2027, 3)
+    busiest = max((cell for week in weeks for cell in week if cell), key=lambda c: len(c[1]))
+    print(f"CSV da primeira semana: {rows} linhas em {csv_s:.3f}s; calendário de março: {len(weeks)} semanas, "
+          f"dia {busiest[0]} com {len(busiest[1])} horários")
+    return 0 if ok_eq and ok_time else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
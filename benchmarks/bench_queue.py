@@ -0,0 +1,129 @@
+"""Simula 100 mil operações aleatórias de agendar/cancelar/reagendar e conta comandos ao Windows.
+
+Compara a `ActionQueue` (só reenvia quando a ação efetiva muda; cancelamento + novo prazo
+numa única reconciliação) com a abordagem ingênua de hoje: cada agendamento envia
+`-a` + `-s/-r` (para sobrescrever o pendente) e cada cancelamento envia `-a`.
+Também confere, a cada passo, que o que está armado no Windows é exatamente a próxima
+ação efetiva da fila, e quantas vezes a abordagem ingênua ficou com a ação errada armada.
+Por fim, confere que `cancel()` sempre envia `-a`, mesmo com a fila vazia (o desligamento
+pendente pode ter sido armado por outro processo).
+
+Uso:
+    python benchmarks/bench_queue.py [operações] [semente]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from action_queue import ActionQueue, DEFAULT_PRIORITY  # noqa: E402
+from command_executor import FakeBackend, TIMED_ACTIONS  # noqa: E402
+
+ACTIONS = list(DEFAULT_PRIORITY)
+KEYS = ['gui', 'cli', 'daily', 'fleet', None, None, None]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def run(ops: int = 100_000, seed: int = 1) -> dict:
+    rnd = random.Random(seed)
+    clock = Clock()
+    backend = FakeBackend()
+    queue = ActionQueue(backend, clock=clock)
+    naive_commands = 0
+    naive_armed = None   # (ação, prazo) que a abordagem ingênua deixou no Windows
+    naive_wrong = 0
+    mismatches = 0
+    counts = {'add': 0, 'cancel': 0, 'reschedule': 0, 'batch': 0, 'tick': 0}
+
+    t0 = time.perf_counter()
+    for _ in range(ops):
+        r = rnd.random()
+        if r < 0.40 or not len(queue):
+            action = rnd.choice(ACTIONS)
+            deadline = clock.now + rnd.uniform(60, 7 * 86400)
+            queue.add(action, deadline, key=rnd.choice(KEYS))
+            counts['add'] += 1
+            if action in TIMED_ACTIONS:
+                naive_commands += 2 if naive_armed else 1
+                naive_armed = (action, deadline)
+        elif r < 0.65:
+            item = rnd.choice(queue.pending())
+            queue.remove(item.id)
+            counts['cancel'] += 1
+            naive_commands += 1
+            naive_armed = None
+        elif r < 0.85:
+            # Reagendar: cancela e agenda de novo com outro prazo, numa única reconciliação
+            item = rnd.choice(queue.pending())
+            deadline = item.deadline + rnd.uniform(-3600, 3600)
+            with queue.batch():
+                queue.remove(item.id)
+                queue.add(item.action, max(clock.now + 60, deadline), key=item.key)
+            counts['reschedule'] += 1
+            naive_commands += 2
+            if item.action in TIMED_ACTIONS:
+                naive_armed = (item.action, deadline)
+        elif r < 0.90:
+            # Lote: vários pedidos chegando juntos (ex.: instância única repassando comandos)
+            with queue.batch():
+                for _ in range(rnd.randint(2, 6)):
+                    action = rnd.choice(ACTIONS)
+                    deadline = clock.now + rnd.uniform(60, 86400)
+                    queue.add(action, deadline)
+                    if action in TIMED_ACTIONS:
+                        naive_commands += 2 if naive_armed else 1
+                        naive_armed = (action, deadline)
+            counts['batch'] += 1
+        else:
+            clock.now += rnd.uniform(0, 3600)
+            for item in queue.due():
+                if item.action not in TIMED_ACTIONS:
+                    naive_commands += 1
+                naive_armed = None
+            counts['tick'] += 1
+
+        desired = queue._desired()
+        if not queue._same(desired, queue.armed()):
+            mismatches += 1
+        if not queue._same(desired, naive_armed):
+            naive_wrong += 1
+    elapsed = time.perf_counter() - t0
+    return {
+        'ops': ops, 'elapsed': elapsed, 'counts': counts, 'pending': len(queue),
+        'commands': queue.commands, 'backend_calls': len(backend.calls),
+        'naive_commands': naive_commands, 'naive_wrong': naive_wrong, 'mismatches': mismatches,
+    }
+
+
+def main():
+    ops = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    r = run(ops, seed)
+    c = r['counts']
+    print(f"{r['ops']} operações em {r['elapsed']:.2f}s ({r['elapsed'] / r['ops'] * 1e6:.1f} µs/op); "
+          f"{c['add']} agendar, {c['cancel']} cancelar, {c['reschedule']} reagendar, {c['batch']} lotes, "
+          f"{c['tick']} avanços de relógio; {r['pending']} pendentes no fim")
+    print(f"comandos ao Windows: fila {r['commands']} vs ingênuo {r['naive_commands']} "
+          f"({r['commands'] / max(1, r['naive_commands']) * 100:.1f}%)")
+    print(f"passos com a ação errada armada: fila {r['mismatches']}, ingênuo {r['naive_wrong']}")
+    ok = r['mismatches'] == 0 and r['commands'] == r['backend_calls'] and r['commands'] < r['naive_commands']
+    backend = FakeBackend()
+    ActionQueue(backend).cancel()
+    cancel_ok = backend.calls == [['-a']]
+    print(f"cancelar com a fila vazia envia {backend.calls}")
+    ok = ok and cancel_ok
+    print('ok' if ok else 'FALHOU')
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
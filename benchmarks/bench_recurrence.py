@@ -0,0 +1,84 @@
+"""Avalia 10k regras de recorrência ao longo de um ano simulado.
+
+Compila regras variadas (dias da semana, vários horários, cron, exclusões e fusos),
+monta o RecurrenceIndex e consome todos os disparos do ano em ordem.
+
+Uso:
+    python benchmarks/bench_recurrence.py [regras]
+"""
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recurrence import RecurrenceIndex, compile_rule  # noqa: E402
+
+ZONES = [None, 'America/Sao_Paulo', 'America/New_York', 'Europe/Lisbon', 'Asia/Tokyo']
+DAYS = ['seg', 'ter', 'qua', 'qui', 'sex', 'sab', 'dom']
+
+
+def random_spec(rnd: random.Random) -> dict:
+    kind = rnd.random()
+    if kind < 0.4:
+        spec = {
+            'times': [f"{rnd.randrange(24):02d}:{rnd.randrange(0, 60, 5):02d}" for _ in range(rnd.randint(1, 2))],
+            'weekdays': ','.join(rnd.sample(DAYS, rnd.randint(1, 2))),
+        }
+    elif kind < 0.8:
+        spec = {'cron': f"{rnd.randrange(60)} {rnd.randrange(24)} {rnd.choice(['*', '1', '15', '1,15'])} * {rnd.choice(['*', '1-5', '6', '0'])}"}
+        if spec['cron'].endswith('* * *'):
+            spec['cron'] = spec['cron'][:-1] + '1'
+    else:
+        spec = {'times': [f"{rnd.randrange(24):02d}:00"], 'weekdays': rnd.choice(DAYS)}
+    if rnd.random() < 0.2:
+        spec['exclude'] = ['2026-12-25', '2027-01-01']
+    tz = rnd.choice(ZONES)
+    if tz:
+        spec['tz'] = tz
+    return spec
+
+
+def run(n: int = 10_000, seed: int = 7) -> dict:
+    rnd = random.Random(seed)
+    specs = [random_spec(rnd) for _ in range(n)]
+    start = datetime.datetime(2026, 1, 1).timestamp()
+    end = start + 365 * 86400
+
+    t0 = time.perf_counter()
+    rules = [compile_rule(s) for s in specs]
+    t1 = time.perf_counter()
+    index = RecurrenceIndex(rules, now=start)
+    t2 = time.perf_counter()
+    fires = 0
+    last = start
+    while True:
+        nxt = index.next()
+        if nxt is None or nxt[0] > end:
+            break
+        when, _ = index.advance()
+        assert when >= last
+        last = when
+        fires += 1
+    t3 = time.perf_counter()
+    return {
+        'rules': n,
+        'fires': fires,
+        'compile_s': t1 - t0,
+        'build_s': t2 - t1,
+        'year_s': t3 - t2,
+        'per_fire_us': (t3 - t2) / max(fires, 1) * 1e6,
+    }
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    r = run(n)
+    print(f"{r['rules']} regras: compilar {r['compile_s']:.3f}s, montar índice {r['build_s']:.3f}s")
+    print(f"ano simulado: {r['fires']} disparos em {r['year_s']:.2f}s ({r['per_fire_us']:.1f} µs por disparo)")
+
+
+if __name__ == "__main__":
+    main()
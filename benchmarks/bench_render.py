@@ -0,0 +1,139 @@
+"""Repete uma rolagem rápida do mouse (1000 eventos/s) e mede o tempo de quadro dos rótulos.
+
+Compara a abordagem antiga (cada evento relê a entrada, chama `datetime.now()`/`strftime`
+e reconfigura os dois rótulos) com o `PreviewModel` (eventos só invalidam; um flush por
+quadro a ~60 Hz reconfigura apenas o que mudou). Os widgets são falsos: cada `configure`
+custa `--configure-us` microssegundos de CPU, simulando o redesenho do Tk.
+
+Uso:
+    python benchmarks/bench_render.py [segundos] [--configure-us 200]
+"""
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from schedule_engine import seconds_for_value  # noqa: E402
+from view_model import PreviewModel  # noqa: E402
+
+MODE = "Minutos"
+EVENT_RATE = 1000
+FRAME_S = 1 / 60
+
+
+class FakeLabel:
+    def __init__(self, cost_s: float):
+        self.cost_s = cost_s
+        self.calls = 0
+        self.text = ''
+
+    def configure(self, text):
+        self.calls += 1
+        self.text = text
+        end = time.perf_counter() + self.cost_s
+        while time.perf_counter() < end:
+            pass
+
+
+class FakeEntry:
+    def __init__(self):
+        self.value = 30
+
+    def get(self):
+        return str(self.value)
+
+
+def _wheel_values(events: int):
+    # Sobe e desce entre 1 e 120 como uma rolagem de ida e volta
+    value, step = 30, 1
+    for _ in range(events):
+        value += step
+        if value in (1, 120):
+            step = -step
+        yield value
+
+
+def _old_update(entry, info, estimated):
+    # Cópia do antigo update_converted_seconds
+    try:
+        txt = entry.get().strip()
+        seconds = seconds_for_value(MODE, txt)
+        info.configure(text=f"Tempo convertido: {seconds} segundos")
+        target = (datetime.datetime.now() + datetime.timedelta(seconds=seconds)).strftime('%H:%M')
+        estimated.configure(text=f"Estimativa de desligamento: {target}")
+    except Exception:
+        info.configure(text="Tempo convertido: - ")
+
+
+def _frames(events: int):
+    """Agrupa os eventos (1 ms entre eles) nos quadros em que chegam."""
+    per_frame = []
+    frame_end = FRAME_S
+    count = 0
+    for i in range(events):
+        t = i / EVENT_RATE
+        while t >= frame_end:
+            per_frame.append(count)
+            count = 0
+            frame_end += FRAME_S
+        count += 1
+    per_frame.append(count)
+    return per_frame
+
+
+def run_old(seconds: float, cost_s: float) -> dict:
+    entry, info, estimated = FakeEntry(), FakeLabel(cost_s), FakeLabel(cost_s)
+    values = _wheel_values(int(seconds * EVENT_RATE))
+    frame_times = []
+    for n in _frames(int(seconds * EVENT_RATE)):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            entry.value = next(values)
+            _old_update(entry, info, estimated)
+        frame_times.append(time.perf_counter() - t0)
+    return {'frame_times': frame_times, 'configures': info.calls + estimated.calls}
+
+
+def run_new(seconds: float, cost_s: float) -> dict:
+    entry = FakeEntry()
+    labels = {'info_label': FakeLabel(cost_s), 'estimated_label': FakeLabel(cost_s)}
+    view = PreviewModel(source=lambda: (MODE, entry.get()))
+    values = _wheel_values(int(seconds * EVENT_RATE))
+    frame_times = []
+    for n in _frames(int(seconds * EVENT_RATE)):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            entry.value = next(values)
+            view.invalidate()
+        # after_idle: um flush por quadro
+        view.flush(lambda name, text: labels[name].configure(text=text))
+        frame_times.append(time.perf_counter() - t0)
+    return {'frame_times': frame_times, 'configures': sum(l.calls for l in labels.values())}
+
+
+def _report(name: str, r: dict):
+    ft = sorted(r['frame_times'])
+    p99 = ft[min(len(ft) - 1, int(len(ft) * 0.99))]
+    over = sum(1 for t in ft if t > FRAME_S)
+    print(f"{name:>8}: {r['configures']:6d} configure, quadro médio {statistics.mean(ft) * 1000:7.3f} ms, "
+          f"p99 {p99 * 1000:7.3f} ms, máx {ft[-1] * 1000:7.3f} ms, {over} quadros acima de 16,7 ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('seconds', nargs='?', type=float, default=5.0)
+    parser.add_argument('--configure-us', type=float, default=200.0,
+                        help="custo simulado de cada configure de rótulo")
+    args = parser.parse_args()
+    cost_s = args.configure_us / 1e6
+    print(f"{int(args.seconds * EVENT_RATE)} eventos de rolagem em {args.seconds}s, quadros de 16,7 ms")
+    _report('antigo', run_old(args.seconds, cost_s))
+    _report('novo', run_new(args.seconds, cost_s))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Custo de inicialização da linha de comando, medido com `python -X importtime`.
+
+Roda `shutdown_scheduler.py status` várias vezes em interpretadores novos, soma o tempo
+de import dos módulos e verifica:
+  - que tkinter/customtkinter não são importados;
+  - que o tempo de import fica dentro do orçamento (`--budget-ms`).
+Sai com código 1 se alguma verificação falhar, para poder ser usado como checagem.
+
+Uso:
+    python benchmarks/bench_startup.py [--runs 5] [--budget-ms 80]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY = os.path.join(ROOT, 'shutdown_scheduler.py')
+GUI_MODULES = ('tkinter', '_tkinter', 'customtkinter')
+
+
+def parse_importtime(stderr: str):
+    """Retorna (tempo total de import em µs, nomes importados) a partir da saída do -X importtime."""
+    total = 0
+    names = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|', 2)
+        total += int(self_us)
+        names.add(name.strip())
+    return total, names
+
+
+def measure(args, runs: int):
+    """Mediana do tempo de import (ms) e do processo inteiro (ms) de `python -X importtime <args>`."""
+    import_us = []
+    wall_ms = []
+    names = set()
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-X', 'importtime', *args], capture_output=True, text=True, cwd=ROOT)
+        wall_ms.append((time.perf_counter() - t0) * 1000)
+        total, imported = parse_importtime(proc.stderr)
+        import_us.append(total)
+        names |= imported
+    return statistics.median(import_us) / 1000, statistics.median(wall_ms), names
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=80.0, help="orçamento para o tempo de import da CLI")
+    args = parser.parse_args()
+
+    baseline_import, baseline_wall, _ = measure(['-c', 'pass'], args.runs)
+    cli_import, cli_wall, names = measure([ENTRY, 'status'], args.runs)
+    print(f"python vazio:      import {baseline_import:6.1f} ms, processo {baseline_wall:6.1f} ms")
+    print(f"cli status:        import {cli_import:6.1f} ms, processo {cli_wall:6.1f} ms")
+
+    ok = True
+    gui = sorted(n for n in names if n.split('.')[0] in GUI_MODULES)
+    if gui:
+        print(f"FALHA: a CLI importou módulos de interface: {', '.join(gui)}")
+        ok = False
+    if cli_import > args.budget_ms:
+        print(f"FALHA: import da CLI ({cli_import:.1f} ms) acima do orçamento de {args.budget_ms:.0f} ms")
+        ok = False
+    if ok:
+        print(f"ok (orçamento {args.budget_ms:.0f} ms)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,372 @@
+"""Suíte de desempenho dos caminhos quentes, com linha de base em JSON e limites de regressão.
+
+Roda sem tela (Linux) e sem desligar nada: o backend é sempre o `FakeBackend` e config/diário
+ficam num diretório temporário. Casos:
+
+- `seconds_until_time`  interpretar HH:MM e calcular os segundos até o horário (µs/chamada)
+- `preview_refresh`     `update_converted_seconds` + flush da prévia, como na janela (µs/evento)
+- `config_roundtrip`    `save_config` gravado em disco + `load_config` num ConfigStore novo (µs)
+- `countdown_tick`      um tick da contagem regressiva (µs/tick)
+- `cli_first_command`   processo novo até o agendamento pela linha de comando (ms)
+- `gui_first_window`    processo novo até a janela aparecer (ms)
+- `gui_first_command`   processo novo até a janela enviar o agendamento diário ao backend (ms)
+
+Os casos da janela precisam de customtkinter e de uma tela; sem `DISPLAY`, a suíte sobe um
+`Xvfb` se ele estiver instalado, senão pula esses casos (eles não contam como regressão).
+
+Os casos em processo guardam a melhor de várias rodadas (menos sensível a ruído da
+máquina); os de processo novo, a mediana. Cada resultado é comparado com `benchmarks/baseline.json`:
+fica acima de `valor * (1 + tolerância)` é regressão e a suíte sai com código 1.
+
+Uso:
+    python benchmarks/suite.py                       compara com a linha de base
+    python benchmarks/suite.py --update              regrava a linha de base com esta máquina
+    python benchmarks/suite.py --only countdown_tick --json resultado.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config_store import ConfigStore  # noqa: E402
+from countdown import Countdown  # noqa: E402
+from schedule_engine import seconds_until_time  # noqa: E402
+from view_model import PreviewModel  # noqa: E402
+
+ENTRY = os.path.join(ROOT, 'shutdown_scheduler.py')
+BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+# Tolerância padrão: medições em processo variam menos que as de processos novos
+TOLERANCE_INPROC = 0.30
+TOLERANCE_PROCESS = 0.50
+PROBE_TIMEOUT = 30.0
+
+
+class Skip(Exception):
+    pass
+
+
+def _best_per_call(func, calls: int, repeats: int) -> float:
+    """Melhor rodada (µs por chamada) de `repeats` execuções de `func(calls)`, como o timeit."""
+    best = float('inf')
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        func(calls)
+        best = min(best, (time.perf_counter() - t0) / calls * 1e6)
+    return best
+
+
+# ---- casos em processo -------------------------------------------------------------------
+
+def case_seconds_until_time(repeats: int) -> float:
+    values = [f"{h:02d}:{m:02d}" for h in range(24) for m in (0, 15, 30, 45)]
+
+    def run(n):
+        for i in range(n):
+            seconds_until_time(values[i % len(values)])
+    return _best_per_call(run, 20_000, repeats)
+
+
+def case_preview_refresh(repeats: int) -> float:
+    # Mesmo caminho da janela: o evento só invalida; o flush lê a entrada e aplica o que mudou
+    state = {'value': 30}
+    view = PreviewModel(source=lambda: ("Minutos", str(state['value'])))
+    labels = {}
+
+    def apply(name, text):
+        labels[name] = text
+
+    def run(n):
+        for i in range(n):
+            state['value'] = 1 + i % 120
+            view.invalidate()
+            view.flush(apply)
+    return _best_per_call(run, 20_000, repeats)
+
+
+def case_config_roundtrip(repeats: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'config.json')
+        store = ConfigStore(path, schedule=lambda ms, func: None, cancel=lambda job: None)
+
+        def run(n):
+            for i in range(n):
+                store.update({'daily_enabled': bool(i % 2), 'daily_time': f"{i % 24:02d}:30"})
+                store.flush()
+                ConfigStore(path).load()
+        return _best_per_call(run, 200, repeats)
+
+
+class _FakeClock:
+    def __init__(self):
+        self.mono = 1000.0
+        self.wall = 1_700_000_000.0
+
+    def monotonic(self):
+        return self.mono
+
+    def time(self):
+        return self.wall
+
+
+def case_countdown_tick(repeats: int) -> float:
+    clock = _FakeClock()
+    cd = Countdown(monotonic=clock.monotonic, wall=clock.time)
+
+    def run(n):
+        cd.start(n + 10)
+        for _ in range(n):
+            _, delay = cd.tick()
+            clock.mono += delay / 1000.0
+            clock.wall += delay / 1000.0
+    return _best_per_call(run, 20_000, repeats)
+
+
+# ---- casos com processo novo -------------------------------------------------------------
+
+def case_cli_first_command(repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, ENTRY, 'schedule', '30m', '--simulate'],
+                              capture_output=True, text=True, cwd=ROOT)
+        samples.append((time.perf_counter() - t0) * 1000)
+        if proc.returncode != 0:
+            raise RuntimeError(f"cli saiu com código {proc.returncode}: {proc.stderr.strip()}")
+    return statistics.median(samples)
+
+
+GUI_PROBE = '''
+import os, sys
+sys.path.insert(0, {root!r})
+import gui
+from command_executor import FakeBackend
+
+tmp = {tmp!r}
+gui.default_config_path = lambda: os.path.join(tmp, 'config.json')
+gui.default_journal_path = lambda: os.path.join(tmp, 'schedule.journal')
+
+
+class ProbeBackend(FakeBackend):
+    def schedule(self, seconds, action='shutdown'):
+        completed = super().schedule(seconds, action)
+        print("comando", flush=True)
+        return completed
+
+
+app = gui.ShutdownScheduler(backend=ProbeBackend())
+seen = []
+
+
+def on_map(event):
+    if event.widget is app and not seen:
+        seen.append(True)
+        print("janela", flush=True)
+
+
+app.bind('<Map>', on_map, add='+')
+app.mainloop()
+'''
+
+
+def _gui_available(env) -> None:
+    try:
+        import customtkinter  # noqa: F401
+    except ImportError:
+        raise Skip("customtkinter não instalado")
+    if not env.get('DISPLAY') and sys.platform.startswith('linux'):
+        raise Skip("sem DISPLAY e sem Xvfb")
+
+
+def _probe_gui(env, repeats: int) -> dict:
+    """Mediana (ms) do início do processo até a janela aparecer e até o primeiro comando."""
+    _gui_available(env)
+    window, command = [], []
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory() as tmp:
+            # Regra diária daqui a 2h: a janela agenda sozinha ao abrir
+            at = time.localtime(time.time() + 7200)
+            with open(os.path.join(tmp, 'config.json'), 'w', encoding='utf-8') as f:
+                json.dump({'daily_enabled': True, 'daily_time': f"{at.tm_hour:02d}:{at.tm_min:02d}"}, f)
+            script = GUI_PROBE.format(root=ROOT, tmp=tmp)
+            t0 = time.perf_counter()
+            proc = subprocess.Popen([sys.executable, '-c', script], stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE, text=True, cwd=ROOT, env=env)
+            # Se a janela travar, o readline volta vazio quando o processo for morto
+            watchdog = threading.Timer(PROBE_TIMEOUT, proc.kill)
+            watchdog.start()
+            marks = {}
+            try:
+                while len(marks) < 2:
+                    line = proc.stdout.readline()
+                    if not line:
+                        break
+                    marks.setdefault(line.strip(), (time.perf_counter() - t0) * 1000)
+            finally:
+                watchdog.cancel()
+                proc.kill()
+                _, err = proc.communicate()
+            if 'janela' not in marks or 'comando' not in marks:
+                raise RuntimeError(f"a janela não respondeu: {err.strip()[-500:]}")
+            window.append(marks['janela'])
+            command.append(marks['comando'])
+    return {'gui_first_window': statistics.median(window), 'gui_first_command': statistics.median(command)}
+
+
+class VirtualDisplay:
+    """Sobe um Xvfb quando não há tela (Linux). Sem Xvfb, não faz nada."""
+
+    def __init__(self):
+        self.proc = None
+        self.env = dict(os.environ)
+
+    def __enter__(self):
+        if self.env.get('DISPLAY') or not sys.platform.startswith('linux') or not shutil.which('Xvfb'):
+            return self
+        for number in range(99, 120):
+            if os.path.exists(f"/tmp/.X{number}-lock"):
+                continue
+            self.proc = subprocess.Popen(['Xvfb', f":{number}", '-screen', '0', '1024x768x24', '-nolisten', 'tcp'],
+                                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            # Espera o socket aparecer
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline and not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+                time.sleep(0.05)
+            self.env['DISPLAY'] = f":{number}"
+            break
+        return self
+
+    def __exit__(self, *exc):
+        if self.proc is not None:
+            self.proc.terminate()
+            self.proc.wait()
+        return False
+
+
+# nome -> (unidade, tolerância)
+CASES = {
+    'seconds_until_time': ('us', TOLERANCE_INPROC),
+    'preview_refresh': ('us', TOLERANCE_INPROC),
+    'config_roundtrip': ('us', TOLERANCE_PROCESS),   # depende do fsync do disco
+    'countdown_tick': ('us', TOLERANCE_INPROC),
+    'cli_first_command': ('ms', TOLERANCE_PROCESS),
+    'gui_first_window': ('ms', TOLERANCE_PROCESS),
+    'gui_first_command': ('ms', TOLERANCE_PROCESS),
+}
+INPROC = {
+    'seconds_until_time': case_seconds_until_time,
+    'preview_refresh': case_preview_refresh,
+    'config_roundtrip': case_config_roundtrip,
+    'countdown_tick': case_countdown_tick,
+}
+
+
+def run_suite(only=None, repeats: int = 7, process_repeats: int = 5) -> dict:
+    """Retorna {caso: valor} (ou {caso: 'pulado: motivo'})."""
+    wanted = [name for name in CASES if not only or name in only]
+    results = {}
+    for name in wanted:
+        if name in INPROC:
+            results[name] = INPROC[name](repeats)
+    if 'cli_first_command' in wanted:
+        results['cli_first_command'] = case_cli_first_command(process_repeats)
+    gui_cases = [n for n in wanted if n.startswith('gui_')]
+    if gui_cases:
+        with VirtualDisplay() as display:
+            try:
+                probed = _probe_gui(display.env, process_repeats)
+            except Skip as e:
+                probed = {n: f"pulado: {e}" for n in gui_cases}
+        for name in gui_cases:
+            results[name] = probed[name]
+    return results
+
+
+def load_baseline(path: str) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def compare(results: dict, baseline: dict) -> list:
+    """Linhas do relatório: (caso, texto, regrediu?)."""
+    cases = baseline.get('cases', {})
+    rows = []
+    for name, value in results.items():
+        unit = CASES[name][0]
+        if isinstance(value, str):
+            rows.append((name, value, False))
+            continue
+        base = cases.get(name)
+        if base is None:
+            rows.append((name, f"{value:10.2f} {unit}  (sem linha de base)", False))
+            continue
+        limit = base['value'] * (1 + base['tolerance'])
+        change = (value / base['value'] - 1) * 100 if base['value'] else 0.0
+        regressed = value > limit
+        rows.append((name, f"{value:10.2f} {unit}  base {base['value']:.2f} ({change:+.0f}%, "
+                           f"limite {limit:.2f})", regressed))
+    return rows
+
+
+def update_baseline(path: str, results: dict, baseline: dict):
+    cases = dict(baseline.get('cases', {}))
+    for name, value in results.items():
+        if isinstance(value, str):
+            continue
+        unit, tolerance = CASES[name]
+        # Tolerâncias ajustadas à mão na linha de base são preservadas
+        tolerance = cases.get(name, {}).get('tolerance', tolerance)
+        cases[name] = {'value': round(value, 3), 'unit': unit, 'tolerance': tolerance}
+    data = {
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'processor': platform.machine()},
+        'updated': time.strftime('%Y-%m-%d'),
+        'cases': {name: cases[name] for name in CASES if name in cases},
+    }
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--update', action='store_true', help="regrava a linha de base com os resultados")
+    parser.add_argument('--only', nargs='+', choices=sorted(CASES), help="roda só estes casos")
+    parser.add_argument('--repeats', type=int, default=7)
+    parser.add_argument('--process-repeats', type=int, default=5)
+    parser.add_argument('--json', help="grava os resultados brutos neste arquivo")
+    args = parser.parse_args()
+
+    results = run_suite(args.only, args.repeats, args.process_repeats)
+    baseline = load_baseline(args.baseline)
+    rows = compare(results, baseline)
+    width = max(len(name) for name, _, _ in rows)
+    for name, text, regressed in rows:
+        print(f"[{'REGRESSÃO' if regressed else 'ok'}] {name:<{width}} {text}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.update:
+        update_baseline(args.baseline, results, baseline)
+        print(f"linha de base gravada em {os.path.relpath(args.baseline)}")
+        return 0
+    return 1 if any(regressed for _, _, regressed in rows) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
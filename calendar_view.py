@@ -0,0 +1,121 @@
+"""Janela de calendário: grade do mês com os desligamentos previstos pelas regras recorrentes.
+
+Carregada só quando o botão "Calendário" é usado. A projeção do mês vem de `projection`
+(uma chamada por mês exibido) e os 42 rótulos da grade são criados uma vez e só
+reconfigurados ao trocar de mês. Erros e o resultado da exportação vão para os avisos da
+janela principal (`master.notify`), sem caixas modais.
+"""
+import calendar
+import datetime
+from tkinter import filedialog
+
+import customtkinter as ctk
+
+import projection
+from recurrence import rules_from_config
+
+
+MONTHS = ("Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", "Julho", "Agosto",
+          "Setembro", "Outubro", "Novembro", "Dezembro")
+WEEKDAY_HEADERS = ("Dom", "Seg", "Ter", "Qua", "Qui", "Sex", "Sáb")
+# Horários mostrados por dia antes do "+N"
+MAX_TIMES = 3
+
+
+class CalendarWindow(ctk.CTkToplevel):
+    def __init__(self, master, config):
+        super().__init__(master)
+        self.title("Calendário de desligamentos")
+        self.resizable(False, False)
+        self.config_store = config
+        today = datetime.date.today()
+        self.year, self.month = today.year, today.month
+        self._cache = {}  # (ano, mês) -> Projection
+
+        header = ctk.CTkFrame(self)
+        header.pack(fill="x", padx=8, pady=(8, 4))
+        ctk.CTkButton(header, text="◀", width=32, command=lambda: self._move(-1)).pack(side="left")
+        self.title_label = ctk.CTkLabel(header, text="", width=160)
+        self.title_label.pack(side="left", padx=6)
+        ctk.CTkButton(header, text="▶", width=32, command=lambda: self._move(1)).pack(side="left")
+        ctk.CTkButton(header, text="Exportar CSV", width=110, command=self.on_export).pack(side="right")
+
+        grid = ctk.CTkFrame(self)
+        grid.pack(padx=8, pady=(0, 4))
+        for col, name in enumerate(WEEKDAY_HEADERS):
+            ctk.CTkLabel(grid, text=name, width=72).grid(row=0, column=col)
+        self.cells = []
+        for row in range(6):
+            for col in range(7):
+                cell = ctk.CTkLabel(grid, text="", width=72, height=64, anchor="nw", justify="left",
+                                    corner_radius=4)
+                cell.grid(row=row + 1, column=col, padx=1, pady=1)
+                self.cells.append(cell)
+        self.summary_label = ctk.CTkLabel(self, text="")
+        self.summary_label.pack(pady=(0, 8))
+        self.refresh()
+
+    def _rules(self):
+        return rules_from_config(self.config_store.load())
+
+    def _projection(self):
+        key = (self.year, self.month)
+        proj = self._cache.get(key)
+        if proj is None:
+            proj = self._cache[key] = projection.project(self._rules(), *projection.month_bounds(*key))
+        return proj
+
+    def reload(self):
+        """Relê as regras (o config.json pode ter mudado) e redesenha."""
+        self._cache.clear()
+        self.refresh()
+
+    def _move(self, delta: int):
+        index = self.year * 12 + self.month - 1 + delta
+        self.year, self.month = divmod(index, 12)
+        self.month += 1
+        self.refresh()
+
+    def refresh(self):
+        self.title_label.configure(text=f"{MONTHS[self.month - 1]} de {self.year}")
+        try:
+            proj = self._projection()
+        except ValueError as e:
+            # Sem projeção a grade ficaria com o mês anterior: limpa e explica no próprio calendário
+            for label in self.cells:
+                label.configure(text="", fg_color="transparent")
+            self.summary_label.configure(text=f"Regra inválida no config.json: {e}")
+            self.master.notify('error', f"Calendário: regra inválida no config.json: {e}", key='calendar')
+            return
+        weeks = projection.month_grid(proj, self.year, self.month, calendar.SUNDAY)
+        cells = [cell for week in weeks for cell in week]
+        cells += [None] * (len(self.cells) - len(cells))
+        total = 0
+        for label, cell in zip(self.cells, cells):
+            if cell is None:
+                label.configure(text="", fg_color="transparent")
+                continue
+            day, times = cell
+            total += len(times)
+            shown = times[:MAX_TIMES]
+            if len(times) > MAX_TIMES:
+                shown.append(f"+{len(times) - MAX_TIMES}")
+            label.configure(text="\n".join([str(day)] + shown),
+                            fg_color=("#dbe7f5", "#1f3a5a") if times else "transparent")
+        self.summary_label.configure(text=f"{total} desligamentos previstos no mês" if total
+                                     else "Nenhum desligamento recorrente neste mês")
+
+    def on_export(self):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".csv",
+                                            initialfile=f"desligamentos-{self.year}-{self.month:02d}.csv",
+                                            filetypes=[("CSV", "*.csv")])
+        if not path:
+            return
+        # Só o mês exibido, pelo horário local de cada regra (a projeção tem 1 dia de folga)
+        try:
+            month = self._projection().local_between(*projection.month_local_range(self.year, self.month))
+            rows = projection.write_csv(month, path)
+        except (OSError, ValueError) as e:
+            self.master.notify('error', f"Falha ao exportar o calendário: {e}", key='calendar-export')
+            return
+        self.master.notify('info', f"{rows} desligamentos exportados para {path}.", key='calendar-export')
@@ -0,0 +1,304 @@
+"""Linha de comando do agendador (não carrega tkinter/customtkinter).
+
+Uso:
+    python shutdown_scheduler.py schedule 30m        (também 90s, 2h ou só o número = minutos)
+    python shutdown_scheduler.py schedule --at 22:30
+    python shutdown_scheduler.py schedule 2h --action restart   (restart, hibernate, logoff)
+    python shutdown_scheduler.py cancel
+    python shutdown_scheduler.py status
+    python shutdown_scheduler.py next
+    python shutdown_scheduler.py project [--days 30] [--csv ARQ] [--hosts frota.json]
+    python shutdown_scheduler.py daemon             (serviço residente para as regras recorrentes)
+    python shutdown_scheduler.py hooks [--run]      (lista/testa os ganchos pré-desligamento)
+"""
+import argparse
+import datetime
+import re
+import sys
+import time
+
+import metrics
+from action_queue import ACTION_LABELS, ActionQueue
+from command_executor import FakeBackend, ShutdownBackend, TIMED_ACTIONS
+from config_store import ConfigStore, default_config_path
+from recurrence import RecurrenceIndex, rules_from_config
+from schedule_engine import seconds_for_value, seconds_until_time
+from schedule_journal import ScheduleJournal, default_journal_path
+from shutdown_hooks import arm_slack, pipeline_from_config
+
+
+UNIT_MODES = {'s': "Segundos", 'm': "Minutos", 'h': "Horas"}
+DURATION_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*$', re.IGNORECASE)
+
+
+def parse_duration(text: str) -> int:
+    """'90s', '30m', '2h' ou '45' (minutos, como o padrão da janela) -> segundos."""
+    match = DURATION_RE.match(text)
+    if not match:
+        raise ValueError(f"Duração inválida: {text!r} (use, por exemplo, 90s, 30m ou 2h)")
+    value, unit = match.groups()
+    return seconds_for_value(UNIT_MODES[(unit or 'm').lower()], value)
+
+
+def schedule_seconds(args) -> int:
+    """Segundos até o desligamento pedido em `schedule` (duração ou --at). Lança ValueError."""
+    if not (args.duration or args.at):
+        raise ValueError("informe a duração ou --at HH:MM")
+    seconds = seconds_until_time(args.at) if args.at else parse_duration(args.duration)
+    if seconds <= 0:
+        raise ValueError("o tempo deve ser positivo")
+    return seconds
+
+
+def _fmt_target(seconds: float) -> str:
+    # Arredonda para o minuto mais próximo (os segundos são truncados ao converter HH:MM)
+    return (datetime.datetime.now() + datetime.timedelta(seconds=seconds + 30)).strftime('%d/%m %H:%M')
+
+
+def _backend(args):
+    return FakeBackend() if args.simulate else ShutdownBackend()
+
+
+def _report_failure(completed, command: str) -> int:
+    print(f"{command} retornou código {completed.returncode}.", file=sys.stderr)
+    for out in (completed.stdout, completed.stderr):
+        if out:
+            print(out.strip(), file=sys.stderr)
+    return 1
+
+
+def cmd_schedule(args) -> int:
+    try:
+        seconds = schedule_seconds(args)
+    except ValueError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 2
+
+    pipeline = None
+    if not args.simulate:
+        # Simulação não roda os ganchos (podem parar serviços); use `hooks --run` para testá-los
+        cfg = ConfigStore(default_config_path()).load()
+        # Sem servidor nem thread de gravação: o processo termina logo e grava no disable()
+        metrics.configure(cfg, serve=False, flusher=False)
+        try:
+            pipeline = pipeline_from_config(cfg)
+        except (ValueError, ImportError, AttributeError) as e:
+            print(f"Erro nos ganchos do config.json: {e}", file=sys.stderr)
+            return 1
+    # Com ganchos, o Windows fica armado com a folga deles; quem os roda no horário é a janela.
+    # Sem ela aberta, o desligamento sai ao fim da folga, sem os ganchos
+    slack = arm_slack(pipeline)
+    journal = None
+    queue = ActionQueue(_backend(args))
+    if not args.simulate:
+        # As ações já agendadas continuam na fila; o Windows só é acionado se a próxima mudar
+        journal = ScheduleJournal(default_journal_path())
+        now = time.time()
+        for rid, (action, deadline) in journal.replay().items():
+            if deadline > now:
+                queue.restore(action, deadline, slack=slack)
+            else:
+                journal.fire(rid)
+    requested_at = time.time()
+    try:
+        completed = queue.schedule(seconds, args.action, slack=slack)
+    except FileNotFoundError as e:
+        metrics.event('error', where='cli.schedule', error=repr(e))
+        if journal is not None:
+            journal.close()
+        print("Erro: comando 'shutdown' não encontrado. Este script foi feito para Windows.", file=sys.stderr)
+        return 1
+    if completed.returncode != 0:
+        if journal is not None:
+            journal.close()
+        metrics.event('error', where='cli.schedule', returncode=completed.returncode)
+        return _report_failure(completed, "shutdown")
+    metrics.event('scheduled', source='cli', action=args.action, seconds=seconds,
+                  slack=slack)
+
+    if journal is not None:
+        try:
+            journal.schedule(requested_at + seconds, args.action)
+        finally:
+            journal.close()
+    label = ACTION_LABELS[args.action]
+    prefix = f"Simulação: {label.lower()}" if args.simulate else label
+    print(f"{prefix}: agendado em {seconds} segundos ({_fmt_target(seconds)}).")
+    if slack:
+        print(f"Ganchos pré-desligamento: rodam no horário com a janela aberta; "
+              f"sem ela, o Windows desliga {int(slack)}s depois, sem os ganchos.")
+    nxt = queue.next()
+    if nxt is not None and (nxt.action != args.action or queue.next_deadline() < requested_at + seconds - 1):
+        print(f"Antes disso: {ACTION_LABELS[nxt.action].lower()} em {_fmt_target(queue.next_deadline() - time.time())}.")
+    if args.action not in TIMED_ACTIONS:
+        print("O Windows não agenda esta ação: deixe a janela do app aberta para executá-la no horário.")
+    return 0
+
+
+def cmd_cancel(args) -> int:
+    try:
+        completed = _backend(args).cancel()
+    except FileNotFoundError:
+        print("Erro: comando 'shutdown' não encontrado. Este script foi feito para Windows.", file=sys.stderr)
+        return 1
+    if completed.returncode != 0:
+        return _report_failure(completed, "shutdown -a")
+    if not args.simulate:
+        journal = ScheduleJournal(default_journal_path())
+        try:
+            for rid in journal.replay():
+                journal.cancel(rid)
+        finally:
+            journal.close()
+    print("Solicitação de desligamento cancelada (shutdown -a).")
+    return 0
+
+
+def cmd_status(args) -> int:
+    pending = ScheduleJournal(default_journal_path()).replay()
+    now = time.time()
+    future = sorted((deadline, action) for action, deadline in pending.values() if deadline > now)
+    if not future:
+        print("Nenhum desligamento pendente agendado pelo app.")
+        return 0
+    for deadline, action in future:
+        remaining = int(deadline - now)
+        hrs, rem = divmod(remaining, 3600)
+        mins, secs = divmod(rem, 60)
+        print(f"{ACTION_LABELS.get(action, action)} em {hrs}h {mins}m {secs}s ({_fmt_target(remaining)}).")
+    return 0
+
+
+def cmd_next(args) -> int:
+    try:
+        rules = rules_from_config(ConfigStore(default_config_path()).load())
+    except ValueError as e:
+        print(f"Erro na configuração: {e}", file=sys.stderr)
+        return 1
+    nxt = RecurrenceIndex(rules).next()
+    if nxt is None:
+        print("Nenhuma regra de desligamento recorrente ativa.")
+        return 0
+    when = datetime.datetime.fromtimestamp(nxt[0])
+    print(f"Próximo desligamento recorrente: {when.strftime('%d/%m/%Y %H:%M')} (em {int(nxt[0] - time.time())} segundos).")
+    return 0
+
+
+def cmd_hooks(args) -> int:
+    try:
+        pipeline = pipeline_from_config(ConfigStore(default_config_path()).load())
+    except (ValueError, ImportError, AttributeError) as e:
+        print(f"Erro nos ganchos do config.json: {e}", file=sys.stderr)
+        return 1
+    if pipeline is None:
+        print("Nenhum gancho pré-desligamento configurado.")
+        return 0
+    if not args.run:
+        for hook in pipeline.hooks:
+            what = ' '.join(hook.command) if isinstance(hook.command, list) else hook.command or 'função Python'
+            deps = f", depois de {', '.join(hook.after)}" if hook.after else ''
+            kind = 'obrigatório' if hook.required else 'opcional'
+            print(f"{hook.name}: {what} ({kind}, limite {hook.timeout:g}s{deps})")
+        print(f"prazo global: {pipeline.deadline:g}s")
+        return 0
+    report = pipeline.run()
+    for line in report.lines():
+        print(line)
+    return 0 if report.ok else 1
+
+
+def cmd_project(args) -> int:
+    # Import adiado: a projeção pode carregar o NumPy
+    import projection
+
+    start = time.time()
+    end = start + args.days * 86400
+    try:
+        if args.hosts:
+            import json
+            with open(args.hosts, 'r', encoding='utf-8') as f:
+                proj = projection.project_hosts(json.load(f), start, end)
+        else:
+            proj = projection.project(rules_from_config(ConfigStore(default_config_path()).load()), start, end)
+    except (OSError, ValueError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    if args.csv:
+        rows = projection.write_csv(proj, args.csv)
+        print(f"{rows} desligamentos previstos nos próximos {args.days} dias exportados para {args.csv}.")
+        return 0
+    if not len(proj):
+        print(f"Nenhum desligamento previsto nos próximos {args.days} dias.")
+        return 0
+    for i, (host, rule, _, local) in enumerate(proj.rows()):
+        if i == args.limit:
+            print(f"... e mais {len(proj) - i} (use --csv para exportar tudo)")
+            break
+        tz = proj.rules[rule].tz
+        zone = f" {tz.key}" if tz is not None else ''
+        where = f"  {host}" if host else ''
+        print(f"{local:%d/%m/%Y %H:%M}{zone} ({projection.WEEKDAY_SHORT[local.weekday()]}){where}")
+    return 0
+
+
+def cmd_daemon(args) -> int:
+    from daemon import run_daemon
+    return run_daemon(FakeBackend() if args.simulate else None, lead=args.lead, max_sleep=args.max_sleep,
+                      simulate=args.simulate)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='shutdown_scheduler', description="Agendador de desligamento do Windows")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('schedule', help="agenda o desligamento")
+    p.add_argument('duration', nargs='?', help="tempo até desligar: 90s, 30m, 2h (padrão: minutos)")
+    p.add_argument('--at', metavar='HH:MM', help="horário específico (24h)")
+    p.add_argument('--action', choices=list(ACTION_LABELS), default='shutdown',
+                   help="ação no horário (padrão: shutdown)")
+    p.add_argument('--simulate', action='store_true', help="não executa o shutdown")
+    p.set_defaults(func=cmd_schedule)
+
+    p = sub.add_parser('cancel', help="cancela o desligamento (shutdown -a)")
+    p.add_argument('--simulate', action='store_true', help="não executa o shutdown")
+    p.set_defaults(func=cmd_cancel)
+
+    p = sub.add_parser('status', help="mostra o desligamento pendente")
+    p.set_defaults(func=cmd_status)
+
+    p = sub.add_parser('next', help="mostra a próxima ocorrência das regras recorrentes")
+    p.set_defaults(func=cmd_next)
+
+    p = sub.add_parser('project', help="lista os desligamentos previstos pelas regras recorrentes")
+    p.add_argument('--days', type=int, default=30, help="quantos dias à frente (padrão: 30)")
+    p.add_argument('--csv', metavar='ARQUIVO', help="exporta a projeção para CSV")
+    p.add_argument('--hosts', metavar='ARQUIVO', help="simula uma frota: JSON {\"maquina\": {config}, ...}")
+    p.add_argument('--limit', type=int, default=50, help="máximo de linhas listadas (padrão: 50)")
+    p.set_defaults(func=cmd_project)
+
+    p = sub.add_parser('hooks', help="lista os ganchos pré-desligamento do config.json")
+    p.add_argument('--run', action='store_true', help="executa os ganchos agora (sem desligar) e mostra o relatório")
+    p.set_defaults(func=cmd_hooks)
+
+    p = sub.add_parser('daemon', help="roda em segundo plano armando os desligamentos recorrentes")
+    p.add_argument('--lead', type=float, default=60, help="antecedência (s) com que o shutdown é enviado")
+    p.add_argument('--max-sleep', type=float, default=900, help="intervalo máximo (s) entre verificações de relógio/config")
+    p.add_argument('--simulate', action='store_true', help="não executa o shutdown")
+    p.set_defaults(func=cmd_daemon)
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'schedule' and not (args.duration or args.at):
+        parser.error("informe a duração ou --at HH:MM")
+    try:
+        return args.func(args)
+    finally:
+        # Grava os eventos pendentes (no-op se as métricas não foram ligadas)
+        metrics.disable()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
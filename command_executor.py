@@ -0,0 +1,142 @@
+import os
+import queue
+import subprocess
+import time
+
+import metrics
+
+
+# Ações com timer do próprio Windows (`-t`) e ações imediatas (o app espera o prazo)
+TIMED_ACTIONS = {'shutdown': '-s', 'restart': '-r'}
+IMMEDIATE_ACTIONS = {'hibernate': '-h', 'logoff': '-l'}
+
+
+def find_shutdown_exe() -> str:
+    """Tenta localizar o executável shutdown.exe de forma robusta.
+
+    Em builds 32-bit em Windows 64-bit, `System32` pode ser redirecionado. Tenta `Sysnative`,
+    depois `System32` e por fim retorna empty string para fallback ao nome simples.
+    """
+    windir = os.environ.get('WINDIR', r'C:\Windows')
+    candidates = [
+        os.path.join(windir, 'Sysnative', 'shutdown.exe'),
+        os.path.join(windir, 'System32', 'shutdown.exe'),
+        os.path.join(windir, 'System32', 'shutdown.com'),
+    ]
+    for p in candidates:
+        try:
+            if os.path.exists(p):
+                return p
+        except Exception:
+            continue
+    return ""
+
+
+class ShutdownBackend:
+    """Backend real: chama o `shutdown` do Windows.
+
+    O caminho do executável é resolvido uma única vez e reaproveitado nas chamadas seguintes.
+    """
+
+    def __init__(self):
+        self._exe = None
+
+    def executable(self) -> str:
+        if self._exe is None:
+            # fallback para chamada pelo nome (depende do PATH)
+            self._exe = find_shutdown_exe() or "shutdown"
+        return self._exe
+
+    def run(self, args):
+        with metrics.timed('command_seconds', args[0] if args else None):
+            return subprocess.run([self.executable(), *args], capture_output=True, text=True)
+
+    def schedule(self, seconds: int, action: str = 'shutdown'):
+        return self.run([TIMED_ACTIONS[action], "-t", str(int(seconds))])
+
+    def run_now(self, action: str):
+        return self.run([IMMEDIATE_ACTIONS.get(action) or TIMED_ACTIONS[action]])
+
+    def cancel(self):
+        return self.run(["-a"])
+
+
+class FakeBackend(ShutdownBackend):
+    """Backend falso para testes/Linux: não executa nada, apenas registra as chamadas.
+
+    `latency` simula um `shutdown.exe` lento (elevação, antivírus, sistema ocupado).
+    """
+
+    def __init__(self, latency: float = 0.0, returncode: int = 0):
+        super().__init__()
+        self.latency = latency
+        self.returncode = returncode
+        self.calls = []
+
+    def executable(self) -> str:
+        return "shutdown"
+
+    def run(self, args):
+        with metrics.timed('command_seconds', args[0] if args else None):
+            if self.latency > 0:
+                time.sleep(self.latency)
+        self.calls.append(list(args))
+        return subprocess.CompletedProcess([self.executable(), *args], self.returncode, '', '')
+
+
+class CommandExecutor:
+    """Executa comandos do backend fora da thread da interface.
+
+    Um único worker garante que agendar e cancelar sejam serializados (nunca correm em paralelo).
+    Os resultados ficam numa fila e são entregues por `poll()`, que deve ser chamado pela
+    thread da interface (ex.: via `after()` do Tk); assim os callbacks podem mexer em widgets.
+    """
+
+    def __init__(self, backend=None):
+        # Import adiado: concurrent.futures puxa logging e pesa na partida da linha de comando
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.backend = backend if backend is not None else ShutdownBackend()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shutdown-cmd')
+        self._results = queue.Queue()
+        self._pending = 0
+
+    def submit(self, action, *args, callback=None, **kwargs):
+        """Enfileira `backend.<action>(*args)`; `callback(result, error)` roda no próximo `poll()`.
+
+        `action` também pode ser uma função, executada no mesmo worker (ex.: ganchos + shutdown).
+        """
+        func = action if callable(action) else getattr(self.backend, action)
+        self._pending += 1
+        future = self._pool.submit(func, *args, **kwargs)
+        future.add_done_callback(lambda f: self._results.put((callback, f)))
+        return future
+
+    def schedule(self, seconds: int, callback=None, **kwargs):
+        return self.submit('schedule', int(seconds), callback=callback, **kwargs)
+
+    def cancel(self, callback=None):
+        return self.submit('cancel', callback=callback)
+
+    def pending(self) -> int:
+        return self._pending
+
+    def poll(self) -> int:
+        """Entrega os resultados prontos aos callbacks. Retorna quantos foram processados."""
+        handled = 0
+        while True:
+            try:
+                callback, future = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            handled += 1
+            error = future.exception()
+            result = None if error is not None else future.result()
+            if callback is not None:
+                with metrics.timed('ui_callback_seconds', 'command_result'):
+                    callback(result, error)
+        return handled
+
+    def close(self, wait: bool = False):
+        self._pool.shutdown(wait=wait)
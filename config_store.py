@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+
+import metrics
+
+
+def default_config_path() -> str:
+    """Caminho do `config.json` (ao lado dos módulos do app)."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
+
+
+def _timer_schedule(delay_ms: int, func):
+    t = threading.Timer(delay_ms / 1000.0, func)
+    t.daemon = True
+    t.start()
+    return t
+
+
+def _timer_cancel(job):
+    job.cancel()
+
+
+class ConfigStore:
+    """Cópia em memória do `config.json` com recarga sob demanda e gravação atômica.
+
+    - `load()` só relê o arquivo se o mtime ou o tamanho mudou desde a última leitura/gravação.
+    - `update()` altera a cópia em memória e agenda uma única gravação após `delay_ms`;
+      várias chamadas seguidas viram uma só escrita.
+    - A gravação usa arquivo temporário + `os.replace`, então uma queda no meio não
+      deixa o arquivo corrompido.
+
+    `schedule(delay_ms, func)`/`cancel(job)` definem como o flush adiado é disparado
+    (padrão: `threading.Timer`; na interface use `after`/`after_cancel` do Tk).
+    """
+
+    def __init__(self, path: str, delay_ms: int = 500, schedule=None, cancel=None, on_error=None):
+        self.path = path
+        self.delay_ms = delay_ms
+        self.schedule = schedule or _timer_schedule
+        self.cancel = cancel or _timer_cancel
+        self.on_error = on_error
+        self._data = {}
+        self._signature = None
+        self._dirty = False
+        self._job = None
+        self._lock = threading.RLock()
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def load(self) -> dict:
+        """Retorna a configuração atual (cópia), relendo o arquivo apenas se ele mudou."""
+        with self._lock:
+            if self._dirty:
+                # Alterações locais ainda não gravadas têm prioridade
+                return dict(self._data)
+            sig = self._stat_signature()
+            if sig != self._signature:
+                data = {}
+                if sig is not None:
+                    try:
+                        with metrics.timed('config_io_seconds', 'load'):
+                            with open(self.path, 'r', encoding='utf-8') as f:
+                                data = json.load(f)
+                    except Exception as e:
+                        metrics.event('error', where='config.load', error=repr(e))
+                        data = {}
+                self._data = data if isinstance(data, dict) else {}
+                self._signature = sig
+            return dict(self._data)
+
+    def get(self, key, default=None):
+        return self.load().get(key, default)
+
+    def update(self, cfg: dict):
+        """Mescla `cfg` na configuração e agenda a gravação adiada."""
+        with self._lock:
+            if not self._dirty:
+                self.load()
+            self._data.update(cfg)
+            self._dirty = True
+            if self._job is None:
+                self._job = self.schedule(self.delay_ms, self._flush_from_timer)
+
+    def _flush_from_timer(self):
+        with self._lock:
+            self._job = None
+        try:
+            self.flush()
+        except Exception as e:
+            if self.on_error is not None:
+                self.on_error(e)
+
+    def flush(self):
+        """Grava imediatamente se houver alterações pendentes. Lança OSError em caso de falha."""
+        with self._lock:
+            if self._job is not None:
+                try:
+                    self.cancel(self._job)
+                except Exception:
+                    pass
+                self._job = None
+            if not self._dirty:
+                return
+            # Temporário no mesmo diretório (os.replace precisa do mesmo volume)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with metrics.timed('config_io_seconds', 'save'):
+                    with open(tmp, 'w', encoding='utf-8') as f:
+                        json.dump(self._data, f, ensure_ascii=False, indent=2)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp, self.path)
+            except Exception:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                raise
+            self._dirty = False
+            self._signature = self._stat_signature()
+
+    def close(self):
+        try:
+            self.flush()
+        except Exception as e:
+            if self.on_error is not None:
+                self.on_error(e)
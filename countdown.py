@@ -0,0 +1,99 @@
+import math
+import time
+
+import metrics
+
+
+# Diferença (s) entre o avanço do relógio de parede e do monotônico que indica suspensão/retomada
+JUMP_THRESHOLD = 2.0
+
+
+def format_remaining(seconds: int) -> str:
+    hrs, rem = divmod(int(seconds), 3600)
+    mins, secs = divmod(rem, 60)
+    return f"Contagem: {hrs}h {mins}m {secs}s"
+
+
+class Countdown:
+    """Contagem regressiva ancorada num prazo absoluto.
+
+    Em vez de decrementar um contador a cada tick (o que acumula o atraso dos timers do Tk),
+    guarda o prazo em `time.monotonic()` e em relógio de parede e recalcula o tempo restante
+    a cada tick. Se o relógio de parede avançar bem mais que o monotônico (suspensão e
+    retomada em sistemas onde o monotônico para), ressincroniza pelo prazo de parede.
+    """
+
+    def __init__(self, monotonic=time.monotonic, wall=time.time):
+        self.monotonic = monotonic
+        self.wall = wall
+        self.deadline = None
+        self.wall_deadline = None
+        self.resyncs = 0
+        self._last_mono = None
+        self._last_wall = None
+        self._last_text = None
+        self._expected = None  # instante (monotônico) previsto para o próximo tick
+
+    @property
+    def active(self) -> bool:
+        return self.deadline is not None
+
+    def start(self, seconds: float):
+        mono = self.monotonic()
+        wall = self.wall()
+        self.deadline = mono + seconds
+        self.wall_deadline = wall + seconds
+        self._last_mono = mono
+        self._last_wall = wall
+        self._last_text = None
+        self._expected = None
+
+    def stop(self):
+        self.deadline = None
+        self.wall_deadline = None
+        self._last_text = None
+        self._expected = None
+
+    def remaining(self) -> float:
+        """Segundos restantes (fracionários), já considerando saltos de relógio."""
+        if self.deadline is None:
+            return 0.0
+        mono = self.monotonic()
+        wall = self.wall()
+        skew = (wall - self._last_wall) - (mono - self._last_mono)
+        if skew > JUMP_THRESHOLD:
+            # Monotônico parou enquanto o sistema dormia: o prazo real é o de parede
+            self.deadline = mono + (self.wall_deadline - wall)
+            self.resyncs += 1
+        elif skew < -JUMP_THRESHOLD:
+            # Relógio de parede foi ajustado para trás: confia no monotônico
+            self.wall_deadline = wall + (self.deadline - mono)
+            self.resyncs += 1
+        self._last_mono = mono
+        self._last_wall = wall
+        return max(0.0, self.deadline - mono)
+
+    def tick(self):
+        """Recalcula o restante. Retorna (texto, atraso_ms_até_o_próximo_tick).
+
+        O texto é None quando não mudou desde o último tick (não precisa redesenhar);
+        o atraso é None quando a contagem terminou.
+        """
+        remaining = self.remaining()
+        if self._expected is not None:
+            # Atraso do timer do Tk em relação ao tick pedido
+            metrics.observe('countdown_drift_seconds', max(0.0, self._last_mono - self._expected))
+        shown = math.ceil(remaining)
+        if shown <= 0:
+            text = "Contagem: 0s"
+            self.deadline = None
+            delay = None
+        else:
+            text = format_remaining(shown)
+            # Próximo tick na virada do segundo exibido (+1 ms para não cair antes dela)
+            delay = int((remaining - (shown - 1)) * 1000) + 1
+        self._expected = None if delay is None else self._last_mono + delay / 1000.0
+        if text == self._last_text:
+            return None, delay
+        self._last_text = text
+        return text, delay
@@ -0,0 +1,298 @@
+"""Modo serviço: mantém os desligamentos recorrentes armados sem a janela aberta.
+
+Não carrega Tk. Dorme até o próximo prazo (sem consulta por segundo), arma o `shutdown`
+do Windows `lead` segundos antes de cada ocorrência, registra no diário e já calcula a
+ocorrência seguinte. Com ganchos pré-desligamento, o Windows fica armado com a folga deles
+e o serviço os roda no horário, antes de mandar desligar de imediato. Acorda no máximo a cada `max_sleep` segundos para perceber suspensão
+e retomada, mudanças no relógio e alterações no `config.json`.
+
+Com o modo ocioso (`idle` no config.json) ligado, só amostra a atividade nos minutos que
+antecedem cada ocorrência; se o sistema estiver ocupado, adia o desligamento até ele
+ficar quieto (ou desiste depois de `max_defer_minutes`).
+"""
+import datetime
+import signal
+import sys
+import threading
+import time
+
+import metrics
+from action_queue import ActionQueue
+from activity import IdleMonitor
+from command_executor import ShutdownBackend, TIMED_ACTIONS
+from config_store import ConfigStore, default_config_path
+from recurrence import RecurrenceIndex, rules_from_config
+from schedule_journal import ScheduleJournal, default_journal_path
+from shutdown_hooks import arm_slack, fire_with_hooks, pipeline_from_config
+
+
+# Com quanta antecedência o comando do Windows é enviado (ele avisa o usuário nesse intervalo)
+DEFAULT_LEAD = 60
+# Sono máximo entre verificações de relógio/config (4 despertares por hora quando ocioso)
+DEFAULT_MAX_SLEEP = 900
+# Diferença entre relógio de parede e monotônico que indica suspensão ou ajuste de hora
+JUMP_THRESHOLD = 5.0
+
+
+def log(msg: str):
+    print(f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}", file=sys.stderr, flush=True)
+
+
+class SchedulerDaemon:
+    """Serviço residente. Os desligamentos pendentes (os do diário e os que ele arma) ficam numa
+    `ActionQueue`, como na janela: o Windows tem um único timer e ele sempre aponta para o
+    mais próximo. `use_journal=False` (simulação) não lê nem grava o diário."""
+
+    def __init__(self, backend=None, config=None, journal=None, lead: float = DEFAULT_LEAD,
+                 max_sleep: float = DEFAULT_MAX_SLEEP, monotonic=time.monotonic, wall=time.time,
+                 use_journal: bool = True):
+        self.backend = backend if backend is not None else ShutdownBackend()
+        self.config = config if config is not None else ConfigStore(default_config_path())
+        if not use_journal:
+            self.journal = None
+        else:
+            self.journal = journal if journal is not None else ScheduleJournal(default_journal_path())
+        self.actions = ActionQueue(self.backend, clock=wall)
+        self._rids = {}  # id na fila -> id no diário
+        self._hooked = set()  # ids na fila cujos ganchos este serviço roda no prazo
+        self.lead = lead
+        self.max_sleep = max_sleep
+        self.monotonic = monotonic
+        self.wall = wall
+        self.wakeups = 0
+        self.fires = 0
+        self.resyncs = 0
+        self._stop = threading.Event()
+        self._cfg = None
+        self._index = None
+        self._idle = None
+        self._deferred = None  # horário original de uma ocorrência adiada por atividade
+
+    def stop(self):
+        self._stop.set()
+
+    def _reload(self, force: bool = False):
+        cfg = self.config.load()
+        if force or cfg != self._cfg:
+            self._cfg = cfg
+            try:
+                metrics.configure(cfg)
+            except (OSError, ValueError, TypeError) as e:
+                log(f"métricas indisponíveis: {e}")
+            try:
+                self._index = RecurrenceIndex(rules_from_config(cfg), now=self.wall())
+            except ValueError as e:
+                log(f"regra inválida no config.json: {e}")
+                self._index = RecurrenceIndex()
+            if self._idle is not None:
+                self._idle.close()
+            try:
+                self._idle = IdleMonitor.from_config(cfg)
+            except (OSError, ValueError, TypeError) as e:
+                log(f"modo ocioso indisponível: {e}")
+                self._idle = None
+            nxt = self._index.next()
+            if nxt is not None:
+                log(f"próximo desligamento: {datetime.datetime.fromtimestamp(nxt[0]):%d/%m/%Y %H:%M}")
+            else:
+                log("nenhuma regra recorrente ativa")
+
+    def _restore(self):
+        # Os desligamentos já armados (por este serviço, pela janela ou pela linha de comando)
+        # continuam valendo; o Windows está armado para o mais próximo deles
+        if self.journal is None:
+            return
+        now = self.wall()
+        # Quem os agendou com ganchos armou o Windows com a folga deles
+        slack = arm_slack(self._pipeline(self.config.load()))
+        for rid, (action, deadline) in self.journal.replay().items():
+            if deadline <= now:
+                self.journal.fire(rid)
+            elif action in TIMED_ACTIONS:
+                # Hibernar/encerrar sessão ficam para a janela, que é quem os executa
+                self._rids[self.actions.restore(action, deadline, slack=slack)] = rid
+
+    def armed_deadline(self):
+        """Prazo do desligamento pendente mais próximo (None se não houver)."""
+        return self.actions.next_deadline()
+
+    def _pipeline(self, cfg):
+        try:
+            return pipeline_from_config(cfg or {})
+        except (ValueError, ImportError, AttributeError) as e:
+            log(f"ganchos inválidos no config.json: {e}")
+            return None
+
+    def _arm(self, when: float):
+        slack = arm_slack(self._pipeline(self._cfg))
+        seconds = when - self.wall()
+        try:
+            completed = self.actions.schedule(seconds, key='daemon', slack=slack)
+        except OSError as e:
+            log(f"falha ao executar shutdown: {e}")
+            metrics.event('error', where='arm', error=repr(e))
+            return
+        item = self.actions.by_key('daemon')
+        if completed.returncode != 0:
+            log(f"shutdown retornou código {completed.returncode}: {completed.stderr.strip()}")
+            metrics.event('error', where='arm', returncode=completed.returncode)
+            if item is not None:
+                self.actions.remove(item.id)
+            return
+        # A chave só serve para achar o item recém-agendado: a próxima ocorrência não o substitui
+        self.actions.set_key(item.id, None)
+        if slack:
+            self._hooked.add(item.id)
+        deadline = item.deadline
+        if self.journal is not None:
+            self._rids[item.id] = self.journal.schedule(deadline)
+        log(f"desligamento armado para daqui a {int(deadline - self.wall())} segundos")
+        metrics.event('scheduled', source='daemon', deadline=round(deadline, 3), slack=slack)
+
+    def _run_hooks(self, now: float):
+        # Ocorrências armadas por este serviço com ganchos: roda-os no prazo e desliga já
+        for qid in sorted(self._hooked):
+            item = self.actions.get(qid)
+            if item is None:
+                self._hooked.discard(qid)
+            elif item.deadline <= now:
+                self._hooked.discard(qid)
+                try:
+                    completed, report = fire_with_hooks(self.actions, qid, self._pipeline(self._cfg), self._stop)
+                except OSError as e:
+                    log(f"falha ao executar shutdown: {e}")
+                    metrics.event('error', where='hooks', error=repr(e))
+                    continue
+                if report is not None:
+                    for line in report.lines():
+                        log(line)
+                if completed is not None and completed.returncode != 0:
+                    log(f"shutdown retornou código {completed.returncode}: {completed.stderr.strip()}")
+                    metrics.event('error', where='hooks', returncode=completed.returncode)
+
+    def step(self) -> float:
+        """Processa o que venceu e retorna quantos segundos dormir até o próximo evento."""
+        self._run_hooks(self.wall())
+        now = self.wall()
+        armed = self.actions.next_due()
+        if armed is not None and now >= armed:
+            self.fires += len(self.actions.due(now))
+            # Inclui as ações consumidas junto (mesma janela de tempo da que disparou)
+            for qid in [q for q in self._rids if self.actions.get(q) is None]:
+                rid = self._rids.pop(qid)
+                if self.journal is not None:
+                    self.journal.fire(rid)
+            metrics.event('fired', source='daemon')
+
+        if self._deferred is not None:
+            return self._step_deferred(now)
+
+        timeout = self.max_sleep
+        nxt = self._index.next()
+        if nxt is not None:
+            when = nxt[0]
+            if when <= now:
+                # Ocorrência perdida (máquina dormindo/desligada): não desliga atrasado, pula
+                for missed, _ in self._index.advance_until(now):
+                    log(f"ocorrência de {datetime.datetime.fromtimestamp(missed):%d/%m %H:%M} perdida; ignorada")
+                    metrics.event('missed', source='daemon', occurrence=missed)
+                return 0.0
+            if when - now <= self.lead:
+                armed = self.actions.next_deadline()
+                # Só existe um desligamento pendente no Windows: um armado até `when` cobre a
+                # ocorrência; um mais tarde não, e o timer passa a apontar para ela
+                if armed is None or armed > when:
+                    if self._idle is not None and not self._idle.is_idle():
+                        # Trabalho pesado em andamento: segura a ocorrência até o sistema sossegar
+                        log(f"sistema ocupado ({self._idle.describe()}); desligamento adiado")
+                        self._deferred = when
+                        metrics.event('deferred', source='daemon', activity=self._idle.describe())
+                        self._index.advance()
+                        return 0.0
+                    self._arm(when)
+                self._index.advance()
+                return 0.0
+            until_arm = when - self.lead - now
+            if self._idle is not None:
+                window = self._idle.warmup
+                if until_arm <= window:
+                    # Só amostra na janela de silêncio que antecede a ocorrência
+                    timeout = min(timeout, self._idle.poll())
+                else:
+                    self._idle.reset()
+                    timeout = min(timeout, until_arm - window)
+            timeout = min(timeout, until_arm)
+        armed = self.actions.next_due()
+        if armed is not None:
+            timeout = min(timeout, armed - now)
+        for qid in self._hooked:
+            item = self.actions.get(qid)
+            if item is not None:
+                timeout = min(timeout, item.deadline - now)
+        return max(0.0, timeout)
+
+    def _step_deferred(self, now: float) -> float:
+        if self._idle is None:
+            # Modo ocioso desligado durante o adiamento: desliga agora
+            self._deferred = None
+            self._arm(now + self.lead)
+            return 0.0
+        timeout = self._idle.poll()
+        if self._idle.is_idle():
+            log(f"sistema ocioso ({self._idle.describe()}); retomando o desligamento adiado")
+            self._deferred = None
+            self._arm(now + self.lead)
+            self._idle.reset()
+            return 0.0
+        if now - self._deferred >= self._idle.max_defer:
+            log(f"sistema continua ocupado ({self._idle.describe()}); desligamento de "
+                f"{datetime.datetime.fromtimestamp(self._deferred):%d/%m %H:%M} cancelado")
+            metrics.event('cancelled', source='daemon', reason='busy', occurrence=self._deferred)
+            self._deferred = None
+            self._idle.reset()
+            return 0.0
+        return timeout
+
+    def run(self):
+        self._restore()
+        self._reload(force=True)
+        last_mono, last_wall = self.monotonic(), self.wall()
+        while not self._stop.is_set():
+            timeout = self.step()
+            if timeout > 0:
+                if self._stop.wait(timeout):
+                    break
+                self.wakeups += 1
+            mono, wall = self.monotonic(), self.wall()
+            skew = (wall - last_wall) - (mono - last_mono)
+            last_mono, last_wall = mono, wall
+            if abs(skew) > JUMP_THRESHOLD:
+                # Suspensão/retomada ou relógio ajustado: recalcula tudo a partir da hora atual
+                self.resyncs += 1
+                metrics.event('clock_jump', source='daemon', skew=round(skew, 3))
+                log(f"salto de relógio de {skew:+.0f}s detectado; recalculando")
+                self._reload(force=True)
+            else:
+                self._reload()
+        if self._idle is not None:
+            self._idle.close()
+        if self.journal is not None:
+            self.journal.close()
+        metrics.disable()
+
+
+def run_daemon(backend=None, lead: float = DEFAULT_LEAD, max_sleep: float = DEFAULT_MAX_SLEEP,
+               simulate: bool = False) -> int:
+    # Simulação não grava no diário: a janela recuperaria um desligamento que o Windows não tem
+    daemon = SchedulerDaemon(backend, lead=lead, max_sleep=max_sleep, use_journal=not simulate)
+
+    def _on_signal(signum, frame):
+        daemon.stop()
+
+    for name in ('SIGINT', 'SIGTERM', 'SIGBREAK'):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), _on_signal)
+    log("serviço iniciado")
+    daemon.run()
+    log(f"serviço encerrado ({daemon.wakeups} despertares, {daemon.fires} disparos, {daemon.resyncs} ressincronizações)")
+    return 0
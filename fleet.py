@@ -0,0 +1,390 @@
+"""Modo frota: agenda/cancela desligamentos em várias máquinas a partir de um console.
+
+Cada máquina roda um agente pequeno (`python fleet.py agent`) que recebe pedidos em JSON
+(uma linha por mensagem) via TCP e executa o `shutdown` local. O console lê o inventário,
+abre conexões persistentes com os agentes e despacha os pedidos em paralelo com limite de
+concorrência, timeout e novas tentativas por máquina.
+
+O segredo (`--token`) não trafega: cada pedido leva um HMAC-SHA256 dele sobre o pedido
+inteiro (id, horário, nonce e parâmetros), e o agente recusa horários fora de
+`MAX_CLOCK_SKEW` e nonces repetidos. Uma nova tentativa reaproveita o id do pedido e o
+agente devolve o resultado já obtido para ele em vez de executar de novo: um `shutdown`
+que passou do timeout no console não é enviado duas vezes (o Windows responderia com o
+erro 1190, desligamento já agendado).
+
+Uso:
+    python fleet.py agent [--bind 0.0.0.0] [--port 8765] --token SEGREDO [--simulate]
+    python fleet.py schedule 1800 -i hosts.txt --token SEGREDO
+    python fleet.py cancel -i hosts.txt --token SEGREDO
+    python fleet.py status -i hosts.txt --token SEGREDO
+"""
+import argparse
+import asyncio
+import collections
+import hashlib
+import hmac
+import json
+import secrets
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from command_executor import FakeBackend, ShutdownBackend
+
+
+DEFAULT_PORT = 8765
+# Diferença máxima aceita entre o relógio do console e o do agente (s)
+MAX_CLOCK_SKEW = 300
+# Quantos resultados de schedule/cancel o agente guarda para responder a novas tentativas
+RESULT_CACHE = 256
+
+# Estados de cada máquina durante um despacho
+PENDING = 'pendente'
+RUNNING = 'enviando'
+OK = 'ok'
+ERROR = 'erro'      # o agente respondeu, mas o comando falhou
+FAILED = 'falhou'   # sem resposta após todas as tentativas
+
+
+def load_inventory(path: str, default_port: int = DEFAULT_PORT) -> list:
+    """Lê o inventário: uma máquina por linha (`host` ou `host:porta`), `#` inicia comentário."""
+    hosts = []
+    seen = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            if ':' in line:
+                host, _, port = line.rpartition(':')
+                target = (host, int(port))
+            else:
+                target = (line, default_port)
+            if target not in seen:
+                seen.add(target)
+                hosts.append(target)
+    return hosts
+
+
+def _encode(msg: dict) -> bytes:
+    return json.dumps(msg, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def _mac(request: dict, token: str) -> str:
+    # Tudo menos o próprio `mac`, em forma canônica: alterar qualquer campo invalida a assinatura
+    body = json.dumps({k: v for k, v in request.items() if k != 'mac'}, sort_keys=True, separators=(',', ':'))
+    return hmac.new(token.encode('utf-8'), body.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def sign(request: dict, token: str) -> dict:
+    """Cópia de `request` com horário, nonce e HMAC (o `id` do pedido entra na assinatura)."""
+    request = dict(request, ts=time.time(), nonce=secrets.token_hex(16))
+    request['mac'] = _mac(request, token)
+    return request
+
+
+class FleetAgent:
+    """Agente local: recebe pedidos do console e executa no backend (serializados)."""
+
+    def __init__(self, backend=None, token=None, latency: float = 0.0):
+        self.backend = backend if backend is not None else ShutdownBackend()
+        self.token = token
+        # Atraso artificial por pedido (apenas para simular rede/máquina lenta em testes)
+        self.latency = latency
+        self.deadline = None
+        self._results = collections.OrderedDict()  # id do pedido -> Future do resultado
+        self._nonces = {}  # nonce -> horário, dentro da janela de MAX_CLOCK_SKEW
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fleet-agent')
+
+    async def serve(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT):
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = None
+                try:
+                    request = json.loads(line)
+                    response = await self._process(request)
+                except Exception as e:
+                    response = {'ok': False, 'error': str(e)}
+                if isinstance(request, dict) and 'id' in request:
+                    response['id'] = request['id']
+                writer.write(_encode(response))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _authenticate(self, request: dict) -> bool:
+        if self.token is None:
+            return True
+        mac, ts, nonce = request.get('mac'), request.get('ts'), request.get('nonce')
+        if not isinstance(mac, str) or not isinstance(ts, (int, float)) or not isinstance(nonce, str):
+            return False
+        now = time.time()
+        if abs(now - ts) > MAX_CLOCK_SKEW or nonce in self._nonces:
+            return False
+        if not hmac.compare_digest(mac, _mac(request, self.token)):
+            return False
+        if len(self._nonces) > 1024:
+            # Nonces mais velhos que a janela já seriam recusados pelo horário
+            self._nonces = {n: t for n, t in self._nonces.items() if now - t <= MAX_CLOCK_SKEW}
+        self._nonces[nonce] = ts
+        return True
+
+    async def _process(self, request: dict) -> dict:
+        if not self._authenticate(request):
+            return {'ok': False, 'error': 'autenticação inválida'}
+        op = request.get('op')
+        if op == 'status':
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            remaining = None if self.deadline is None else max(0, int(self.deadline - time.time()))
+            return {'ok': True, 'remaining': remaining}
+        if op not in ('schedule', 'cancel'):
+            return {'ok': False, 'error': f'operação desconhecida: {op}'}
+        rid = request.get('id')
+        future = self._results.get(rid) if rid is not None else None
+        if future is None:
+            # Primeira vez deste pedido; uma nova tentativa aguarda (ou recebe) o mesmo resultado
+            future = asyncio.ensure_future(self._execute(op, request))
+            if rid is not None:
+                self._results[rid] = future
+                while len(self._results) > RESULT_CACHE:
+                    self._results.popitem(last=False)
+        # shield: a execução continua mesmo que a conexão que a pediu caia
+        return dict(await asyncio.shield(future))
+
+    async def _execute(self, op: str, request: dict) -> dict:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        loop = asyncio.get_running_loop()
+        if op == 'schedule':
+            seconds = int(request['seconds'])
+            completed = await loop.run_in_executor(self._pool, self.backend.schedule, seconds)
+            if completed.returncode == 0:
+                self.deadline = time.time() + seconds
+        elif op == 'cancel':
+            completed = await loop.run_in_executor(self._pool, self.backend.cancel)
+            if completed.returncode == 0:
+                self.deadline = None
+        return {
+            'ok': completed.returncode == 0,
+            'returncode': completed.returncode,
+            'stdout': completed.stdout,
+            'stderr': completed.stderr,
+        }
+
+
+class HostStatus:
+    __slots__ = ('host', 'state', 'attempts', 'latency', 'error', 'result')
+
+    def __init__(self, host: str):
+        self.host = host
+        self.state = PENDING
+        self.attempts = 0
+        self.latency = None
+        self.error = None
+        self.result = None
+
+    def __repr__(self):
+        return f"HostStatus({self.host!r}, {self.state!r}, attempts={self.attempts}, error={self.error!r})"
+
+
+class FleetDispatcher:
+    """Despacha pedidos para muitos agentes em paralelo (asyncio).
+
+    - no máximo `concurrency` máquinas em andamento ao mesmo tempo
+    - conexões ficam abertas entre despachos (schedule, status e cancel reaproveitam)
+    - cada tentativa tem `timeout` segundos; falhas de rede tentam de novo até `retries` vezes
+    - `status` guarda o estado de cada máquina e `on_update(status)` é chamado a cada mudança
+    """
+
+    def __init__(self, hosts, concurrency: int = 100, timeout: float = 5.0, retries: int = 2,
+                 token=None, on_update=None):
+        self.hosts = list(hosts)
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.token = token
+        self.on_update = on_update
+        self.status = {}
+        self._connections = {}
+
+    @staticmethod
+    def name(target) -> str:
+        return f"{target[0]}:{target[1]}"
+
+    def summary(self) -> collections.Counter:
+        return collections.Counter(s.state for s in self.status.values())
+
+    def _set(self, status: HostStatus, state: str):
+        status.state = state
+        if self.on_update is not None:
+            self.on_update(status)
+
+    async def dispatch(self, op: str, **params) -> dict:
+        """Envia `op` para todas as máquinas. Retorna {nome: HostStatus}."""
+        self.status = {self.name(t): HostStatus(self.name(t)) for t in self.hosts}
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def one(target):
+            async with sem:
+                await self._dispatch_one(target, op, params)
+
+        await asyncio.gather(*(one(t) for t in self.hosts))
+        return self.status
+
+    async def _dispatch_one(self, target, op: str, params: dict):
+        status = self.status[self.name(target)]
+        self._set(status, RUNNING)
+        # O mesmo id em todas as tentativas: o agente não executa duas vezes o mesmo pedido
+        request = dict(params, op=op, id=secrets.token_hex(16))
+        for attempt in range(self.retries + 1):
+            status.attempts = attempt + 1
+            t0 = time.perf_counter()
+            # Horário e nonce novos a cada tentativa (o agente recusa nonces repetidos)
+            signed = sign(request, self.token) if self.token is not None else request
+            try:
+                response = await asyncio.wait_for(self._request(target, signed), self.timeout)
+            except (OSError, asyncio.TimeoutError, ValueError) as e:
+                self._drop(target)
+                status.error = str(e) or type(e).__name__
+                if attempt < self.retries:
+                    # Recuo curto e crescente antes de tentar de novo
+                    await asyncio.sleep(0.05 * (2 ** attempt))
+                continue
+            status.latency = time.perf_counter() - t0
+            status.result = response
+            status.error = None if response.get('ok') else response.get('error') or response.get('stderr')
+            self._set(status, OK if response.get('ok') else ERROR)
+            return
+        self._set(status, FAILED)
+
+    async def _request(self, target, request: dict) -> dict:
+        conn = self._connections.get(target)
+        if conn is None:
+            reader, writer = await asyncio.open_connection(*target)
+            conn = self._connections[target] = (reader, writer, asyncio.Lock())
+        reader, writer, lock = conn
+        async with lock:
+            writer.write(_encode(request))
+            await writer.drain()
+            line = await reader.readline()
+            if not line:
+                raise ConnectionResetError("conexão encerrada pelo agente")
+            response = json.loads(line)
+            if response.get('id') != request['id']:
+                raise ValueError("resposta fora de ordem")
+            return response
+
+    def _drop(self, target):
+        conn = self._connections.pop(target, None)
+        if conn is not None:
+            conn[1].close()
+
+    async def close(self):
+        conns = list(self._connections.values())
+        self._connections.clear()
+        for _, writer, _ in conns:
+            writer.close()
+        for _, writer, _ in conns:
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+
+class LiveStatus:
+    """Linha de status agregada no terminal, redesenhada no máximo a cada `interval` segundos."""
+
+    def __init__(self, dispatcher: FleetDispatcher, stream=sys.stderr, interval: float = 0.1):
+        self.dispatcher = dispatcher
+        self.stream = stream
+        self.interval = interval
+        self._last = 0.0
+
+    def __call__(self, status=None, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        counts = self.dispatcher.summary()
+        parts = ' '.join(f"{state}={counts.get(state, 0)}" for state in (PENDING, RUNNING, OK, ERROR, FAILED))
+        self.stream.write(f"\r{parts}")
+        self.stream.flush()
+
+
+async def _run_console(args) -> int:
+    hosts = load_inventory(args.inventory)
+    dispatcher = FleetDispatcher(hosts, concurrency=args.concurrency, timeout=args.timeout,
+                                 retries=args.retries, token=args.token)
+    live = LiveStatus(dispatcher)
+    dispatcher.on_update = live
+    params = {'seconds': args.seconds} if args.command == 'schedule' else {}
+    t0 = time.perf_counter()
+    try:
+        await dispatcher.dispatch(args.command, **params)
+    finally:
+        await dispatcher.close()
+    live(force=True)
+    sys.stderr.write(f"\n{len(hosts)} máquinas em {time.perf_counter() - t0:.2f}s\n")
+
+    failures = 0
+    for st in dispatcher.status.values():
+        if args.command == 'status' and st.state == OK:
+            remaining = st.result.get('remaining')
+            print(f"{st.host}\t{'-' if remaining is None else f'{remaining}s'}")
+        elif st.state != OK:
+            failures += 1
+            print(f"{st.host}\t{st.state}\t{st.error}")
+    return 1 if failures else 0
+
+
+async def _run_agent(args):
+    backend = FakeBackend() if args.simulate else None
+    agent = FleetAgent(backend, token=args.token)
+    server = await agent.serve(args.bind, args.port)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agendador de desligamento - modo frota")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    agent = sub.add_parser('agent', help="roda o agente nesta máquina")
+    agent.add_argument('--bind', default='0.0.0.0')
+    agent.add_argument('--port', type=int, default=DEFAULT_PORT)
+    agent.add_argument('--token', help="segredo compartilhado com o console")
+    agent.add_argument('--simulate', action='store_true', help="não executa shutdown (backend falso)")
+
+    for name in ('schedule', 'cancel', 'status'):
+        p = sub.add_parser(name)
+        if name == 'schedule':
+            p.add_argument('seconds', type=int)
+        p.add_argument('-i', '--inventory', required=True, help="arquivo com uma máquina por linha")
+        p.add_argument('-c', '--concurrency', type=int, default=100)
+        p.add_argument('--timeout', type=float, default=5.0)
+        p.add_argument('--retries', type=int, default=2)
+        p.add_argument('--token')
+
+    args = parser.parse_args(argv)
+    if args.command == 'agent':
+        if args.token is None and args.bind not in ('127.0.0.1', 'localhost', '::1'):
+            parser.error("--token é obrigatório quando o agente aceita conexões de outras máquinas")
+        try:
+            asyncio.run(_run_agent(args))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    return asyncio.run(_run_console(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
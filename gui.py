@@ -0,0 +1,927 @@
+import tkinter as tk
+from tkinter import messagebox
+import os
+import subprocess
+import threading
+import time
+
+from action_queue import ACTION_LABELS, ActionQueue
+from activity import IdleMonitor
+from command_executor import CommandExecutor
+import metrics
+from config_store import ConfigStore, default_config_path
+from countdown import Countdown
+from notifications import NotificationQueue, WarningPlan, format_warning, warnings_from_config
+from recurrence import RecurrenceIndex, rules_from_config
+from schedule_engine import seconds_for_value, seconds_until_time
+from schedule_journal import ScheduleJournal, default_journal_path
+from shutdown_hooks import arm_slack, fire_with_hooks, pipeline_from_config
+from view_model import PreviewModel
+
+
+# Tentativa de importar customtkinter; se não existir, mostramos instruções amigáveis e encerramos.
+USING_CUSTOMTK = True
+try:
+    import customtkinter as ctk
+except ModuleNotFoundError:
+    USING_CUSTOMTK = False
+    # Garantir que ao menos o tkinter esteja disponível para mostrar a mensagem
+    root = tk.Tk()
+    root.withdraw()
+    messagebox.showerror(
+        "Dependência ausente",
+        "A biblioteca 'customtkinter' não está instalada.\n\nInstale com:\n  pip install customtkinter\n\nou\n  pip install -r requirements.txt\n\nDepois execute novamente o programa.")
+    root.destroy()
+    raise SystemExit(1)
+
+
+# Medição de partida (benchmarks/bench_packaged.py): arquivo onde gravar o instante em que a
+# janela aparece. Nesse modo o app não chama o shutdown de verdade, usa config.json e diário da
+# pasta do arquivo e fecha logo depois de mostrar a janela
+STARTUP_PROBE_ENV = 'SHUTDOWN_SCHEDULER_STARTUP_PROBE'
+
+# Intervalo de consulta dos pedidos vindos de outras execuções
+INSTANCE_POLL_MS = 100
+# Modo ocioso: quantos segundos antes do prazo decidir entre desligar ou adiar
+IDLE_GUARD = 60
+# Cor do rótulo de avisos pelo nível mais grave na tela (tema claro, tema escuro)
+NOTICE_COLORS = {
+    'info': ("gray20", "gray85"),
+    'warning': ("#9a6700", "#e3b341"),
+    'error': ("#b22222", "#ff6b6b"),
+}
+
+
+class ShutdownScheduler(ctk.CTk):
+    """Aplicativo para agendar/desagendar shutdown no Windows usando `shutdown -s -t` e `shutdown -a`.
+
+    Oferece opções por segundos, minutos, horas ou um horário específico (HH:MM).
+    Converte tudo para segundos porque o comando do Windows espera segundos.
+    """
+
+    def __init__(self, backend=None, instance=None, data_dir=None):
+        super().__init__()
+        self.title("Agendador de Desligamento")
+        self.geometry("480x400")
+        self.resizable(False, False)
+
+        ctk.set_appearance_mode("system")
+        ctk.set_default_color_theme("blue")
+
+        # Estado
+        # Rótulos de prévia/status: alterações acumulam e são aplicadas uma vez por quadro
+        self.view = PreviewModel(source=self._preview_source)
+        self.view_job = None
+        self.countdown_job = None
+        self.remaining_seconds = 0
+        self.countdown = Countdown()
+
+        # Avisos na própria janela em vez de messagebox modal (que pararia a contagem).
+        # Um timer para a fila de avisos e um para o próximo aviso antes do prazo
+        self.notices = NotificationQueue()
+        self.notice_job = None
+        self.notice_flush_job = None
+        self._notice_version = None
+        self.warnings = WarningPlan()
+        self.warning_job = None
+
+        # Comandos do sistema rodam fora da thread do Tk. Todos passam pela fila de ações, que
+        # decide qual é a próxima e só reenvia o comando do Windows quando ela muda
+        self.actions = ActionQueue(backend)
+        self.executor = CommandExecutor(self.actions)
+        self.pending_kind = 'shutdown'
+        # Marcado para abandonar os ganchos em andamento (cancelar ou novo agendamento)
+        self.hooks_stop = None
+        self.command_poll_job = None
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Modo ocioso (config 'idle'): adia o desligamento enquanto o sistema estiver ocupado
+        self.idle = None
+        self.idle_job = None
+        self.idle_deferred_since = None
+        self.calendar_window = None
+
+        # Caminho do arquivo de configuração (data_dir: outra pasta para config.json e diário)
+        self.config_path = os.path.join(data_dir, 'config.json') if data_dir else default_config_path()
+        # Gravações adiadas rodam na thread do Tk para poder mostrar erros
+        self.config = ConfigStore(self.config_path, schedule=self.after, cancel=self.after_cancel, on_error=self._on_config_error)
+
+        # Widgets
+        self._build_ui()
+
+        # Carregar configuração se existir
+        self.load_config()
+        # Instrumentação (desligada, a menos que 'metrics.enabled' esteja no config.json)
+        try:
+            metrics.configure(self.config.load())
+        except Exception as e:
+            self.notify('warning', f"Métricas desativadas: {e}")
+
+        # Recupera um agendamento feito antes de o app fechar (sem reenviar o comando ao sistema)
+        self.journal = ScheduleJournal(os.path.join(data_dir, 'schedule.journal') if data_dir else default_journal_path())
+        self.pending_journal_id = None
+        restored = self._restore_pending()
+
+        # Se habilitado para diário, agenda um desligamento para a próxima ocorrência
+        if not restored:
+            self.schedule_daily_if_enabled()
+
+        # Pedidos encaminhados por outras execuções (instância única)
+        self.instance = instance
+        self.instance_job = None
+        if self.instance is not None:
+            self.instance_job = self.after(INSTANCE_POLL_MS, self._poll_instance_requests)
+
+    def _build_ui(self):
+        pad = 12
+
+        frame = ctk.CTkFrame(self)
+        frame.pack(padx=pad, pady=pad, fill="both", expand=True)
+
+        title = ctk.CTkLabel(frame, text="Agendar desligamento do Windows", font=ctk.CTkFont(size=16, weight="bold"))
+        title.pack(pady=(0, 10))
+
+        # Modo: segundos/minutos/horas/horário
+        self.mode_var = tk.StringVar(value="Minutos")
+        mode_menu = ctk.CTkOptionMenu(frame, values=["Segundos", "Minutos", "Horas", "Horário (HH:MM)"], variable=self.mode_var, command=self.on_mode_change)
+        mode_menu.pack(pady=(0, 8))
+
+        # Entrada genérica (número)
+        self.value_entry = ctk.CTkEntry(frame, placeholder_text="Valor (ex: 15)")
+        self.value_entry.pack(pady=(0, 8))
+
+        # Entrada para horário específico
+        self.time_entry = ctk.CTkEntry(frame, placeholder_text="HH:MM (24h)")
+
+        # Ação: desligar/reiniciar/hibernar/encerrar sessão
+        self.action_var = tk.StringVar(value=ACTION_LABELS['shutdown'])
+        self.action_menu = ctk.CTkOptionMenu(frame, values=list(ACTION_LABELS.values()), variable=self.action_var)
+        self.action_menu.pack(pady=(0, 8))
+
+        # Opções de agendamento diário
+        self.daily_var = tk.BooleanVar(value=False)
+        daily_frame = ctk.CTkFrame(frame)
+        daily_frame.pack(fill="x", pady=(4, 4))
+        self.daily_check = ctk.CTkCheckBox(daily_frame, text="Agendar diariamente (apenas para Horário)", variable=self.daily_var)
+        self.daily_check.pack(side="left", padx=(0, 6))
+        save_cfg_btn = ctk.CTkButton(daily_frame, text="Salvar Configuração", width=160, command=self.on_save_config)
+        save_cfg_btn.pack(side="right")
+
+        # Botões
+        btn_frame = ctk.CTkFrame(frame)
+        btn_frame.pack(pady=(6, 6), fill="x")
+
+        schedule_btn = ctk.CTkButton(btn_frame, text="Agendar Desligamento", command=self.on_schedule)
+        schedule_btn.pack(side="left", expand=True, padx=(6, 3), pady=6)
+
+        cancel_btn = ctk.CTkButton(btn_frame, text="Cancelar Desligamento", fg_color="#b22222", hover_color="#ff3333", command=self.on_cancel)
+        cancel_btn.pack(side="right", expand=True, padx=(3, 6), pady=6)
+
+        # Próximos desligamentos das regras recorrentes, mês a mês
+        calendar_btn = ctk.CTkButton(btn_frame, text="Calendário", width=90, command=self.on_show_calendar)
+        calendar_btn.pack(side="right", padx=3, pady=6)
+
+        # Label com o total de segundos calculado e contagem regressiva
+        self.info_label = ctk.CTkLabel(frame, text="Tempo convertido: - ")
+        self.info_label.pack(pady=(6, 0))
+
+        # Estimativa de horário de desligamento
+        self.estimated_label = ctk.CTkLabel(frame, text="Estimativa de desligamento: -")
+        self.estimated_label.pack(pady=(2, 0))
+
+        self.countdown_label = ctk.CTkLabel(frame, text="Contagem: - ")
+        self.countdown_label.pack(pady=(4, 0))
+
+        # Avisos (resultados, erros, "faltam 5 min"); um clique dispensa
+        self.notice_label = ctk.CTkLabel(frame, text="", wraplength=430, justify="left")
+        self.notice_label.pack(pady=(4, 0))
+        self.notice_label.bind("<Button-1>", lambda event: self._dismiss_notices())
+
+        # Nota
+        note = ctk.CTkLabel(frame, text="OBS: O comando do Windows pode precisar de privilégios de administrador.")
+        note.pack(side="bottom", pady=(8, 0))
+
+        # Modo Simular (não executa shutdown)
+        self.simulate_var = tk.BooleanVar(value=False)
+        simulate_cb = ctk.CTkCheckBox(frame, text="Modo Simular (não executa shutdown)", variable=self.simulate_var)
+        simulate_cb.pack(pady=(6, 0))
+
+        self.on_mode_change(self.mode_var.get())
+
+        # Bindings de scroll para ajustar valores com o mouse
+        # Windows: <MouseWheel>, event.delta (multiples of 120); Linux/X11 usar Button-4/5 se necessário
+        self.value_entry.bind('<MouseWheel>', self.on_mouse_wheel)
+        self.time_entry.bind('<MouseWheel>', self.on_mouse_wheel)
+
+    def on_mode_change(self, mode):
+        # Mostrar/ocultar campos conforme modo
+        if mode == "Horário (HH:MM)":
+            try:
+                self.value_entry.pack_forget()
+            except Exception:
+                pass
+            self.time_entry.pack(pady=(0, 8))
+        else:
+            try:
+                self.time_entry.pack_forget()
+            except Exception:
+                pass
+            self.value_entry.pack(pady=(0, 8))
+
+        # Atualiza preview sempre que o modo muda
+        self.update_converted_seconds()
+
+    def on_schedule(self):
+        mode = self.mode_var.get()
+        try:
+            if mode == "Horário (HH:MM)":
+                text = self.time_entry.get().strip()
+                if not text:
+                    self.notify('error', "Informe o horário no formato HH:MM")
+                    return
+                seconds = self._seconds_until_time(text)
+                if seconds <= 0:
+                    self.notify('error', "Horario inválido ou igual ao atual")
+                    return
+            else:
+                text = self.value_entry.get().strip()
+                if not text:
+                    self.notify('error', "Informe um valor numérico")
+                    return
+                seconds = seconds_for_value(mode, text)
+                if seconds < 0:
+                    self.notify('error', "Valor deve ser positivo")
+                    return
+
+        except ValueError:
+            self.notify('error', "Valor inválido (digite apenas números ou HH:MM)")
+            return
+
+        # Atualizar label e executar comando
+        self.view.show_converted(seconds)
+        # Mostrar estimativa horária
+        self.view.show_estimate(time.time() + seconds)
+        self._request_view_flush()
+        self._run_shutdown_command(seconds)
+
+        # Se o usuário quer agendar diariamente e escolheu Horário, salvar automaticamente
+        if self.daily_var.get() and mode == "Horário (HH:MM)":
+            try:
+                text = self.time_entry.get().strip()
+                self.save_config({'daily_time': text, 'daily_enabled': True})
+            except Exception:
+                pass
+
+    def _seconds_until_time(self, hhmm: str) -> int:
+        return seconds_until_time(hhmm)
+
+    def _is_simulating(self) -> bool:
+        return getattr(self, 'simulate_var', None) is not None and self.simulate_var.get()
+
+    def _poll_commands(self):
+        # Entrega resultados do executor na thread do Tk; continua consultando enquanto houver pendências
+        self.command_poll_job = None
+        self.executor.poll()
+        if self.executor.pending():
+            self.command_poll_job = self.after(50, self._poll_commands)
+
+    def _ensure_command_polling(self):
+        if self.command_poll_job is None:
+            self.command_poll_job = self.after(50, self._poll_commands)
+
+    def _selected_action(self) -> str:
+        label = self.action_var.get() if getattr(self, 'action_var', None) is not None else None
+        for action, text in ACTION_LABELS.items():
+            if text == label:
+                return action
+        return 'shutdown'
+
+    def _run_shutdown_command(self, seconds: int, kind=None):
+        # Executa o comando shutdown -s -t <seconds> (ou -r; hibernar/encerrar sessão esperam na fila)
+        # Se estiver em modo simular, não executa o comando real
+        kind = kind or self._selected_action()
+        if self._is_simulating():
+            self.notify('info', f"Simulação: {ACTION_LABELS[kind].lower()} em {seconds} segundos.", key='schedule')
+            # criar objeto similar ao retorno de subprocess
+            completed = subprocess.CompletedProcess([], 0, '', '')
+            self._on_shutdown_result(seconds, completed, None, kind)
+            return
+
+        try:
+            pipeline = pipeline_from_config(self.config.load())
+        except (ValueError, ImportError, AttributeError) as e:
+            self.notify('error', f"Ganchos pré-desligamento inválidos no config.json: {e}")
+            return
+
+        # O comando roda no executor em segundo plano; a janela continua respondendo.
+        # A chave 'gui' faz o novo agendamento da janela substituir o anterior na fila. Com
+        # ganchos, o Windows fica armado com folga e eles rodam no fim da contagem
+        self._stop_hooks()
+        self.executor.schedule(seconds, action=kind, key='gui', slack=arm_slack(pipeline),
+                               callback=lambda res, err: self._on_shutdown_result(seconds, res, err, kind))
+        self._ensure_command_polling()
+
+    def _stop_hooks(self):
+        if self.hooks_stop is not None:
+            self.hooks_stop.set()
+            self.hooks_stop = None
+
+    def _fire_due(self):
+        # Fim da contagem: ganchos (se houver) e então a ação. Tudo no mesmo worker; um
+        # cancelamento marca `hooks_stop` e o worker fica livre em até STOP_POLL
+        try:
+            pipeline = pipeline_from_config(self.config.load())
+        except (ValueError, ImportError, AttributeError) as e:
+            self.notify('error', f"Ganchos pré-desligamento inválidos no config.json: {e}")
+            pipeline = None
+        item = self.actions.by_key('gui')
+        if pipeline is not None and item is not None:
+            self._stop_hooks()
+            stop = self.hooks_stop = threading.Event()
+            self.notify('info', f"Executando ganchos pré-desligamento ({len(pipeline)})...", key='schedule')
+            self.executor.submit(fire_with_hooks, self.actions, item.id, pipeline, stop,
+                                 callback=lambda res, err: self._on_hooks_result(res, err, item.action, stop))
+        # Hibernar/encerrar sessão não têm timer no Windows: a fila executa agora
+        self.executor.submit(self.actions.due, callback=self._on_actions_due)
+        self._ensure_command_polling()
+
+    def _on_hooks_result(self, result, error, kind='shutdown', stop=None):
+        if stop is self.hooks_stop:
+            self.hooks_stop = None
+        if error is not None:
+            metrics.event('error', where='hooks', action=kind, error=repr(error))
+            self.notify('error', f"Falha ao executar comando: {error}")
+            return
+        completed, report = result
+        if report is not None and report.failures():
+            self.notify('warning', "Ganchos pré-desligamento: " + "; ".join(report.lines()))
+        if completed is None:
+            # Cancelado durante os ganchos: nada foi enviado; quem cancelou avisa
+            return
+        if completed.returncode != 0:
+            metrics.event('error', where='hooks', action=kind, returncode=completed.returncode)
+            self.notify('warning', f"O comando retornou código {completed.returncode}: {_command_output(completed)}. "
+                                   f"O Windows ainda vai {ACTION_LABELS[kind].lower()} ao fim da folga dos ganchos.")
+            return
+        self.notify('info', f"Ganchos concluídos em {report.elapsed:.0f}s: {ACTION_LABELS[kind].lower()} agora.",
+                    key='schedule')
+
+    def _on_shutdown_result(self, seconds: int, completed, error, kind='shutdown'):
+        if error is not None:
+            metrics.event('error', where='schedule', action=kind, error=repr(error))
+        elif completed.returncode != 0:
+            metrics.event('error', where='schedule', action=kind, returncode=completed.returncode)
+        else:
+            metrics.event('scheduled', source='gui', action=kind, seconds=seconds,
+                          simulated=self._is_simulating())
+        if isinstance(error, FileNotFoundError):
+            self.notify('error', "Comando 'shutdown' não encontrado. Este script foi feito para Windows.")
+            return
+        if error is not None:
+            self.notify('error', f"Falha ao executar comando: {error}")
+            return
+
+        if completed.returncode == 0:
+            # Para simulação já mostramos mensagem acima; caso real, informar agendado
+            if not self._is_simulating():
+                self.notify('info', f"{ACTION_LABELS[kind]}: agendado em {seconds} segundos.", key='schedule')
+        else:
+            self.notify('warning', f"O comando retornou código {completed.returncode}: {_command_output(completed)}. "
+                                   "Tente executar o programa como administrador se necessário.")
+            return
+
+        # Substitui o agendamento anterior, como o próprio Windows faz
+        self.pending_kind = kind
+        if not self._is_simulating():
+            self._journal_call('cancel', self.pending_journal_id)
+            self.pending_journal_id = self._journal_call('schedule', time.time() + seconds, kind)
+
+        # Iniciar contagem local (apenas visual)
+        self._start_local_countdown(seconds)
+        # Atualiza estimativa caso não tenha sido atualizada
+        self.view.show_estimate(time.time() + seconds)
+        self._request_view_flush()
+
+    def _start_local_countdown(self, seconds: int):
+        if self.countdown_job is not None:
+            try:
+                self.after_cancel(self.countdown_job)
+            except Exception:
+                pass
+            self.countdown_job = None
+
+        self.remaining_seconds = int(seconds)
+        if self.idle_deferred_since is not None:
+            # Rearme depois de um adiamento: mantém o histórico de atividade já amostrado
+            self.idle_deferred_since = None
+        else:
+            self._reset_idle_monitor()
+        self.countdown.start(seconds)
+        self._arm_warnings(seconds)
+        self._update_countdown_label()
+
+    @metrics.ui_callback('countdown')
+    def _update_countdown_label(self):
+        # Recalcula a partir do prazo absoluto; só redesenha quando o texto muda
+        text, delay = self.countdown.tick()
+        self.remaining_seconds = int(self.countdown.remaining())
+        if text is not None:
+            self.countdown_label.configure(text=text)
+        if self.idle is not None and delay is not None:
+            if self.remaining_seconds <= IDLE_GUARD + self.idle.warmup:
+                # Só amostra na janela de silêncio que antecede o prazo (poll limita a frequência)
+                self.idle.poll()
+            if self.remaining_seconds <= IDLE_GUARD and not self.idle.is_idle():
+                self._defer_for_activity()
+                return
+        if delay is None:
+            self.countdown_job = None
+            self._stop_warnings()
+            self._journal_call('fire', self.pending_journal_id)
+            self.pending_journal_id = None
+            if not self._is_simulating():
+                self._fire_due()
+            return
+        self.countdown_job = self.after(delay, self._update_countdown_label)
+
+    def _arm_warnings(self, remaining: float):
+        # Avisos de 10/5/1 min (config 'warnings'): um único timer, sempre para o próximo
+        self._cancel_warning_job()
+        try:
+            self.warnings = WarningPlan(warnings_from_config(self.config.load()))
+        except (TypeError, ValueError) as e:
+            self.notify('warning', f"Avisos antes do desligamento inválidos no config.json: {e}")
+            self.warnings = WarningPlan()
+        self.warnings.start(remaining)
+        self._schedule_next_warning()
+
+    def _schedule_next_warning(self):
+        delay = self.warnings.delay_ms(self.countdown.remaining())
+        if delay is not None:
+            self.warning_job = self.after(delay, self._on_warning_due)
+
+    @metrics.ui_callback('warning')
+    def _on_warning_due(self):
+        self.warning_job = None
+        offset = self.warnings.due(self.countdown.remaining())
+        if offset is not None:
+            # Mesma chave: o aviso de 5 min substitui o de 10 na tela
+            self.notify(self.warnings.level(offset), format_warning(ACTION_LABELS[self.pending_kind], offset),
+                        key='pre-shutdown', urgent=True)
+        self._schedule_next_warning()
+
+    def _cancel_warning_job(self):
+        if self.warning_job is not None:
+            try:
+                self.after_cancel(self.warning_job)
+            except Exception:
+                pass
+            self.warning_job = None
+
+    def _stop_warnings(self):
+        self._cancel_warning_job()
+        self.warnings.stop()
+        self.notices.clear('pre-shutdown')
+        self._request_notice_flush()
+
+    def notify(self, level: str, text: str, key=None, urgent: bool = False):
+        """Mostra um aviso na janela ('info', 'warning' ou 'error') sem bloquear o loop do Tk."""
+        self.notices.post(level, text, key, urgent)
+        self._request_notice_flush()
+
+    def _request_notice_flush(self):
+        if self.notice_flush_job is None:
+            self.notice_flush_job = self.after_idle(self._flush_notices)
+
+    @metrics.ui_callback('notices')
+    def _flush_notices(self):
+        self.notice_flush_job = None
+        if self.notice_job is not None:
+            try:
+                self.after_cancel(self.notice_job)
+            except Exception:
+                pass
+            self.notice_job = None
+        wait = self.notices.update()
+        # Só redesenha quando o que está na tela mudou
+        if self.notices.version != self._notice_version:
+            self._notice_version = self.notices.version
+            self.notice_label.configure(text=self.notices.text(),
+                                        text_color=NOTICE_COLORS[self.notices.level() or 'info'])
+        if wait is not None:
+            # Próxima expiração, ou a vez do próximo aviso da fila (limite de taxa)
+            self.notice_job = self.after(int(wait * 1000) + 1, self._flush_notices)
+
+    def _dismiss_notices(self):
+        self.notices.dismiss()
+        self._request_notice_flush()
+
+    def _on_actions_due(self, fired, error):
+        if error is not None:
+            metrics.event('error', where='actions_due', error=repr(error))
+            self.notify('error', f"Falha ao executar a ação agendada: {error}")
+            return
+        for item in fired or ():
+            metrics.event('fired', source='gui', action=item.action)
+        # Ações restauradas do diário que também venceram
+        now = time.time()
+        for rid, (_, deadline) in list(self.journal.pending().items()):
+            if deadline <= now:
+                self._journal_call('fire', rid)
+        nxt = self.actions.next()
+        if nxt is not None and self.countdown_job is None:
+            # Ainda há ações empilhadas: a contagem (e os ganchos no fim dela) passa para a próxima
+            self.actions.set_key(nxt.id, 'gui')
+            self.pending_kind = nxt.action
+            self._start_local_countdown(max(0, nxt.deadline - now))
+
+    def _reset_idle_monitor(self):
+        if self.idle is not None:
+            self.idle.close()
+            self.idle = None
+        try:
+            self.idle = IdleMonitor.from_config(self.config.load())
+        except Exception:
+            self.idle = None
+
+    def _defer_for_activity(self):
+        # Sistema ocupado perto do prazo: cancela o shutdown pendente e espera sossegar
+        self.countdown_job = None
+        self.countdown.stop()
+        self._stop_warnings()
+        self.idle_deferred_since = time.time()
+        metrics.event('deferred', source='gui', activity=self.idle.describe())
+        self.countdown_label.configure(text=f"Adiado: sistema ocupado ({self.idle.describe()})")
+        self._journal_call('cancel', self.pending_journal_id)
+        self.pending_journal_id = None
+        if not self._is_simulating():
+            self.executor.cancel(callback=self._on_idle_cancel_result)
+            self._ensure_command_polling()
+        self.idle_job = self.after(int(self.idle.interval * 1000), self._poll_idle)
+
+    def _on_idle_cancel_result(self, completed, error):
+        if error is not None or completed.returncode != 0:
+            # O Windows vai desligar no horário original; não adianta continuar esperando
+            detail = error if error is not None else completed.stderr
+            self.notify('warning', f"Não foi possível adiar o desligamento (shutdown -a): {detail}")
+            self._stop_idle_wait()
+
+    @metrics.ui_callback('idle')
+    def _poll_idle(self):
+        self.idle_job = None
+        if self.idle is None or self.idle_deferred_since is None:
+            return
+        timeout = self.idle.poll()
+        if self.idle.is_idle():
+            self.countdown_label.configure(text="Sistema ocioso: retomando o desligamento")
+            self._run_shutdown_command(IDLE_GUARD, self.pending_kind)
+            return
+        if time.time() - self.idle_deferred_since >= self.idle.max_defer:
+            self._stop_idle_wait()
+            self.countdown_label.configure(text="Desligamento desistido: sistema continuou ocupado")
+            return
+        self.countdown_label.configure(text=f"Adiado: sistema ocupado ({self.idle.describe()})")
+        self.idle_job = self.after(max(1, int(timeout * 1000)), self._poll_idle)
+
+    def _stop_idle_wait(self):
+        if self.idle_job is not None:
+            try:
+                self.after_cancel(self.idle_job)
+            except Exception:
+                pass
+            self.idle_job = None
+        self.idle_deferred_since = None
+
+    def _journal_call(self, method: str, *args):
+        # O diário é só para recuperação; uma falha de disco não deve impedir o agendamento
+        if args and args[0] is None:
+            return None
+        try:
+            return getattr(self.journal, method)(*args)
+        except Exception:
+            return None
+
+    def _restore_pending(self) -> bool:
+        try:
+            pending = self.journal.replay()
+        except Exception:
+            return False
+        now = time.time()
+        restored = []
+        try:
+            # Quem agendou com ganchos armou o Windows com a folga deles
+            slack = arm_slack(pipeline_from_config(self.config.load()))
+        except (ValueError, ImportError, AttributeError):
+            slack = 0.0
+        for rid, (action, deadline) in sorted(pending.items()):
+            if deadline <= now:
+                # Já passou: o sistema disparou (ou descartou) enquanto o app estava fechado
+                self._journal_call('fire', rid)
+            else:
+                # Volta para a fila sem reenviar nada: o Windows já está com a próxima armada
+                qid = self.actions.restore(action, deadline, slack=slack)
+                restored.append((deadline, rid, action, qid))
+        if not restored:
+            return False
+
+        # A contagem acompanha a ação efetiva seguinte
+        nxt = self.actions.next()
+        deadline = self.actions.next_deadline()
+        rid = next(r for d, r, a, q in restored if q == nxt.id)
+        # A que a contagem acompanha é a da janela: um novo agendamento na janela a substitui
+        self.actions.set_key(nxt.id, 'gui')
+        kind = nxt.action
+        seconds = int(deadline - now)
+        self.pending_journal_id = rid
+        self.pending_kind = kind
+        self.view.show_converted(seconds, " (recuperado)")
+        self.view.show_estimate(deadline)
+        self._request_view_flush()
+        self._start_local_countdown(deadline - now)
+        return True
+
+    def on_cancel(self):
+        # Se estiver em modo simular, não executa o cancelamento real
+        if self._is_simulating():
+            self.notify('info', "Simulação de cancelamento executada.", key='schedule')
+            self._on_cancel_result(None, None)
+            return
+
+        if self.hooks_stop is not None:
+            # Sem isso o cancelamento esperaria os ganchos na fila do worker (até hooks_deadline)
+            self._stop_hooks()
+            self.notify('info', "Cancelando: interrompendo os ganchos pré-desligamento...", key='schedule')
+        self.executor.cancel(callback=self._on_cancel_result)
+        self._ensure_command_polling()
+
+    def _on_cancel_result(self, completed, error):
+        if error is not None:
+            metrics.event('error', where='cancel', error=repr(error))
+            self.notify('error', f"Falha ao executar 'shutdown -a': {error}")
+            return
+        metrics.event('cancelled', source='gui',
+                      returncode=None if completed is None else completed.returncode)
+        if completed is not None:
+            if completed.returncode == 0:
+                self.notify('info', "Solicitação de desligamento cancelada (shutdown -a).", key='schedule')
+            else:
+                self.notify('warning', f"shutdown -a retornou código {completed.returncode}: {_command_output(completed)}")
+
+        if self._is_simulating():
+            self._journal_call('cancel', self.pending_journal_id)
+        else:
+            # O cancelamento esvazia a fila inteira (inclusive ações restauradas do diário)
+            for rid in list(self.journal.pending()):
+                self._journal_call('cancel', rid)
+        self.pending_journal_id = None
+        if self.idle_deferred_since is not None:
+            self._stop_idle_wait()
+            self.countdown_label.configure(text="Contagem: -")
+
+        if self.countdown_job is not None:
+            try:
+                self.after_cancel(self.countdown_job)
+            except Exception:
+                pass
+            self.countdown_job = None
+            self.countdown.stop()
+            self._stop_warnings()
+            self.countdown_label.configure(text="Contagem: -")
+            self.view.show_converted(None)
+            self._request_view_flush()
+
+    @metrics.ui_callback('instance')
+    def _poll_instance_requests(self):
+        # Atende em lote tudo o que chegou desde a última consulta (só lê uma fila; não bloqueia)
+        batch = self.instance.drain()
+        if batch:
+            self._handle_instance_requests(batch)
+        self.instance_job = self.after(INSTANCE_POLL_MS, self._poll_instance_requests)
+
+    def _handle_instance_requests(self, batch):
+        if any(not argv for argv in batch):
+            # Outra execução pediu a janela: traz para frente
+            self.deiconify()
+            self.lift()
+            self.focus_force()
+        commands = [argv for argv in batch if argv]
+        if not commands:
+            return
+        # Como o Windows só mantém um desligamento pendente, só o último pedido importa
+        argv = commands[-1]
+        from cli import build_parser, schedule_seconds
+        try:
+            args = build_parser().parse_args(argv)
+            if args.command == 'cancel':
+                self.on_cancel()
+            elif args.command == 'schedule':
+                seconds = schedule_seconds(args)
+                self.view.show_converted(seconds)
+                self._request_view_flush()
+                self._run_shutdown_command(seconds, args.action)
+        except (SystemExit, ValueError) as e:
+            self.notify('error', f"Pedido inválido recebido de outra execução: {' '.join(argv)} ({e})")
+
+    def on_close(self):
+        if self.instance_job is not None:
+            try:
+                self.after_cancel(self.instance_job)
+            except Exception:
+                pass
+        for job in (self.command_poll_job, self.view_job, self.idle_job, self.warning_job,
+                    self.notice_job, self.notice_flush_job):
+            if job is not None:
+                try:
+                    self.after_cancel(job)
+                except Exception:
+                    pass
+        self.executor.close(wait=False)
+        if self.idle is not None:
+            self.idle.close()
+        self.config.close()
+        self.journal.close()
+        metrics.disable()
+        self.destroy()
+
+    def on_mouse_wheel(self, event):
+        mode = self.mode_var.get()
+        # On Windows, event.delta is multiple of 120; positive = up, negative = down
+        sign = 1 if event.delta > 0 else -1
+
+        if mode == "Horário (HH:MM)":
+            txt = self.time_entry.get().strip()
+            if not txt:
+                h, m = 0, 0
+            else:
+                try:
+                    parts = txt.split(":")
+                    h = int(parts[0])
+                    m = int(parts[1])
+                except Exception:
+                    h, m = 0, 0
+            m += 15 * sign
+            # Normalize
+            while m >= 60:
+                h = (h + 1) % 24
+                m -= 60
+            while m < 0:
+                h = (h - 1) % 24
+                m += 60
+            self.time_entry.delete(0, tk.END)
+            self.time_entry.insert(0, f"{h:02d}:{m:02d}")
+        else:
+            txt = self.value_entry.get().strip()
+            try:
+                current = int(float(txt)) if txt else 0
+            except Exception:
+                current = 0
+
+            if mode == "Segundos":
+                delta = 150 * sign
+                current = max(0, current + delta)
+            elif mode == "Minutos":
+                delta = 15 * sign
+                current = max(0, current + delta)
+            elif mode == "Horas":
+                delta = 1 * sign
+                current = max(0, current + delta)
+
+            self.value_entry.delete(0, tk.END)
+            self.value_entry.insert(0, str(current))
+
+        self.update_converted_seconds()
+
+    def update_converted_seconds(self):
+        # Só marca a prévia como desatualizada; a entrada é lida e interpretada no próximo flush
+        self.view.invalidate()
+        self._request_view_flush()
+
+    def _preview_source(self):
+        mode = self.mode_var.get()
+        entry = self.time_entry if mode == "Horário (HH:MM)" else self.value_entry
+        return mode, entry.get()
+
+    def _request_view_flush(self):
+        if self.view_job is None:
+            self.view_job = self.after_idle(self._flush_view)
+
+    @metrics.ui_callback('render')
+    def _flush_view(self):
+        self.view_job = None
+        # Reconfigura apenas os rótulos cujo texto mudou
+        self.view.flush(lambda name, text: getattr(self, name).configure(text=text))
+
+    def on_save_config(self):
+        cfg = {'daily_enabled': bool(self.daily_var.get())}
+        if self.mode_var.get() == "Horário (HH:MM)":
+            txt = self.time_entry.get().strip()
+            try:
+                _ = self._seconds_until_time(txt)
+                cfg['daily_time'] = txt
+            except Exception:
+                self.notify('error', "Horário inválido. Use HH:MM antes de salvar.")
+                return
+        else:
+            cfg['daily_time'] = cfg.get('daily_time', '')
+
+        self.save_config(cfg)
+        # Salvar explicitamente grava na hora (sem esperar o adiamento)
+        try:
+            self.config.flush()
+        except Exception as e:
+            self._on_config_error(e)
+            return
+        self.notify('info', "Configuração salva em config.json")
+        # atualizar estimativa visual
+        self.update_converted_seconds()
+
+    def load_config(self):
+        try:
+            cfg = self.config.load()
+            if cfg:
+                daily_time = cfg.get('daily_time')
+                daily_enabled = bool(cfg.get('daily_enabled', False))
+                self.daily_var.set(daily_enabled)
+                if daily_time:
+                    self.mode_var.set("Horário (HH:MM)")
+                    self.on_mode_change(self.mode_var.get())
+                    self.time_entry.delete(0, tk.END)
+                    self.time_entry.insert(0, daily_time)
+                    try:
+                        seconds = self._seconds_until_time(daily_time)
+                        self.view.show_converted(seconds)
+                        self.view.show_estimate(time.time() + seconds, " (diário)")
+                        self._request_view_flush()
+                    except Exception as e:
+                        metrics.event('error', where='load_config.daily_time', error=repr(e))
+        except Exception as e:
+            metrics.event('error', where='load_config', error=repr(e))
+
+    def on_show_calendar(self):
+        # Import adiado: a janela do calendário (e o NumPy, se houver) só carregam quando usados
+        from calendar_view import CalendarWindow
+
+        if self.calendar_window is not None and self.calendar_window.winfo_exists():
+            self.calendar_window.reload()
+            self.calendar_window.focus()
+            return
+        self.calendar_window = CalendarWindow(self, self.config)
+
+    def save_config(self, cfg: dict):
+        # Atualiza a cópia em memória; a gravação em disco é adiada e agrupada
+        self.config.update(cfg)
+
+    def _on_config_error(self, e):
+        metrics.event('error', where='config.save', error=repr(e))
+        self.notify('error', f"Falha ao salvar config: {e}")
+
+    def schedule_daily_if_enabled(self):
+        try:
+            # Próximo disparo entre todas as regras (daily_time e `rules`), respeitando DST/fuso
+            index = RecurrenceIndex(rules_from_config(self.config.load()))
+            nxt = index.next()
+            if nxt is not None:
+                seconds = int(nxt[0] - time.time())
+                self.view.show_converted(seconds, " (agendado diariamente)")
+                self._request_view_flush()
+                self._run_shutdown_command(seconds)
+        except Exception as e:
+            metrics.event('error', where='schedule_daily_if_enabled', error=repr(e))
+
+
+def _format_seconds(s):
+    return int(s)
+
+
+def _command_output(completed) -> str:
+    return (completed.stderr or completed.stdout or '').strip() or "sem saída"
+
+
+def _startup_probe(instance, path: str):
+    from command_executor import FakeBackend
+
+    app = ShutdownScheduler(backend=FakeBackend(), instance=instance,
+                            data_dir=os.path.dirname(os.path.abspath(path)))
+
+    def on_map(event):
+        if event.widget is not app:
+            return
+        app.unbind('<Map>')
+        with open(path, 'w') as f:
+            f.write(repr(time.time()))
+        app.after_idle(app.on_close)
+
+    app.bind('<Map>', on_map, add='+')
+    app.mainloop()
+
+
+def main(instance=None):
+    probe = os.environ.get(STARTUP_PROBE_ENV)
+    if probe:
+        return _startup_probe(instance, probe)
+    app = ShutdownScheduler(instance=instance)
+    app.mainloop()
+
+
+if __name__ == "__main__":
+    main()
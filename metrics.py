@@ -0,0 +1,360 @@
+"""Instrumentação: histogramas de latência, log de eventos JSONL e endpoint de métricas.
+
+Desligada por padrão. Com `"metrics": {"enabled": true}` no `config.json`, registra:
+
+- `command_seconds`     duração de cada chamada ao `shutdown` (rótulo: argumento, ex. -s)
+- `config_io_seconds`   leitura/gravação do `config.json` (rótulo: load/save)
+- `ui_callback_seconds` tempo dos callbacks na thread do Tk (rótulo: nome do callback)
+- `countdown_drift_seconds` atraso de cada tick da contagem em relação ao horário previsto
+
+e eventos (agendado, cancelado, erro...) num buffer em memória limitado, gravados em lote
+num arquivo JSONL com rotação por tamanho. Opcionalmente (`"port": 9464`) expõe
+`/metrics` no formato texto do Prometheus e `/events` em JSON, só em 127.0.0.1.
+
+Com a camada desligada, `observe()`/`event()` só testam uma variável global e `timed()`
+devolve sempre o mesmo gerenciador de contexto vazio.
+
+    "metrics": {"enabled": true, "log": "events.jsonl", "max_bytes": 1048576, "backups": 3,
+                "buffer": 1000, "port": 9464}
+
+Um `log` relativo fica na pasta de dados do usuário (`app_dirs.data_dir()`).
+"""
+import bisect
+import collections
+import functools
+import json
+import os
+import threading
+import time
+
+import app_dirs
+
+
+DEFAULT_LOG = 'events.jsonl'
+DEFAULT_MAX_BYTES = 1 << 20
+DEFAULT_BACKUPS = 3
+DEFAULT_BUFFER = 1000
+# Eventos acumulados antes de gravar no arquivo (ou a cada FLUSH_INTERVAL segundos)
+FLUSH_EVERY = 64
+FLUSH_INTERVAL = 2.0
+
+# Limites (segundos) dos baldes dos histogramas: de 0,1 ms a 60 s
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+           0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {
+    'command_seconds': "Duração das chamadas ao shutdown",
+    'config_io_seconds': "Leitura/gravação do config.json",
+    'ui_callback_seconds': "Tempo dos callbacks na thread da interface",
+    'countdown_drift_seconds': "Atraso dos ticks da contagem em relação ao previsto",
+}
+
+
+class Histogram:
+    __slots__ = ('counts', 'sum', 'count', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimativa pelo limite superior do balde (como o histogram_quantile do Prometheus)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return BUCKETS[i] if i < len(BUCKETS) else self.max
+        return self.max
+
+
+class EventLog:
+    """Eventos em memória (deque limitado) + arquivo JSONL com rotação por tamanho.
+
+    `append()` não toca no disco: as linhas acumulam e são gravadas de uma vez a cada
+    `FLUSH_EVERY` eventos ou quando `flush()` é chamado (timer do Metrics / fechamento).
+    """
+
+    def __init__(self, path, max_bytes: int = DEFAULT_MAX_BYTES, backups: int = DEFAULT_BACKUPS,
+                 buffer: int = DEFAULT_BUFFER):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.recent = collections.deque(maxlen=buffer)
+        self._pending = []
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def append(self, record: dict):
+        with self._lock:
+            self.recent.append(record)
+            if self.path is None:
+                return
+            if len(self._pending) >= self.recent.maxlen:
+                # Disco travado: não deixa a fila crescer sem limite
+                self._pending.pop(0)
+                self.dropped += 1
+            self._pending.append(record)
+            full = len(self._pending) >= FLUSH_EVERY
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending or self.path is None:
+            return
+        data = ''.join(json.dumps(r, ensure_ascii=False, separators=(',', ':')) + '\n' for r in pending)
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        try:
+            if size and size + len(data) > self.max_bytes:
+                self._rotate()
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(data)
+        except OSError:
+            self.dropped += len(pending)
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+class Metrics:
+    def __init__(self, log_path=None, max_bytes: int = DEFAULT_MAX_BYTES, backups: int = DEFAULT_BACKUPS,
+                 buffer: int = DEFAULT_BUFFER):
+        self.histograms = {}  # (nome, rótulo) -> Histogram
+        self.counters = collections.Counter()
+        self.log = EventLog(log_path, max_bytes, backups, buffer)
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher = None
+        self._server = None
+
+    def observe(self, name: str, value: float, label=None):
+        key = (name, label)
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = Histogram()
+            hist.observe(value)
+
+    def event(self, kind: str, fields: dict):
+        record = {'ts': round(time.time(), 3), 'event': kind}
+        record.update(fields)
+        self.counters[kind] += 1
+        self.log.append(record)
+
+    def start_flusher(self, interval: float = FLUSH_INTERVAL):
+        def loop():
+            while not self._stop.wait(interval):
+                self.log.flush()
+
+        self._flusher = threading.Thread(target=loop, name='metrics-flush', daemon=True)
+        self._flusher.start()
+
+    def serve(self, port: int, host: str = '127.0.0.1'):
+        """Sobe o endpoint HTTP numa thread. Retorna a porta efetiva (0 = escolhida pelo sistema)."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body = metrics.render_prometheus().encode('utf-8')
+                    ctype = 'text/plain; version=0.0.4; charset=utf-8'
+                elif self.path == '/events':
+                    body = json.dumps(list(metrics.log.recent), ensure_ascii=False).encode('utf-8')
+                    ctype = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', ctype)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True).start()
+        return self._server.server_address[1]
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            items = sorted(self.histograms.items(), key=lambda kv: (kv[0][0], kv[0][1] or ''))
+            snapshot = [(name, label, list(h.counts), h.sum, h.count) for (name, label), h in items]
+        current = None
+        for name, label, counts, total, count in snapshot:
+            metric = f"shutdown_scheduler_{name}"
+            if name != current:
+                current = name
+                lines.append(f"# HELP {metric} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {metric} histogram")
+            extra = f'op="{label}",' if label is not None else ''
+            cumulative = 0
+            for bound, n in zip(BUCKETS, counts):
+                cumulative += n
+                lines.append(f'{metric}_bucket{{{extra}le="{bound:g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{{extra}le="+Inf"}} {count}')
+            labels = f"{{{extra[:-1]}}}" if extra else ''
+            lines.append(f"{metric}_sum{labels} {total:.6f}")
+            lines.append(f"{metric}_count{labels} {count}")
+        lines.append("# TYPE shutdown_scheduler_events_total counter")
+        for kind, n in sorted(self.counters.items()):
+            lines.append(f'shutdown_scheduler_events_total{{event="{kind}"}} {n}')
+        return '\n'.join(lines) + '\n'
+
+    def close(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.log.flush()
+
+
+# Registro global; None = camada desligada
+_metrics = None
+
+
+class _Timer:
+    __slots__ = ('name', 'label', 't0')
+
+    def __init__(self, name: str, label):
+        self.name = name
+        self.label = label
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        m = _metrics
+        if m is not None:
+            m.observe(self.name, time.perf_counter() - self.t0, self.label)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def get():
+    return _metrics
+
+
+def enabled() -> bool:
+    return _metrics is not None
+
+
+def timed(name: str, label=None):
+    """`with metrics.timed('command_seconds', '-s'): ...` mede o bloco (se a camada estiver ligada)."""
+    if _metrics is None:
+        return _NULL_TIMER
+    return _Timer(name, label)
+
+
+def ui_callback(label: str):
+    """Decorador: mede o callback em `ui_callback_seconds` (só uma verificação se desligado)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _metrics is None:
+                return func(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                m = _metrics
+                if m is not None:
+                    m.observe('ui_callback_seconds', time.perf_counter() - t0, label)
+        return wrapper
+    return decorator
+
+
+def observe(name: str, value: float, label=None):
+    if _metrics is not None:
+        _metrics.observe(name, value, label)
+
+
+def event(kind: str, **fields):
+    if _metrics is not None:
+        _metrics.event(kind, fields)
+
+
+def enable(log_path=None, max_bytes: int = DEFAULT_MAX_BYTES, backups: int = DEFAULT_BACKUPS,
+           buffer: int = DEFAULT_BUFFER, port=None, flusher: bool = True) -> Metrics:
+    global _metrics
+    disable()
+    m = Metrics(log_path, max_bytes, backups, buffer)
+    if flusher:
+        m.start_flusher()
+    if port is not None:
+        try:
+            m.serve(int(port))
+        except OSError as e:
+            m.event('error', {'where': 'metrics.serve', 'error': str(e)})
+    _metrics = m
+    return m
+
+
+def disable():
+    global _metrics
+    m, _metrics = _metrics, None
+    if m is not None:
+        m.close()
+
+
+def configure(cfg: dict, serve: bool = True, flusher: bool = True):
+    """Liga/desliga conforme `config['metrics']`. Não recria o registro se já estiver ligado."""
+    spec = cfg.get('metrics') or {}
+    if not spec.get('enabled'):
+        disable()
+        return None
+    if _metrics is not None:
+        return _metrics
+    log = spec.get('log', DEFAULT_LOG)
+    if log and not os.path.isabs(log):
+        # Relativo à pasta de dados do usuário: a do executável é temporária ou sem escrita
+        log = os.path.join(app_dirs.data_dir(), log)
+    return enable(log or None,
+                  max_bytes=int(spec.get('max_bytes', DEFAULT_MAX_BYTES)),
+                  backups=int(spec.get('backups', DEFAULT_BACKUPS)),
+                  buffer=int(spec.get('buffer', DEFAULT_BUFFER)),
+                  port=spec.get('port') if serve else None,
+                  flusher=flusher)
@@ -0,0 +1,216 @@
+"""Avisos dentro da janela, sem caixas modais.
+
+Uma `messagebox` para o loop do Tk até alguém clicar em OK: a contagem para de atualizar e,
+num quiosque sem ninguém por perto, o app fica parado. Aqui os avisos vão para uma fila
+exibida num rótulo da própria janela, que some sozinho depois de um tempo.
+
+- `NotificationQueue`: deduplica avisos repetidos (mesma chave: conta "(x3)" ou troca o
+  texto), limita quantos avisos novos aparecem por intervalo e quantos ficam na tela.
+- `WarningPlan`: avisos antes do desligamento (10/5/1 min) calculados a partir do tempo
+  restante; a janela arma um único timer para o próximo deles.
+
+Nenhuma das duas classes conhece o Tk: `update()`/`delay_ms()` dizem quando chamar de novo.
+"""
+import collections
+import time
+
+
+LEVELS = ('info', 'warning', 'error')
+# Tempo na tela (s) por nível
+DEFAULT_TTL = {'info': 6.0, 'warning': 15.0, 'error': 30.0}
+MAX_VISIBLE = 3
+# No máximo RATE_BURST avisos novos a cada RATE_WINDOW segundos; os demais esperam na fila
+RATE_BURST = 3
+RATE_WINDOW = 5.0
+MAX_PENDING = 20
+
+# Minutos antes do prazo em que a janela avisa (config 'warnings')
+DEFAULT_WARNINGS = (10, 5, 1)
+
+
+class Notice:
+    __slots__ = ('level', 'text', 'key', 'count', 'expires', 'urgent')
+
+    def __init__(self, level: str, text: str, key, urgent: bool = False):
+        self.level = level
+        self.text = text
+        self.key = key
+        self.count = 1
+        self.expires = None
+        self.urgent = urgent
+
+    def label(self) -> str:
+        return f"{self.text} (x{self.count})" if self.count > 1 else self.text
+
+    def __repr__(self):
+        return f"Notice({self.level!r}, {self.label()!r})"
+
+
+class NotificationQueue:
+    """Fila de avisos não modais com deduplicação e limite de taxa.
+
+    `post()` só enfileira; `update()` expira os avisos vencidos, promove os que o limite de
+    taxa permitir (o mais grave primeiro; os urgentes não esperam a vez) e retorna em quantos
+    segundos chamar de novo (None: nada a fazer até o próximo `post`). `version` muda sempre
+    que o que está na tela muda.
+    """
+
+    def __init__(self, clock=time.monotonic, ttl=None, max_visible: int = MAX_VISIBLE,
+                 burst: int = RATE_BURST, window: float = RATE_WINDOW, max_pending: int = MAX_PENDING):
+        self.clock = clock
+        self.ttl = dict(DEFAULT_TTL, **(ttl or {}))
+        self.max_visible = max_visible
+        self.burst = burst
+        self.window = window
+        self.max_pending = max_pending
+        self.visible = []                       # mais antigo primeiro
+        self.pending = collections.deque()
+        self._shown_at = collections.deque()    # instantes das últimas promoções
+        self.version = 0
+        self.dropped = 0
+
+    def post(self, level: str, text: str, key=None, urgent: bool = False) -> Notice:
+        """Enfileira um aviso. Mesma chave (padrão: nível + texto) de um aviso na tela ou na
+        fila não cria outro: o texto igual soma "(xN)", o diferente substitui o anterior.
+        `urgent` passa à frente do limite de taxa (ex.: "faltam 1 min")."""
+        if level not in self.ttl:
+            raise ValueError(f"nível de aviso desconhecido: {level!r}")
+        key = (level, text) if key is None else key
+        for notice in self.visible:
+            if notice.key == key:
+                self._merge(notice, level, text)
+                notice.expires = self.clock() + self.ttl[notice.level]
+                self.version += 1
+                return notice
+        for notice in self.pending:
+            if notice.key == key:
+                self._merge(notice, level, text)
+                notice.urgent = notice.urgent or urgent
+                return notice
+        notice = Notice(level, text, key, urgent)
+        self.pending.append(notice)
+        if len(self.pending) > self.max_pending:
+            # Rajada sem repetição: perde primeiro o aviso mais antigo que não seja erro nem urgente
+            victim = next((n for n in self.pending if n.level != 'error' and not n.urgent), self.pending[0])
+            self.pending.remove(victim)
+            self.dropped += 1
+        return notice
+
+    @staticmethod
+    def _merge(notice: Notice, level: str, text: str):
+        if notice.text == text and notice.level == level:
+            notice.count += 1
+        else:
+            notice.level, notice.text, notice.count = level, text, 1
+
+    def update(self):
+        now = self.clock()
+        kept = [n for n in self.visible if n.expires > now]
+        if len(kept) != len(self.visible):
+            self.visible = kept
+            self.version += 1
+        while self._shown_at and self._shown_at[0] <= now - self.window:
+            self._shown_at.popleft()
+        while self.pending:
+            notice = self._next_pending()
+            if not notice.urgent and len(self._shown_at) >= self.burst:
+                break
+            self.pending.remove(notice)
+            notice.expires = now + self.ttl[notice.level]
+            self.visible.append(notice)
+            self._shown_at.append(now)
+            if len(self.visible) > self.max_visible:
+                oldest = next((n for n in self.visible[:-1] if n.level != 'error' and not n.urgent), self.visible[0])
+                self.visible.remove(oldest)
+            self.version += 1
+        waits = [n.expires - now for n in self.visible]
+        if self.pending and self._shown_at:
+            waits.append(self._shown_at[0] + self.window - now)
+        return max(0.0, min(waits)) if waits else None
+
+    def _next_pending(self) -> Notice:
+        # Urgentes primeiro, depois o mais grave; no mesmo nível, o mais antigo
+        return max(self.pending, key=lambda n: (n.urgent, LEVELS.index(n.level)))
+
+    def dismiss(self):
+        """Tira da tela os avisos visíveis (os da fila continuam esperando a vez)."""
+        if self.visible:
+            self.visible = []
+            self.version += 1
+
+    def clear(self, key):
+        """Remove o aviso com essa chave, na tela ou na fila."""
+        self.pending = collections.deque(n for n in self.pending if n.key != key)
+        kept = [n for n in self.visible if n.key != key]
+        if len(kept) != len(self.visible):
+            self.visible = kept
+            self.version += 1
+
+    def text(self) -> str:
+        """Avisos na tela, o mais recente primeiro."""
+        return "\n".join(n.label() for n in reversed(self.visible))
+
+    def level(self):
+        """Nível mais grave entre os avisos na tela (None se não houver nenhum)."""
+        if not self.visible:
+            return None
+        return max((n.level for n in self.visible), key=LEVELS.index)
+
+
+def warnings_from_config(cfg: dict) -> tuple:
+    """Minutos de antecedência dos avisos (`config['warnings']`; lista vazia desliga)."""
+    minutes = cfg.get('warnings', DEFAULT_WARNINGS)
+    if minutes is None:
+        return ()
+    return tuple(sorted({float(m) for m in minutes if float(m) > 0}, reverse=True))
+
+
+class WarningPlan:
+    """Avisos antes do prazo, pré-calculados a partir do tempo restante.
+
+    `start(restante)` guarda só as antecedências ainda à frente. O chamador arma um único
+    timer com `delay_ms(restante)` e, quando ele dispara, chama `due(restante)` para saber o
+    aviso da vez. Se vários venceram juntos (ex.: retomada de uma suspensão), só o mais
+    próximo do prazo é devolvido.
+    """
+
+    def __init__(self, minutes=DEFAULT_WARNINGS):
+        self.offsets = sorted((float(m) * 60 for m in minutes), reverse=True)
+        self._ahead = []
+
+    def start(self, remaining: float):
+        self._ahead = [o for o in self.offsets if o < remaining]
+
+    def stop(self):
+        self._ahead = []
+
+    def delay_ms(self, remaining: float):
+        """Milissegundos até o próximo aviso (None se não houver mais nenhum)."""
+        if not self._ahead:
+            return None
+        return max(0, int((remaining - self._ahead[0]) * 1000) + 1)
+
+    def due(self, remaining: float):
+        """Antecedência (s) do aviso vencido, ou None se o timer disparou cedo."""
+        crossed = None
+        while self._ahead and self._ahead[0] >= remaining:
+            crossed = self._ahead.pop(0)
+        return crossed
+
+    def level(self, offset: float) -> str:
+        """O último aviso é erro, o penúltimo alerta, os demais informativos."""
+        if offset <= self.offsets[-1]:
+            return 'error'
+        if len(self.offsets) > 1 and offset <= self.offsets[-2]:
+            return 'warning'
+        return 'info'
+
+
+def format_warning(action_label: str, offset: float) -> str:
+    minutes = offset / 60
+    if minutes >= 1:
+        amount = f"{minutes:g} min"
+        verb = "Falta" if minutes == 1 else "Faltam"
+    else:
+        amount, verb = f"{offset:g} s", "Faltam"
+    return f"{verb} {amount} para {action_label.lower()}. Cancele se ainda estiver usando o computador."
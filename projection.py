@@ -0,0 +1,350 @@
+"""Projeção em lote dos desligamentos recorrentes (calendário e simulações da frota).
+
+Em vez de perguntar à regra "qual o próximo disparo?" um de cada vez (`next_after`), expande
+as regras de uma vez num intervalo: dias que casam × minutos da regra, convertidos de horário
+local para UTC por uma tabela dos deslocamentos do fuso no intervalo. Com NumPy instalado
+tudo é feito em arrays (`datetime64` para dia/mês); sem ele, o mesmo cálculo roda com listas.
+
+O horário de verão segue a mesma convenção de `CompiledRule`: horário que cai no salto é
+empurrado para depois dele, horário repetido usa a primeira ocorrência. Um horário empurrado
+pelo salto só aparece se o `RecurrenceIndex` também chegaria nele (confere com `next_after`).
+
+    proj = project(rules_from_config(cfg), inicio, fim)
+    proj = project_hosts({'pc01': cfg1, 'pc02': cfg2}, inicio, fim)
+    write_csv(proj, 'desligamentos.csv')
+    month_grid(proj, 2026, 11)
+"""
+import bisect
+import calendar
+import csv
+import datetime
+import time
+
+from recurrence import rules_from_config
+
+try:
+    import numpy as np
+except ImportError:  # opcional: sem ele a projeção usa listas (mais lenta)
+    np = None
+
+
+# Ordinal (date.toordinal) de 01/01/1970
+EPOCH_ORDINAL = 719163
+DAY = 86400
+# Passo da busca por mudanças de deslocamento do fuso (transições ficam meses distantes)
+SAMPLE_STEP = 6 * 3600
+# Bits reservados para o índice da regra ao ordenar sem NumPy
+PART_BITS = 21
+WEEKDAY_SHORT = ('seg', 'ter', 'qua', 'qui', 'sex', 'sáb', 'dom')
+
+
+def _offset_func(tz):
+    if tz is None:
+        return lambda t: time.localtime(t).tm_gmtoff
+    return lambda t: int(datetime.datetime.fromtimestamp(t, tz).utcoffset().total_seconds())
+
+
+class OffsetTable:
+    """Deslocamentos UTC de um fuso (None = horário local) entre `start` e `end`.
+
+    - `utc[i]`: instante da i-ésima mudança de deslocamento
+    - `offsets[i]`: deslocamento antes de `utc[i]` (o último vale depois da última mudança)
+    - `local[i]`: a partir de qual horário local (fold=0) vale `offsets[i + 1]`
+    """
+
+    def __init__(self, tz, start: float, end: float):
+        offset = _offset_func(tz)
+        t = int(start) - 2 * DAY
+        stop = int(end) + 2 * DAY
+        prev = offset(t)
+        self.utc = []
+        self.offsets = [prev]
+        while t < stop:
+            nt = t + SAMPLE_STEP
+            cur = offset(nt)
+            if cur != prev:
+                # Busca binária do segundo exato da mudança
+                lo, hi = t, nt
+                while hi - lo > 1:
+                    mid = (lo + hi) // 2
+                    if offset(mid) == prev:
+                        lo = mid
+                    else:
+                        hi = mid
+                self.utc.append(hi)
+                self.offsets.append(cur)
+                prev = cur
+            t = nt
+        # Como no zoneinfo: a mudança só vale, em horário local, depois do maior dos dois
+        # deslocamentos (no salto o horário é empurrado; na repetição vale a primeira passagem)
+        self.local = [u + max(self.offsets[i], self.offsets[i + 1]) for i, u in enumerate(self.utc)]
+
+    def to_utc(self, local: int) -> int:
+        return local - self.offsets[bisect.bisect_right(self.local, local)]
+
+    def to_local(self, utc: int) -> int:
+        return utc + self.offsets[bisect.bisect_right(self.utc, utc)]
+
+    def to_utc_array(self, local):
+        return local - np.asarray(self.offsets)[np.searchsorted(self.local, local, side='right')]
+
+    def to_local_array(self, utc):
+        return utc + np.asarray(self.offsets)[np.searchsorted(self.utc, utc, side='right')]
+
+
+class Projection:
+    """Disparos projetados em ordem cronológica.
+
+    `when` (epoch UTC em segundos), `local` (mesmo instante no relógio de parede do fuso da
+    regra, também em segundos desde 1970) e `rule`/`host` (índices em `rules`/`hosts`).
+    Com NumPy são arrays int64; sem ele, listas.
+    """
+
+    __slots__ = ('when', 'local', 'rule', 'host', 'rules', 'hosts')
+
+    def __init__(self, when, local, rule, host, rules, hosts=None):
+        self.when = when
+        self.local = local
+        self.rule = rule
+        self.host = host
+        self.rules = rules
+        self.hosts = hosts or [None]
+
+    def __len__(self):
+        return len(self.when)
+
+    def datetime64(self):
+        """Instantes como `datetime64[s]` (UTC). Precisa de NumPy."""
+        return np.asarray(self.when).astype('datetime64[s]')
+
+    def between(self, start: float, end: float) -> 'Projection':
+        """Recorte [start, end) sem recalcular."""
+        if np is not None:
+            i, j = np.searchsorted(self.when, [start, end])
+        else:
+            i, j = bisect.bisect_left(self.when, start), bisect.bisect_left(self.when, end)
+        return Projection(self.when[i:j], self.local[i:j], self.rule[i:j], self.host[i:j],
+                          self.rules, self.hosts)
+
+    def local_between(self, start: int, end: int) -> 'Projection':
+        """Disparos com horário local (do fuso de cada regra) em [start, end), em segundos desde 1970."""
+        if np is not None:
+            keep = np.flatnonzero((self.local >= start) & (self.local < end))
+            return Projection(self.when[keep], self.local[keep], self.rule[keep], self.host[keep],
+                              self.rules, self.hosts)
+        keep = [i for i, lo in enumerate(self.local) if start <= lo < end]
+        return Projection([self.when[i] for i in keep], [self.local[i] for i in keep],
+                          [self.rule[i] for i in keep], [self.host[i] for i in keep], self.rules, self.hosts)
+
+    def rows(self):
+        """(máquina, índice da regra, epoch, horário local como datetime ingênuo) por disparo."""
+        base = datetime.datetime(1970, 1, 1)
+        for when, local, rule, host in zip(self.when, self.local, self.rule, self.host):
+            yield self.hosts[host], int(rule), int(when), base + datetime.timedelta(seconds=int(local))
+
+
+def _day_ordinals(rule, first: int, last: int):
+    """Ordinais dos dias entre `first` e `last` (inclusive) em que a regra dispara."""
+    if np is None:
+        return [d for d in range(first, last + 1) if rule._day_matches(d)]
+    days = np.arange(first, last + 1, dtype=np.int64)
+    ok = ((rule.weekdays >> ((days - 1) % 7)) & 1).astype(bool)
+    if not rule._weekday_only:
+        dates = (days - EPOCH_ORDINAL).astype('datetime64[D]')
+        month_start = dates.astype('datetime64[M]')
+        month = month_start.astype(np.int64) % 12
+        dom = (dates - month_start.astype('datetime64[D]')).astype(np.int64)
+        month_ok = ((rule.months >> month) & 1).astype(bool)
+        dom_ok = ((rule.days >> dom) & 1).astype(bool)
+        ok = month_ok & ((ok | dom_ok) if rule.dom_or_dow else (ok & dom_ok))
+    if rule.excluded:
+        ok &= ~np.isin(days, np.fromiter(rule.excluded, dtype=np.int64))
+    return days[ok]
+
+
+def _project_rule(rule, table: OffsetTable, start: int, end: int):
+    """(utc, local) ordenados dos disparos da regra em [start, end)."""
+    first = datetime.date.fromtimestamp(start).toordinal() - 1
+    last = datetime.date.fromtimestamp(end).toordinal() + 1
+    days = _day_ordinals(rule, first, last)
+    if np is not None:
+        wall = ((days - EPOCH_ORDINAL) * DAY)[:, None] + np.asarray(rule.minutes, dtype=np.int64) * 60
+        wall = wall.ravel()
+        utc = table.to_utc_array(wall)
+        keep = (utc >= start) & (utc < end)
+        wall, utc = wall[keep], utc[keep]
+        # Horários do salto do DST viram outro instante (e podem coincidir com outro horário)
+        local = table.to_local_array(utc)
+        shifted = local != wall
+        plain = utc[~shifted]
+        utc, idx = np.unique(utc, return_index=True)
+        local, shifted = local[idx], shifted[idx]
+        if shifted.any():
+            # Coincidiu com um horário normal: não há o que conferir
+            shifted &= ~np.isin(utc, plain)
+        if shifted.any():
+            keep = _reachable(rule, utc.tolist(), np.flatnonzero(shifted).tolist(), start)
+            utc, local = utc[keep], local[keep]
+        return utc, local
+
+    utc, local = [], []
+    shifted = {}
+    minutes = [m * 60 for m in rule.minutes]
+    for day in days:
+        base = (day - EPOCH_ORDINAL) * DAY
+        i = bisect.bisect_right(table.local, base)
+        if (i == len(table.local) or table.local[i] > base + DAY) and start <= base - table.offsets[i] \
+                and base + DAY - table.offsets[i] < end:
+            # Dia inteiro com o mesmo deslocamento e dentro do intervalo (caso comum)
+            off = table.offsets[i]
+            utc.extend([base + m - off for m in minutes])
+            local.extend([base + m for m in minutes])
+            continue
+        for m in minutes:
+            u = table.to_utc(base + m)
+            if start <= u < end:
+                real = table.to_local(u)
+                if real != base + m:
+                    shifted[u] = real
+                else:
+                    utc.append(u)
+                    local.append(real)
+    if shifted:
+        plain = set(utc)
+        merged = dict(shifted)
+        merged.update(zip(utc, local))
+        utc = sorted(merged)
+        local = [merged[u] for u in utc]
+        flagged = [i for i, u in enumerate(utc) if u not in plain]
+        keep = _reachable(rule, utc, flagged, start)
+        utc = [utc[i] for i in keep]
+        local = [local[i] for i in keep]
+    return utc, local
+
+
+def _reachable(rule, utc: list, shifted: list, start: int) -> list:
+    """Índices mantidos: um horário empurrado pelo salto do DST só fica se `next_after` chegaria nele."""
+    dropped = set()
+    for i in shifted:
+        j = i - 1
+        while j in dropped:
+            j -= 1
+        prev = utc[j] if j >= 0 else start - 1
+        if rule.next_after(prev) != utc[i]:
+            dropped.add(i)
+    return [i for i in range(len(utc)) if i not in dropped]
+
+
+def _merge(parts, rules, hosts):
+    """Junta (utc, local, índice da regra, índice da máquina) de várias regras em ordem cronológica."""
+    if np is not None:
+        if not parts:
+            empty = np.empty(0, dtype=np.int64)
+            return Projection(empty, empty, empty, empty, rules, hosts)
+        when = np.concatenate([p[0] for p in parts])
+        local = np.concatenate([p[1] for p in parts])
+        rule = np.concatenate([np.full(len(p[0]), p[2], dtype=np.int32) for p in parts])
+        host = np.concatenate([np.full(len(p[0]), p[3], dtype=np.int32) for p in parts])
+        order = np.argsort(when, kind='stable')
+        return Projection(when[order], local[order], rule[order], host[order], rules, hosts)
+    # Sem NumPy: ordena inteiros (instante << PART_BITS | parte), bem mais rápido que tuplas;
+    # cada parte já está em ordem, então o horário local sai de um ponteiro por parte
+    keys = []
+    for p, part in enumerate(parts):
+        keys.extend([(u << PART_BITS) | p for u in part[0]])
+    keys.sort()
+    mask = (1 << PART_BITS) - 1
+    ptr = [0] * len(parts)
+    when, local, rule, host = [], [], [], []
+    for k in keys:
+        p = k & mask
+        part = parts[p]
+        when.append(k >> PART_BITS)
+        local.append(part[1][ptr[p]])
+        rule.append(part[2])
+        host.append(part[3])
+        ptr[p] += 1
+    return Projection(when, local, rule, host, rules, hosts)
+
+
+def _project(entries, start: float, end: float, rules, hosts):
+    start, end = int(start), int(end)
+    tables = {}
+    parts = []
+    for rule, r, h in entries:
+        table = tables.get(rule.tz)
+        if table is None:
+            table = tables[rule.tz] = OffsetTable(rule.tz, start, end)
+        utc, local = _project_rule(rule, table, start, end)
+        if len(utc):
+            parts.append((utc, local, r, h))
+    return _merge(parts, rules, hosts)
+
+
+def project(rules, start: float, end: float) -> Projection:
+    """Todos os disparos das regras em [start, end) (epochs)."""
+    rules = list(rules)
+    return _project([(rule, i, 0) for i, rule in enumerate(rules)], start, end, rules, None)
+
+
+def project_hosts(hosts: dict, start: float, end: float) -> Projection:
+    """Simulação da frota: `hosts` mapeia nome da máquina -> config (como o `config.json` dela)."""
+    names = list(hosts)
+    rules = []
+    entries = []
+    for h, name in enumerate(names):
+        for rule in rules_from_config(hosts[name]):
+            entries.append((rule, len(rules), h))
+            rules.append(rule)
+    return _project(entries, start, end, rules, names)
+
+
+def write_csv(projection: Projection, target):
+    """Exporta a projeção em CSV (caminho ou arquivo aberto). Retorna o número de linhas."""
+    if isinstance(target, str):
+        with open(target, 'w', encoding='utf-8', newline='') as f:
+            return write_csv(projection, f)
+    writer = csv.writer(target)
+    writer.writerow(['maquina', 'regra', 'epoch', 'data', 'hora', 'dia_semana', 'fuso'])
+    zones = [getattr(rule.tz, 'key', str(rule.tz)) if rule.tz else 'local' for rule in projection.rules]
+    days = {}
+    n = 0
+    for when, local, rule, host in zip(projection.when, projection.local, projection.rule, projection.host):
+        day, secs = divmod(int(local), DAY)
+        date = days.get(day)
+        if date is None:
+            d = datetime.date.fromordinal(day + EPOCH_ORDINAL)
+            date = days[day] = (d.isoformat(), WEEKDAY_SHORT[d.weekday()])
+        writer.writerow([projection.hosts[host] or '', int(rule), int(when), date[0],
+                         f"{secs // 3600:02d}:{secs % 3600 // 60:02d}", date[1], zones[rule]])
+        n += 1
+    return n
+
+
+def month_grid(projection: Projection, year: int, month: int, firstweekday: int = calendar.SUNDAY) -> list:
+    """Semanas do mês para a grade do calendário: listas de 7 células, cada uma None (fora do
+    mês) ou (dia, [horários 'HH:MM' em ordem]), pelo horário local de cada regra."""
+    lo, hi = month_local_range(year, month)
+    by_day = {}
+    for local in projection.local:
+        local = int(local)
+        if lo <= local < hi:
+            secs = (local - lo) % DAY
+            by_day.setdefault((local - lo) // DAY + 1, []).append(f"{secs // 3600:02d}:{secs % 3600 // 60:02d}")
+    weeks = []
+    for week in calendar.Calendar(firstweekday).monthdayscalendar(year, month):
+        weeks.append([None if d == 0 else (d, sorted(set(by_day.get(d, [])))) for d in week])
+    return weeks
+
+
+def month_local_range(year: int, month: int):
+    """Início e fim do mês em horário local (segundos desde 1970, sem fuso), para `local_between`."""
+    first = datetime.date(year, month, 1).toordinal()
+    return (first - EPOCH_ORDINAL) * DAY, (first + calendar.monthrange(year, month)[1] - EPOCH_ORDINAL) * DAY
+
+
+def month_bounds(year: int, month: int):
+    """(início, fim) do mês em epoch pelo horário local, com 2 dias de folga para regras em outros fusos."""
+    first = datetime.datetime(year, month, 1)
+    nxt = datetime.datetime(year + month // 12, month % 12 + 1, 1)
+    return first.timestamp() - 2 * DAY, nxt.timestamp() + 2 * DAY
@@ -0,0 +1,272 @@
+import bisect
+import datetime
+import heapq
+import itertools
+import time
+
+from schedule_engine import parse_hhmm
+
+
+# Nomes aceitos para dias da semana (segunda = 0, como em `date.weekday()`)
+WEEKDAY_NAMES = {
+    'seg': 0, 'ter': 1, 'qua': 2, 'qui': 3, 'sex': 4, 'sab': 5, 'sáb': 5, 'dom': 6,
+    'mon': 0, 'tue': 1, 'wed': 2, 'thu': 3, 'fri': 4, 'sat': 5, 'sun': 6,
+}
+ALL_WEEKDAYS = 0b1111111
+ALL_DAYS = (1 << 31) - 1
+ALL_MONTHS = (1 << 12) - 1
+
+# Quantos dias procurar antes de desistir (cobre 29/02 combinado com dia da semana)
+MAX_SEARCH_DAYS = 366 * 8
+
+
+def _parse_cron_field(field: str, lo: int, hi: int) -> list:
+    """Expande um campo de cron ('*', '1-5', '*/15', '1,3,5', '0-30/10') em valores."""
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step_txt = part.split('/', 1)
+            step = int(step_txt)
+            if step <= 0:
+                raise ValueError(f"Passo inválido no cron: {field}")
+        if part == '*':
+            start, end = lo, hi
+        elif '-' in part:
+            a, b = part.split('-', 1)
+            start, end = int(a), int(b)
+        else:
+            start = int(part)
+            end = hi if step > 1 else start
+        if start < lo or end > hi or start > end:
+            raise ValueError(f"Valor fora do intervalo no cron: {field}")
+        values.update(range(start, end + 1, step))
+    return sorted(values)
+
+
+def _mask(values, offset: int = 0) -> int:
+    m = 0
+    for v in values:
+        m |= 1 << (v - offset)
+    return m
+
+
+def _parse_weekdays(spec) -> int:
+    if spec is None:
+        return ALL_WEEKDAYS
+    if isinstance(spec, str):
+        spec = [s.strip() for s in spec.split(',') if s.strip()]
+    mask = 0
+    for day in spec:
+        if isinstance(day, int):
+            if not 0 <= day <= 6:
+                raise ValueError(f"Dia da semana inválido: {day}")
+            mask |= 1 << day
+        else:
+            key = day.lower()[:3]
+            if key not in WEEKDAY_NAMES:
+                raise ValueError(f"Dia da semana inválido: {day}")
+            mask |= 1 << WEEKDAY_NAMES[key]
+    return mask
+
+
+class CompiledRule:
+    """Regra de recorrência compilada numa forma compacta.
+
+    - `minutes`: minutos do dia (0..1439) em ordem crescente
+    - `weekdays`, `days`, `months`: máscaras de bits (dia da semana, dia do mês, mês)
+    - `dom_or_dow`: semântica do cron quando dia do mês e dia da semana são restritos
+      (basta um dos dois bater)
+    - `excluded`: datas (ordinais) em que a regra não dispara
+    - `tz`: fuso (`zoneinfo.ZoneInfo`) ou None para o horário local do sistema
+    """
+
+    __slots__ = ('minutes', 'weekdays', 'days', 'months', 'dom_or_dow', 'excluded', 'tz', 'source', '_weekday_only')
+
+    def __init__(self, minutes, weekdays=ALL_WEEKDAYS, days=ALL_DAYS, months=ALL_MONTHS,
+                 dom_or_dow=False, excluded=frozenset(), tz=None, source=None):
+        if not minutes:
+            raise ValueError("Regra sem horários")
+        self.minutes = tuple(sorted(set(minutes)))
+        self.weekdays = weekdays
+        self.days = days
+        self.months = months
+        self.dom_or_dow = dom_or_dow
+        self.excluded = excluded
+        self.tz = tz
+        self.source = source
+        # Caso comum: só dia da semana importa, dá para decidir sem montar a data
+        self._weekday_only = days == ALL_DAYS and months == ALL_MONTHS and not dom_or_dow
+
+    def __repr__(self):
+        return f"CompiledRule({self.source!r})"
+
+    def _day_matches(self, ordinal: int) -> bool:
+        if ordinal in self.excluded:
+            return False
+        # Ordinal 1 (01/01/0001) foi uma segunda-feira
+        dow_ok = (self.weekdays >> ((ordinal - 1) % 7)) & 1
+        if self._weekday_only:
+            return bool(dow_ok)
+        d = datetime.date.fromordinal(ordinal)
+        if not (self.months >> (d.month - 1)) & 1:
+            return False
+        dom_ok = (self.days >> (d.day - 1)) & 1
+        if self.dom_or_dow:
+            return bool(dow_ok or dom_ok)
+        return bool(dow_ok and dom_ok)
+
+    def _to_epoch(self, ordinal: int, minute: int) -> float:
+        d = datetime.date.fromordinal(ordinal)
+        h, m = divmod(minute, 60)
+        if self.tz is not None:
+            # Horário inexistente (adiantamento do DST) cai no instante equivalente após o salto;
+            # horário ambíguo (atraso do DST) usa a primeira ocorrência (fold=0)
+            return datetime.datetime(d.year, d.month, d.day, h, m, tzinfo=self.tz).timestamp()
+        # Horário local: o próprio sistema resolve o DST
+        return time.mktime((d.year, d.month, d.day, h, m, 0, 0, 0, -1))
+
+    def _local(self, epoch: float):
+        if self.tz is not None:
+            dt = datetime.datetime.fromtimestamp(epoch, self.tz)
+        else:
+            dt = datetime.datetime.fromtimestamp(epoch)
+        return dt.toordinal(), dt.hour * 60 + dt.minute
+
+    def next_after(self, after: float):
+        """Próximo disparo (epoch) estritamente depois de `after`, ou None."""
+        ordinal, minute = self._local(after)
+        for day in range(ordinal, ordinal + MAX_SEARCH_DAYS):
+            if not self._day_matches(day):
+                continue
+            # O horário do próprio minuto de `after` nunca é posterior a ele (disparos são em :00)
+            start = bisect.bisect_right(self.minutes, minute) if day == ordinal else 0
+            candidates = self.minutes[start:]
+            for i, m in enumerate(candidates):
+                epoch = self._to_epoch(day, m)
+                if epoch > after:
+                    # Um horário que caiu no salto do DST é empurrado até 1h para frente e pode
+                    # passar de horários seguintes; confere a hora seguinte antes de decidir
+                    for m2 in candidates[i + 1:]:
+                        if m2 >= m + 60:
+                            break
+                        e2 = self._to_epoch(day, m2)
+                        if after < e2 < epoch:
+                            epoch = e2
+                    return epoch
+        return None
+
+
+def compile_rule(spec) -> CompiledRule:
+    """Compila uma regra vinda do `config.json`.
+
+    Formatos aceitos:
+      - "HH:MM" (todo dia nesse horário)
+      - {"times": ["22:00", "23:30"], "weekdays": "seg,ter,qua", "exclude": ["2026-12-25"], "tz": "America/Sao_Paulo"}
+      - {"cron": "0 22 * * 1-5", "exclude": [...], "tz": ...}
+    """
+    if isinstance(spec, str):
+        spec = {'times': [spec]}
+    elif not isinstance(spec, dict):
+        raise ValueError(f"Regra inválida: {spec!r} (use \"HH:MM\" ou um objeto com times/cron)")
+    excluded = frozenset(datetime.date.fromisoformat(d).toordinal() for d in spec.get('exclude', ()))
+    tz = None
+    if spec.get('tz'):
+        # zoneinfo no Windows precisa do pacote tzdata
+        from zoneinfo import ZoneInfo
+        try:
+            tz = ZoneInfo(spec['tz'])
+        except (KeyError, ValueError, TypeError):
+            # Fuso desconhecido é ZoneInfoNotFoundError (um KeyError); quem chama só trata ValueError
+            raise ValueError(f"Fuso inválido: {spec['tz']}") from None
+
+    if spec.get('cron'):
+        fields = spec['cron'].split()
+        if len(fields) != 5:
+            raise ValueError("Expressão cron deve ter 5 campos: min hora dia mês dia-da-semana")
+        mins = _parse_cron_field(fields[0], 0, 59)
+        hours = _parse_cron_field(fields[1], 0, 23)
+        days = _parse_cron_field(fields[2], 1, 31)
+        months = _parse_cron_field(fields[3], 1, 12)
+        # Cron usa domingo = 0 (ou 7); convertemos para segunda = 0
+        dows = {(v - 1) % 7 for v in _parse_cron_field(fields[4], 0, 7)}
+        return CompiledRule(
+            [h * 60 + m for h in hours for m in mins],
+            weekdays=_mask(dows),
+            days=_mask(days, 1),
+            months=_mask(months, 1),
+            # Como no cron: se ambos forem restritos, basta um dos dois
+            dom_or_dow=not fields[2].startswith('*') and not fields[4].startswith('*'),
+            excluded=excluded,
+            tz=tz,
+            source=spec,
+        )
+
+    times = spec.get('times') or []
+    minutes = []
+    for t in times:
+        h, m = parse_hhmm(t)
+        minutes.append(h * 60 + m)
+    return CompiledRule(minutes, weekdays=_parse_weekdays(spec.get('weekdays')), excluded=excluded, tz=tz, source=spec)
+
+
+def rules_from_config(cfg: dict) -> list:
+    """Regras ativas no `config.json`: o `daily_time` legado (se habilitado) + a lista `rules`."""
+    rules = []
+    if cfg.get('daily_enabled') and cfg.get('daily_time'):
+        rules.append(compile_rule(cfg['daily_time']))
+    for spec in cfg.get('rules', []):
+        if isinstance(spec, dict) and not spec.get('enabled', True):
+            continue
+        rules.append(compile_rule(spec))
+    return rules
+
+
+class RecurrenceIndex:
+    """Índice do próximo disparo entre várias regras.
+
+    Guarda (próximo_disparo, regra) num min-heap: `next()` é O(1) e `advance()`/`add()`
+    custam O(log n); depois de cada disparo só a regra que disparou é recalculada.
+    """
+
+    def __init__(self, rules=(), now=None):
+        self._heap = []
+        self._seq = itertools.count()
+        now = time.time() if now is None else now
+        for rule in rules:
+            self.add(rule, now)
+
+    def __len__(self):
+        return len(self._heap)
+
+    def add(self, rule: CompiledRule, now=None):
+        nxt = rule.next_after(time.time() if now is None else now)
+        if nxt is not None:
+            heapq.heappush(self._heap, (nxt, next(self._seq), rule))
+
+    def remove(self, rule: CompiledRule):
+        self._heap = [e for e in self._heap if e[2] is not rule]
+        heapq.heapify(self._heap)
+
+    def next(self):
+        """(epoch, regra) do próximo disparo, ou None."""
+        return self._heap[0][::2] if self._heap else None
+
+    def advance(self):
+        """Consome o próximo disparo e reagenda a regra correspondente. Retorna (epoch, regra)."""
+        if not self._heap:
+            return None
+        when, _, rule = self._heap[0]
+        nxt = rule.next_after(when)
+        if nxt is None:
+            heapq.heappop(self._heap)
+        else:
+            heapq.heapreplace(self._heap, (nxt, next(self._seq), rule))
+        return when, rule
+
+    def advance_until(self, now: float):
+        """Consome todos os disparos com prazo <= `now` (ex.: depois de uma suspensão)."""
+        fired = []
+        while self._heap and self._heap[0][0] <= now:
+            fired.append(self.advance())
+        return fired
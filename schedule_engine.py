@@ -0,0 +1,51 @@
+import datetime
+import time
+
+
+MODE_TIME = "Horário (HH:MM)"
+
+# Quantos segundos vale cada unidade do modo numérico
+MODE_UNITS = {
+    "Segundos": 1,
+    "Minutos": 60,
+    "Horas": 3600,
+}
+
+
+def parse_hhmm(hhmm: str):
+    """Converte 'HH:MM' (24h) em (hora, minuto). Lança ValueError se inválido."""
+    try:
+        parts = hhmm.split(":")
+        if len(parts) != 2:
+            raise ValueError
+        h = int(parts[0])
+        m = int(parts[1])
+        if not (0 <= h < 24 and 0 <= m < 60):
+            raise ValueError
+    except Exception:
+        raise ValueError("Formato de horário inválido. Use HH:MM (24h).")
+    return h, m
+
+
+def seconds_until_time(hhmm: str, now=None) -> int:
+    """Segundos até a próxima ocorrência de HH:MM (hoje ou amanhã)."""
+    h, m = parse_hhmm(hhmm)
+    if now is None:
+        now = datetime.datetime.now()
+    target = now.replace(hour=h, minute=m, second=0, microsecond=0)
+    if target <= now:
+        target = target + datetime.timedelta(days=1)
+    # Diferença em tempo real (via mktime), não em relógio local: correta mesmo cruzando o DST
+    delta = time.mktime(target.timetuple()) - time.mktime(now.timetuple()) - now.microsecond / 1e6
+    return int(delta)
+
+
+def seconds_for_value(mode: str, text: str) -> int:
+    """Converte o texto digitado no modo escolhido para segundos.
+
+    Lança ValueError para entradas inválidas.
+    """
+    if mode == MODE_TIME:
+        return seconds_until_time(text)
+    val = int(float(text))
+    return val * MODE_UNITS.get(mode, 1)
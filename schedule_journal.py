@@ -0,0 +1,303 @@
+import collections
+import contextlib
+import json
+import mmap
+import os
+import struct
+
+import app_dirs
+
+
+# Tipos de evento gravados no diário
+OP_SCHEDULE = 1
+OP_CANCEL = 2
+OP_FIRE = 3
+
+# Ações conhecidas; o índice na tupla é o código gravado em disco
+ACTIONS = ('shutdown', 'restart', 'hibernate', 'logoff')
+
+# Registro binário de tamanho fixo (32 bytes):
+#   op, ação, magic, próximo id livre, id, índice do registro pendente mais antigo, prazo (epoch)
+RECORD = struct.Struct('<BBHIqqd')
+MAGIC = 0x534A
+
+# Valores especiais de "mais antigo pendente"
+NO_PENDING = -1
+FROM_SNAPSHOT = -2
+
+
+def _lock_file(f):
+    if os.name == 'nt':
+        import msvcrt
+        f.seek(0)
+        while True:
+            try:
+                # LK_LOCK desiste depois de ~10 s; o outro processo só segura o lock por uma escrita
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+def _unlock_file(f):
+    if os.name == 'nt':
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _stat_key(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def default_journal_path() -> str:
+    """Caminho do diário de agendamentos, na pasta de dados do usuário (`app_dirs.data_dir()`).
+
+    Não fica ao lado dos módulos: no executável onefile essa pasta é temporária e o diário
+    sumiria junto com o pendente que ele deveria recuperar.
+    """
+    return os.path.join(app_dirs.data_dir(), 'schedule.journal')
+
+
+class ScheduleJournal:
+    """Diário append-only de agendamentos (agendar/cancelar/disparar) com snapshot.
+
+    Cada evento é um registro binário de 32 bytes escrito com um único `write()`. Além do
+    evento, o registro guarda o índice do agendamento pendente mais antigo; assim a
+    recuperação lê só o último registro e reaplica a partir dali (via `mmap`), sem
+    percorrer o diário inteiro. Quando o diário passa de `compact_every` registros, os
+    pendentes vão para um snapshot JSON (gravação atômica) e o diário é zerado.
+
+    Registros incompletos no fim do arquivo (queda no meio de uma escrita) são descartados.
+
+    A janela, o serviço e a linha de comando podem gravar no mesmo diário. Cada gravação
+    segura um lock (`<diário>.lock`) e antes lê o que os outros processos anexaram desde a
+    última vez (ou relê tudo, se outro processo compactou), para que ids e o índice do
+    pendente mais antigo continuem valendo para todos.
+    """
+
+    def __init__(self, path: str, compact_every: int = 10000, fsync: bool = False):
+        self.path = path
+        self.snapshot_path = path + '.snapshot'
+        self.compact_every = compact_every
+        self.fsync = fsync
+        # id -> (índice do registro ou FROM_SNAPSHOT, ação, prazo epoch), em ordem de agendamento
+        self._pending = collections.OrderedDict()
+        self._next_id = 1
+        self._records = 0
+        self._file = None
+        self._lock = None
+        self._loaded = False
+        self._snapshot_key = None
+
+    # ---- leitura -------------------------------------------------------------------------
+
+    def _read_snapshot(self):
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snap = json.load(f)
+        except (OSError, ValueError):
+            return 1, []
+        return int(snap.get('next_id', 1)), snap.get('pending', [])
+
+    def replay(self) -> dict:
+        """Reconstrói o estado a partir do snapshot + diário. Retorna {id: (ação, prazo_epoch)}.
+
+        Não executa nenhum comando; só recupera o que estava pendente.
+        """
+        with self._locked():
+            self._load()
+        return self.pending()
+
+    @contextlib.contextmanager
+    def _locked(self):
+        if self._lock is None:
+            self._lock = open(self.path + '.lock', 'a+b')
+        _lock_file(self._lock)
+        try:
+            yield
+        finally:
+            _unlock_file(self._lock)
+
+    def _load(self):
+        self._close_file()
+        self._snapshot_key = _stat_key(self.snapshot_path)
+        next_id, snap_pending = self._read_snapshot()
+        pending = collections.OrderedDict()
+
+        size = 0
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            pass
+        nrec = size // RECORD.size
+
+        oldest = FROM_SNAPSHOT
+        if nrec:
+            with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # Descarta registros finais inválidos (escrita interrompida)
+                while nrec and RECORD.unpack_from(mm, (nrec - 1) * RECORD.size)[2] != MAGIC:
+                    nrec -= 1
+                if nrec:
+                    last = RECORD.unpack_from(mm, (nrec - 1) * RECORD.size)
+                    next_id = max(next_id, last[3])
+                    oldest = last[5]
+                    if oldest == FROM_SNAPSHOT:
+                        start = 0
+                    elif oldest == NO_PENDING:
+                        start = nrec
+                    else:
+                        start = oldest
+                    # Só o trecho a partir do pendente mais antigo importa
+                    for i in range(start, nrec):
+                        op, action, magic, _, rid, _, deadline = RECORD.unpack_from(mm, i * RECORD.size)
+                        if magic != MAGIC:
+                            continue
+                        if op == OP_SCHEDULE:
+                            pending[rid] = (i, ACTIONS[action] if action < len(ACTIONS) else ACTIONS[0], deadline)
+                        elif rid in pending:
+                            del pending[rid]
+                        else:
+                            # Cancelamento de algo que veio do snapshot
+                            snap_pending = [p for p in snap_pending if int(p[0]) != rid]
+        if oldest == FROM_SNAPSHOT:
+            snapshot_items = collections.OrderedDict(
+                (int(rid), (FROM_SNAPSHOT, action, deadline)) for rid, action, deadline in snap_pending)
+            snapshot_items.update(pending)
+            pending = snapshot_items
+
+        self._pending = pending
+        self._next_id = max([next_id] + [rid + 1 for rid in pending])
+        self._records = nrec
+        self._loaded = True
+        # Alinha o arquivo ao último registro válido antes de voltar a anexar
+        if size != nrec * RECORD.size:
+            try:
+                with open(self.path, 'r+b') as f:
+                    f.truncate(nrec * RECORD.size)
+            except OSError:
+                pass
+
+    def _sync(self):
+        """Alcança o que outros processos gravaram desde a última leitura ou escrita deste objeto."""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        known = self._records * RECORD.size
+        if (not self._loaded or size < known or size % RECORD.size
+                or _stat_key(self.snapshot_path) != self._snapshot_key):
+            # Primeira gravação, outro processo compactou ou há escrita interrompida: relê tudo
+            self._load()
+        elif size > known:
+            self._apply_tail(size // RECORD.size)
+
+    def _apply_tail(self, nrec: int):
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for i in range(self._records, nrec):
+                op, action, magic, next_id, rid, _, deadline = RECORD.unpack_from(mm, i * RECORD.size)
+                if magic != MAGIC:
+                    continue
+                self._next_id = max(self._next_id, next_id, rid + 1)
+                if op == OP_SCHEDULE:
+                    self._pending[rid] = (i, ACTIONS[action] if action < len(ACTIONS) else ACTIONS[0], deadline)
+                else:
+                    self._pending.pop(rid, None)
+        self._records = nrec
+
+    def pending(self) -> dict:
+        return {rid: (action, deadline) for rid, (_, action, deadline) in self._pending.items()}
+
+    # ---- escrita -------------------------------------------------------------------------
+
+    def _append(self, op: int, rid: int, action: str, deadline: float):
+        if self._file is None:
+            self._file = open(self.path, 'ab', buffering=0)
+        if self._pending:
+            oldest = next(iter(self._pending.values()))[0]
+        else:
+            oldest = NO_PENDING
+        code = ACTIONS.index(action) if action in ACTIONS else 0
+        self._file.write(RECORD.pack(op, code, MAGIC, self._next_id, rid, oldest, deadline))
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._records += 1
+        if self.compact_every and self._records >= self.compact_every:
+            self._compact()
+
+    def schedule(self, deadline: float, action: str = 'shutdown') -> int:
+        """Registra um agendamento para o instante `deadline` (epoch). Retorna o id."""
+        with self._locked():
+            self._sync()
+            rid = self._next_id
+            self._next_id += 1
+            self._pending[rid] = (self._records, action, deadline)
+            self._append(OP_SCHEDULE, rid, action, deadline)
+        return rid
+
+    def cancel(self, rid: int):
+        self._remove(OP_CANCEL, rid)
+
+    def fire(self, rid: int):
+        self._remove(OP_FIRE, rid)
+
+    def _remove(self, op: int, rid: int):
+        with self._locked():
+            self._sync()
+            # Outro processo pode já ter cancelado/disparado: aí não há o que gravar
+            entry = self._pending.pop(rid, None)
+            if entry is not None:
+                self._append(op, rid, entry[1], 0.0)
+
+    def compact(self):
+        """Grava os pendentes num snapshot (atômico) e zera o diário."""
+        with self._locked():
+            self._sync()
+            self._compact()
+
+    def _compact(self):
+        snap = {
+            'next_id': self._next_id,
+            'pending': [[rid, action, deadline] for rid, (_, action, deadline) in self._pending.items()],
+        }
+        tmp = self.snapshot_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(snap, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        self._snapshot_key = _stat_key(self.snapshot_path)
+        # Se cair aqui, snapshot e diário descrevem o mesmo estado: a recuperação continua correta
+        self._close_file()
+        with open(self.path, 'wb'):
+            pass
+        self._records = 0
+        for rid, (_, action, deadline) in list(self._pending.items()):
+            self._pending[rid] = (FROM_SNAPSHOT, action, deadline)
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def close(self):
+        self._close_file()
+        if self._lock is not None:
+            try:
+                self._lock.close()
+            except OSError:
+                pass
+            self._lock = None
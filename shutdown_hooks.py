@@ -0,0 +1,279 @@
+"""Etapa pré-desligamento: ganchos de limpeza executados no prazo, logo antes do desligamento.
+
+Cada gancho é uma função Python (`"call": "modulo:funcao"`) ou um comando externo
+(`"command": "..."` ou lista de argumentos). Os ganchos rodam em paralelo num pool de
+threads, respeitando a ordem de dependências (`after`), o tempo limite de cada um
+(`timeout`) e um prazo global para a etapa inteira (`hooks_deadline`).
+
+Ganchos `required` (padrão) seguram o desligamento até terminarem ou estourarem o prazo;
+os opcionais rodam enquanto houver ganchos obrigatórios em andamento e depois são
+abandonados. Uma falha não impede o desligamento: ela só aparece no relatório.
+
+Com ganchos configurados, o `shutdown -t` é armado com folga (`arm_slack`: prazo +
+`hooks_deadline`). No prazo, quem acompanha o agendamento (a contagem da janela ou o
+serviço) roda os ganchos e rearma para já (`fire_with_hooks`, `-t 0`): o desligamento só
+atrasa o tempo do gancho obrigatório mais lento. Se nada estiver rodando no prazo (ex.:
+`schedule` pela linha de comando com a janela fechada), o Windows desliga sozinho ao fim da
+folga, sem os ganchos.
+
+Exemplo no `config.json`:
+
+    "hooks": [
+        {"name": "cache", "call": "meu_app.cache:flush", "timeout": 10},
+        {"name": "sync", "command": ["robocopy", "C:\\\\dados", "D:\\\\backup", "/MIR"], "timeout": 60},
+        {"name": "servico", "command": "sc stop MeuServico", "after": ["cache"]},
+        {"name": "avisar", "command": "msg * Desligando agora", "required": false}
+    ],
+    "hooks_deadline": 120
+"""
+import importlib
+import subprocess
+import time
+
+
+DEFAULT_HOOK_TIMEOUT = 30.0
+DEFAULT_DEADLINE = 120.0
+DEFAULT_WORKERS = 8
+# Com `stop`, de quanto em quanto tempo (s) a espera confere se o agendamento foi cancelado
+STOP_POLL = 0.1
+
+# Estado final de cada gancho no relatório
+OK = 'ok'
+FAILED = 'falhou'
+TIMEOUT = 'tempo esgotado'
+SKIPPED = 'pulado'          # não chegou a rodar (dependência falhou ou prazo global acabou)
+ABANDONED = 'abandonado'    # opcional ainda rodando quando os obrigatórios terminaram
+
+
+class Hook:
+    __slots__ = ('name', 'func', 'command', 'timeout', 'required', 'after')
+
+    def __init__(self, name: str, func=None, command=None, timeout: float = DEFAULT_HOOK_TIMEOUT,
+                 required: bool = True, after=()):
+        if (func is None) == (command is None):
+            raise ValueError(f"gancho {name!r}: informe uma função ou um comando")
+        self.name = name
+        self.func = func
+        self.command = command
+        self.timeout = float(timeout)
+        self.required = bool(required)
+        self.after = tuple(after)
+
+    def __repr__(self):
+        return f"Hook({self.name!r}, timeout={self.timeout}, required={self.required}, after={self.after})"
+
+    def run(self, timeout: float):
+        """Executa o gancho (numa thread do pool). Comandos externos são encerrados no `timeout`."""
+        if self.func is not None:
+            return self.func()
+        completed = subprocess.run(self.command, shell=isinstance(self.command, str),
+                                   capture_output=True, text=True, timeout=timeout)
+        if completed.returncode != 0:
+            detail = (completed.stderr or completed.stdout or '').strip()
+            raise RuntimeError(f"código {completed.returncode}" + (f": {detail}" if detail else ''))
+        return completed
+
+
+class HookResult:
+    __slots__ = ('name', 'state', 'elapsed', 'error', 'required')
+
+    def __init__(self, name: str, state: str, elapsed: float = 0.0, error=None, required: bool = True):
+        self.name = name
+        self.state = state
+        self.elapsed = elapsed
+        self.error = error
+        self.required = required
+
+    def __repr__(self):
+        return f"HookResult({self.name!r}, {self.state!r}, elapsed={self.elapsed:.3f}, error={self.error!r})"
+
+
+class HookReport:
+    def __init__(self, results, elapsed: float):
+        self.results = results
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        """True se todos os ganchos obrigatórios terminaram com sucesso."""
+        return all(r.state == OK for r in self.results if r.required)
+
+    def failures(self) -> list:
+        return [r for r in self.results if r.state != OK]
+
+    def lines(self) -> list:
+        out = []
+        for r in self.results:
+            kind = '' if r.required else ' (opcional)'
+            error = f" - {r.error}" if r.error else ''
+            out.append(f"{r.name}{kind}: {r.state} em {r.elapsed:.2f}s{error}")
+        out.append(f"etapa pré-desligamento: {self.elapsed:.2f}s")
+        return out
+
+
+class HookPipeline:
+    """Executa os ganchos em paralelo respeitando dependências e prazos.
+
+    `run()` volta assim que o último gancho obrigatório termina (ou o prazo global acaba):
+    o desligamento só espera pelo gancho obrigatório mais lento do caminho de dependências.
+    `run(stop)` também volta quando o `threading.Event` `stop` é marcado (cancelamento).
+    """
+
+    def __init__(self, hooks, deadline: float = DEFAULT_DEADLINE, max_workers: int = DEFAULT_WORKERS):
+        self.hooks = list(hooks)
+        self.deadline = deadline
+        self.max_workers = max_workers
+        names = [h.name for h in self.hooks]
+        if len(set(names)) != len(names):
+            raise ValueError("nomes de ganchos repetidos")
+        self._check_dependencies()
+
+    def __len__(self):
+        return len(self.hooks)
+
+    def _check_dependencies(self):
+        by_name = {h.name: h for h in self.hooks}
+        for hook in self.hooks:
+            for dep in hook.after:
+                if dep not in by_name:
+                    raise ValueError(f"gancho {hook.name!r} depende de {dep!r}, que não existe")
+        # Detecta ciclos (DFS com marcação em três estados)
+        state = {}
+
+        def visit(name, path):
+            if state.get(name) == 1:
+                raise ValueError(f"dependência circular entre ganchos: {' -> '.join(path + [name])}")
+            if state.get(name) == 2:
+                return
+            state[name] = 1
+            for dep in by_name[name].after:
+                visit(dep, path + [name])
+            state[name] = 2
+
+        for hook in self.hooks:
+            visit(hook.name, [])
+
+    def run(self, stop=None) -> HookReport:
+        # Import adiado pelo mesmo motivo do CommandExecutor (partida da linha de comando)
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+        t0 = time.monotonic()
+        end = t0 + self.deadline if self.deadline else None
+        results = {}
+        running = {}  # future -> (hook, início)
+        pool = ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(self.hooks))),
+                                  thread_name_prefix='pre-shutdown')
+
+        def finish(hook, state, started, error=None):
+            elapsed = 0.0 if started is None else time.monotonic() - started
+            results[hook.name] = HookResult(hook.name, state, elapsed, error, hook.required)
+
+        try:
+            while True:
+                now = time.monotonic()
+                started_names = {h.name for h, _ in running.values()}
+                for hook in self.hooks:
+                    if hook.name in results or hook.name in started_names:
+                        continue
+                    failed = [d for d in hook.after if d in results and results[d].state != OK]
+                    if failed:
+                        finish(hook, SKIPPED, None, f"dependência {failed[0]!r} não concluiu")
+                    elif all(d in results for d in hook.after):
+                        limit = hook.timeout if end is None else min(hook.timeout, end - now)
+                        running[pool.submit(hook.run, limit)] = (hook, now)
+
+                if not running or not any(h.required and h.name not in results for h in self.hooks):
+                    break
+
+                # Acorda no primeiro término ou no prazo mais próximo (do gancho ou global)
+                now = time.monotonic()
+                wake = min(start + hook.timeout for hook, start in running.values())
+                if end is not None:
+                    wake = min(wake, end)
+                if stop is not None:
+                    wake = min(wake, now + STOP_POLL)
+                done, _ = wait(running, timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED)
+                for future in done:
+                    hook, start = running.pop(future)
+                    error = future.exception()
+                    if isinstance(error, subprocess.TimeoutExpired):
+                        finish(hook, TIMEOUT, start, f"passou de {hook.timeout:g}s")
+                    elif error is not None:
+                        finish(hook, FAILED, start, str(error) or type(error).__name__)
+                    else:
+                        finish(hook, OK, start)
+
+                now = time.monotonic()
+                global_expired = end is not None and now >= end
+                for future, (hook, start) in list(running.items()):
+                    if global_expired or now >= start + hook.timeout:
+                        # Funções Python não podem ser interrompidas: a thread fica para trás
+                        del running[future]
+                        reason = "prazo global da etapa acabou" if global_expired else f"passou de {hook.timeout:g}s"
+                        finish(hook, TIMEOUT, start, reason)
+                if global_expired or (stop is not None and stop.is_set()):
+                    break
+        finally:
+            pool.shutdown(wait=False)
+
+        for hook, start in running.values():
+            finish(hook, ABANDONED, start)
+        stopped = stop is not None and stop.is_set()
+        for hook in self.hooks:
+            if hook.name not in results:
+                finish(hook, SKIPPED, None, "agendamento cancelado" if stopped else "prazo global da etapa acabou")
+        ordered = [results[h.name] for h in self.hooks]
+        return HookReport(ordered, time.monotonic() - t0)
+
+
+def _resolve_call(spec: str):
+    module, _, attr = spec.partition(':')
+    if not module or not attr:
+        raise ValueError(f"função inválida: {spec!r} (use 'modulo:funcao')")
+    func = importlib.import_module(module)
+    for part in attr.split('.'):
+        func = getattr(func, part)
+    return func
+
+
+def hook_from_spec(spec: dict) -> Hook:
+    if not isinstance(spec, dict) or not spec.get('name'):
+        raise ValueError(f"gancho inválido: {spec!r}")
+    func = _resolve_call(spec['call']) if spec.get('call') else None
+    return Hook(spec['name'], func=func, command=spec.get('command'),
+                timeout=spec.get('timeout', DEFAULT_HOOK_TIMEOUT),
+                required=spec.get('required', True), after=spec.get('after', ()))
+
+
+def pipeline_from_config(cfg: dict):
+    """Monta a etapa a partir do `config.json`. Retorna None quando não há ganchos ativos."""
+    hooks = [hook_from_spec(spec) for spec in cfg.get('hooks', [])
+             if not (isinstance(spec, dict) and not spec.get('enabled', True))]
+    if not hooks:
+        return None
+    return HookPipeline(hooks, deadline=cfg.get('hooks_deadline', DEFAULT_DEADLINE))
+
+
+def arm_slack(pipeline) -> float:
+    """Folga (s) com que o timer do Windows é armado além do prazo para caber os ganchos."""
+    if pipeline is None or not len(pipeline):
+        return 0.0
+    if pipeline.deadline:
+        return float(pipeline.deadline)
+    # Sem prazo global: no pior caso os ganchos rodam um depois do outro
+    return sum(hook.timeout for hook in pipeline.hooks)
+
+
+def fire_with_hooks(queue, qid: int, pipeline=None, stop=None):
+    """No prazo da ação `qid` da `ActionQueue`: roda os ganchos e dispara a ação já (`-t 0`).
+
+    Retorna (CompletedProcess, HookReport ou None). Se `stop` for marcado durante os ganchos
+    (cancelamento), eles são abandonados e nada é enviado; idem se a ação já saiu da fila:
+    retorna (None, HookReport ou None).
+    """
+    report = None
+    if pipeline is not None and len(pipeline):
+        report = pipeline.run(stop)
+    if (stop is not None and stop.is_set()) or queue.get(qid) is None:
+        return None, report
+    return queue.fire_now(qid), report
@@ -0,0 +1,160 @@
+"""Instância única: a primeira janela segura um lock e escuta pedidos num socket local.
+
+Uma segunda execução (janela ou linha de comando) não monta nenhum widget: encontra a
+instância em execução, encaminha os argumentos e sai. Este módulo só usa `socket`, `json`
+e `os` para que o encaminhamento seja rápido.
+
+O lock e a porta (`instance.lock`/`instance.json`) ficam na pasta por usuário de
+`app_dirs.runtime_dir()`, não ao lado dos módulos (pasta temporária no executável onefile).
+"""
+import json
+import os
+import queue
+import socket
+import sys
+import threading
+
+import app_dirs
+
+
+LOCK_NAME = 'instance.lock'
+INFO_NAME = 'instance.json'
+
+# Comandos da linha de comando que a instância em execução atende
+FORWARDED_COMMANDS = ('schedule', 'cancel')
+
+
+def _try_lock(f) -> bool:
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+class InstanceServer:
+    """Dono do lock. Recebe pedidos numa thread e os enfileira para a thread da interface.
+
+    `drain()` devolve todos os pedidos acumulados de uma vez (lista de listas de argumentos);
+    uma lista vazia significa "mostrar a janela".
+    """
+
+    def __init__(self, lock_file, info_path: str):
+        self._lock_file = lock_file
+        self._info_path = info_path
+        self._token = os.urandom(16).hex()
+        self._requests = queue.Queue()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.bind(('127.0.0.1', 0))
+        self._sock.listen(16)
+        self.port = self._sock.getsockname()[1]
+        self._closed = False
+        tmp = info_path + '.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'pid': os.getpid(), 'port': self.port, 'token': self._token}, f)
+            os.replace(tmp, info_path)
+        except OSError:
+            self._sock.close()
+            raise
+        self._thread = threading.Thread(target=self._serve, name='single-instance', daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while not self._closed:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                break
+            with conn:
+                try:
+                    conn.settimeout(2.0)
+                    data = b''
+                    while not data.endswith(b'\n') and len(data) < 65536:
+                        chunk = conn.recv(4096)
+                        if not chunk:
+                            break
+                        data += chunk
+                    msg = json.loads(data)
+                    if msg.get('token') != self._token or not isinstance(msg.get('argv'), list):
+                        conn.sendall(b'denied\n')
+                        continue
+                    self._requests.put([str(a) for a in msg['argv']])
+                    conn.sendall(b'ok\n')
+                except (OSError, ValueError):
+                    continue
+
+    def drain(self) -> list:
+        batch = []
+        while True:
+            try:
+                batch.append(self._requests.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+        try:
+            with open(self._info_path, 'r', encoding='utf-8') as f:
+                mine = json.load(f).get('pid') == os.getpid()
+            if mine:
+                os.remove(self._info_path)
+        except (OSError, ValueError):
+            pass
+        self._lock_file.close()
+
+
+class StandaloneInstance:
+    """Substitui o InstanceServer quando não dá para criar o lock ou o socket: a janela abre
+    mesmo assim, só que sem receber pedidos de outras execuções."""
+
+    def drain(self) -> list:
+        return []
+
+    def close(self):
+        pass
+
+
+def acquire():
+    """Tenta virar a instância principal. Retorna um InstanceServer, None se já existe outra,
+    ou um StandaloneInstance se a pasta do lock não puder ser usada."""
+    try:
+        folder = app_dirs.runtime_dir()
+        f = open(os.path.join(folder, LOCK_NAME), 'a+b')
+    except OSError as e:
+        print(f"Aviso: instância única desativada ({e}).", file=sys.stderr)
+        return StandaloneInstance()
+    if not _try_lock(f):
+        f.close()
+        return None
+    try:
+        return InstanceServer(f, os.path.join(folder, INFO_NAME))
+    except OSError as e:
+        f.close()
+        print(f"Aviso: instância única desativada ({e}).", file=sys.stderr)
+        return StandaloneInstance()
+
+
+def forward(argv, timeout: float = 1.0) -> bool:
+    """Encaminha `argv` para a instância em execução. Retorna False se não houver nenhuma."""
+    try:
+        with open(os.path.join(app_dirs.runtime_dir(), INFO_NAME), 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        with socket.create_connection(('127.0.0.1', int(info['port'])), timeout=timeout) as conn:
+            payload = json.dumps({'token': info['token'], 'argv': list(argv)}).encode('utf-8') + b'\n'
+            conn.sendall(payload)
+            return conn.recv(16).startswith(b'ok')
+    except (OSError, ValueError, KeyError):
+        return False
@@ -0,0 +1,106 @@
+import datetime
+import functools
+import time
+
+from schedule_engine import MODE_TIME, MODE_UNITS, parse_hhmm, seconds_until_time
+
+
+EMPTY_CONVERTED = "Tempo convertido: - "
+EMPTY_ESTIMATE = "Estimativa de desligamento: -"
+
+
+@functools.lru_cache(maxsize=256)
+def parse_preview(mode: str, text: str):
+    """Interpreta o texto digitado (memoizado). Retorna segundos, (hora, minuto) ou None se inválido."""
+    try:
+        if mode == MODE_TIME:
+            return parse_hhmm(text)
+        return int(float(text)) * MODE_UNITS.get(mode, 1)
+    except ValueError:
+        return None
+
+
+@functools.lru_cache(maxsize=64)
+def _format_minute(epoch_minute: int) -> str:
+    return datetime.datetime.fromtimestamp(epoch_minute * 60).strftime('%H:%M')
+
+
+def format_hhmm(epoch: float) -> str:
+    """HH:MM local de um instante; o strftime só roda uma vez por minuto distinto."""
+    return _format_minute(int(epoch // 60))
+
+
+class PreviewModel:
+    """Estado dos rótulos de prévia/status da janela.
+
+    As mudanças só marcam o rótulo como sujo; `flush(apply)` é chamado uma vez por quadro
+    (via `after_idle`) e só chama `apply(nome, texto)` para os rótulos cujo texto mudou.
+    `invalidate()` adia até o flush a leitura/interpretação da entrada: vários eventos no
+    mesmo quadro (ex.: rolagem rápida do mouse) viram um único recálculo.
+    """
+
+    def __init__(self, source=None, clock=time.time):
+        # source() -> (modo, texto) atuais da janela
+        self.source = source
+        self.clock = clock
+        self._shown = {}
+        self._pending = {}
+        self._stale = False
+
+    @property
+    def dirty(self) -> bool:
+        return self._stale or bool(self._pending)
+
+    def invalidate(self):
+        self._stale = True
+
+    def set(self, name: str, text: str):
+        if self._shown.get(name) == text:
+            self._pending.pop(name, None)
+        else:
+            self._pending[name] = text
+
+    def flush(self, apply) -> int:
+        """Aplica os textos pendentes. Retorna quantos widgets foram reconfigurados."""
+        if self._stale and self.source is not None:
+            self.preview(*self.source())
+        pending, self._pending = self._pending, {}
+        for name, text in pending.items():
+            apply(name, text)
+            self._shown[name] = text
+        return len(pending)
+
+    def show_converted(self, seconds=None, suffix: str = ''):
+        # Um valor explícito vale mais que uma prévia pedida antes dele
+        self._stale = False
+        if seconds is None:
+            self.set('info_label', EMPTY_CONVERTED)
+        else:
+            self.set('info_label', f"Tempo convertido: {seconds} segundos{suffix}")
+
+    def show_estimate(self, deadline=None, suffix: str = ''):
+        """`deadline` é um instante epoch; None mostra '-'."""
+        self._stale = False
+        if deadline is None:
+            self.set('estimated_label', EMPTY_ESTIMATE)
+        else:
+            self.set('estimated_label', f"Estimativa de desligamento: {format_hhmm(deadline)}{suffix}")
+
+    def preview(self, mode: str, text: str):
+        """Recalcula a prévia para o modo/texto atuais (como o antigo `update_converted_seconds`)."""
+        text = text.strip()
+        if not text:
+            self.show_converted(None)
+            return
+        parsed = parse_preview(mode, text)
+        if parsed is None:
+            self.show_converted(None)
+            return
+        now = self.clock()
+        if mode == MODE_TIME:
+            # Mesmo cálculo do agendamento, no instante do relógio da prévia
+            seconds = seconds_until_time(text, datetime.datetime.fromtimestamp(now))
+        else:
+            seconds = parsed
+        self.show_converted(seconds)
+        self.show_estimate(now + seconds)